@@ -0,0 +1,72 @@
+"""Overhead of escaping on a listing with 10,000 cells
+
+Run with ``python -m benchmarks.bench_escaping``. The listing is built and rendered as :class:`pyspass.ResultListing`
+and compared with the same table built through the plain table api, once without escaping and once escaping every
+value on its own with :func:`html.escape`. A fifth of the columns hold repeated code labels, some values contain
+characters that have to be escaped. The escaping step alone is measured as well, since it is small compared to
+building and rendering the nodes.
+"""
+import html
+import timeit
+
+from pyspass import HtmlTable, RenderMode, ResultListing, escape_column
+
+ROWS = 1000
+COLUMNS = 10
+REPEAT = 9
+NUMBER = 10
+LABELS = ['open', 'closed', 'in progress', 'R&D', 'on hold']
+
+
+def dataset() -> list[dict]:
+    return [{f'column_{c}': (LABELS[(r + c) % len(LABELS)] if c % 5 == 0 else
+                             r * c if c % 5 == 1 else
+                             f'<customer {r}>' if c % 5 == 2 else
+                             f'text value {r}-{c}')
+             for c in range(COLUMNS)}
+            for r in range(ROWS)]
+
+
+def build_table(content: list[dict], escape) -> HtmlTable:
+    table = HtmlTable()
+    columns = list(content[0])
+    headrow = table.tr()
+    for key in columns:
+        headrow.th(key)
+    for row in content:
+        tablerow = table.tr()
+        for key in columns:
+            tablerow.td(escape(str(row[key])))
+    return table
+
+
+def best_of(statement) -> float:
+    return min(timeit.repeat(statement, number=NUMBER, repeat=REPEAT)) / NUMBER
+
+
+def main() -> None:
+    content = dataset()
+    results = {
+        'unescaped table': best_of(lambda: build_table(content, str).render(RenderMode.COMPACT)),
+        'html.escape per cell': best_of(lambda: build_table(content, html.escape).render(RenderMode.COMPACT)),
+        'ResultListing': best_of(lambda: ResultListing(content, rowcount_max=ROWS).render(RenderMode.COMPACT)),
+    }
+    reference = results['unescaped table']
+    print(f"{ROWS * COLUMNS} cells, build and render")
+    for name, seconds in results.items():
+        print(f"{name:22} {seconds * 1e3:7.2f} ms {(seconds / reference - 1) * 100:+6.1f}%")
+
+    columns = [[row[key] for row in content] for key in content[0]]
+    escaping = {
+        'str per cell': best_of(lambda: [[str(value) for value in column] for column in columns]),
+        'html.escape per cell': best_of(lambda: [[html.escape(str(value)) for value in column]
+                                                 for column in columns]),
+        'escape_column': best_of(lambda: [escape_column(column) for column in columns]),
+    }
+    print(f"{ROWS * COLUMNS} cells, conversion to text only")
+    for name, seconds in escaping.items():
+        print(f"{name:22} {seconds * 1e3:7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""In-process comparison of the Flask request path with the native WSGI and ASGI adapters
+
+Run with ``python -m benchmarks.bench_request_adapters``. Each variant handles the same urlencoded POST with a
+query string and reads the same fields through :class:`pyspass.PySpassRequest`.
+"""
+import asyncio
+import io
+import timeit
+
+from pyspass import PySpassRequest, AsgiRequest
+
+QUERY = 'page=3&sort=name'
+BODY = b'abc=123&def=4.5&' + b'&'.join(b'field%d=value%d' % (i, i) for i in range(20))
+REPEAT = 5
+NUMBER = 2000
+
+
+def environ() -> dict:
+    return {'REQUEST_METHOD': 'POST',
+            'PATH_INFO': '/',
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'wsgi.url_scheme': 'http',
+            'QUERY_STRING': QUERY,
+            'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+            'CONTENT_LENGTH': str(len(BODY)),
+            'wsgi.input': io.BytesIO(BODY)}
+
+
+def read_fields(requ: PySpassRequest) -> tuple:
+    return requ.get('page'), requ.get_int('abc'), requ.get_float('def'), requ.get('field19')
+
+
+def start_response(status, headers):
+    return None
+
+
+def flask_app():
+    import flask
+
+    app = flask.Flask(__name__)
+
+    @app.route('/', methods=['POST'])
+    def index():
+        read_fields(PySpassRequest(flask.request, framework="flask"))
+        return ''
+
+    return app.wsgi_app
+
+
+def wsgi_app(environ_, start_response_):
+    read_fields(PySpassRequest(environ_, framework="wsgi"))
+    start_response_('200 OK', [('Content-Type', 'text/html')])
+    return [b'']
+
+
+async def asgi_app(scope, receive, send):
+    read_fields(PySpassRequest(await AsgiRequest.receive_from(scope, receive), framework="asgi"))
+    await send({'type': 'http.response.start', 'status': 200, 'headers': [(b'content-type', b'text/html')]})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+def run_asgi() -> None:
+    scope = {'type': 'http', 'method': 'POST', 'query_string': QUERY.encode(),
+             'headers': [(b'content-type', b'application/x-www-form-urlencoded')]}
+
+    async def receive():
+        return {'type': 'http.request', 'body': BODY, 'more_body': False}
+
+    async def send(message):
+        return None
+
+    async def many():
+        for _ in range(NUMBER):
+            await asgi_app(scope, receive, send)
+
+    asyncio.run(many())
+
+
+def best_of(statement) -> float:
+    return min(timeit.repeat(statement, number=NUMBER, repeat=REPEAT)) / NUMBER
+
+
+def main() -> None:
+    results = {}
+    try:
+        app = flask_app()
+        results['flask'] = best_of(lambda: app(environ(), start_response))
+    except ImportError:
+        print("flask not installed, skipping the flask path")
+    results['wsgi'] = best_of(lambda: wsgi_app(environ(), start_response))
+    results['asgi'] = min(timeit.repeat(run_asgi, number=1, repeat=REPEAT)) / NUMBER
+    reference = results.get('flask')
+    for name, seconds in results.items():
+        relative = f"{reference / seconds:5.1f}x" if reference else ''
+        print(f"{name:6} {seconds * 1e6:8.1f} us/request {relative}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""Rendering benchmarks with regression check against a stored baseline
+
+Run with ``python -m benchmarks.suite``. Every workload builds a synthetic page and renders it, the suite reports
+the best time of several runs, the peak of memory allocated while building and rendering (measured with
+tracemalloc in a separate run) and the size of the html. The results are compared with ``baseline.json`` and the
+exit code is 1 if a metric exceeds the baseline by more than its threshold or a workload has no baseline yet, so
+the suite can run as a CI step. Record the baseline of a new workload together with the workload.
+
+Times depend on the machine, record the baseline on the machine the comparison runs on::
+
+    python -m benchmarks.suite --save
+    python -m benchmarks.suite --time-threshold 0.2 --only listing_10k_rows select_20k_options
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from functools import cache
+from pathlib import Path
+from typing import Optional
+
+from pyspass import HtmlForm, HtmlPage, PySpassApp, PySpassRequest, PySpassSession, RenderMode
+
+BASELINE = Path(__file__).with_name('baseline.json')
+#: Allowed relative increase per metric before a workload counts as regression
+THRESHOLDS = {'seconds': 0.25, 'peak_kib': 0.10, 'output_bytes': 0.05}
+LABELS = ['open', 'closed', 'in progress', 'R&D', 'on hold']
+
+WORKLOADS: dict[str, Callable[[RenderMode], str]] = {}
+
+
+def workload(func: Callable[[RenderMode], str]) -> Callable[[RenderMode], str]:
+    WORKLOADS[func.__name__] = func
+    return func
+
+
+@cache
+def dataset(rows: int, columns: int = 8) -> list[dict]:
+    return [{'id': r, **{f'column_{c}': (LABELS[(r + c) % len(LABELS)] if c % 4 == 0 else
+                                         r * c * 1.5 if c % 4 == 1 else
+                                         f'text value {r}-{c}')
+                         for c in range(1, columns)}}
+            for r in range(rows)]
+
+
+@workload
+def listing_10k_rows(mode: RenderMode) -> str:
+    page = HtmlPage()
+    page.body.result_listing(dataset(10_000), rowcount_max=10_000, alignments='rlrlrlrl')
+    return page.render(mode)
+
+
+@workload
+def listing_10k_rows_client_side(mode: RenderMode) -> str:
+    page = HtmlPage()
+    page.body.result_listing(dataset(10_000), rowcount_max=10_000, alignments='rlrlrlrl', client_side=True)
+    return page.render(mode)
+
+
+@workload
+def pivot_20k_row_keys(mode: RenderMode) -> str:
+    page = HtmlPage()
+    page.body.result_pivot(dataset(20_000), 'id', 'column_4', 'column_1', alignments='rrrrrr')
+    return page.render(mode)
+
+
+@workload
+def select_20k_options(mode: RenderMode) -> str:
+    page = HtmlPage()
+    form = page.body.form('form')
+    form.dropdown('code', {code: f'Code label {code}' for code in range(20_000)}, var_input=['17', '4711'],
+                  multiple=True, size=20)
+    return page.render(mode)
+
+
+@workload
+def nesting_50_deep(mode: RenderMode) -> str:
+    page = HtmlPage()
+    form = page.body.form('form')
+    for branch in range(20):
+        node = form
+        for depth in range(50):
+            node = node.div(class_html=f'level_{depth}')
+        node.p(f'leaf {branch}')
+        node.get_form()
+    return page.render(mode)
+
+
+@workload
+def result_choice_1k_selected(mode: RenderMode) -> str:
+    content = dataset(2_000)
+    page = HtmlPage()
+    form = page.body.form('form')
+    choice = form.result_choice(content, 'id', row_selected=[{'id': row['id']} for row in content[::2]],
+                                rowcount_max=2_000)
+    choice.set_codes('column_4', {label: label.upper() for label in LABELS})
+    choice.compose()
+    return page.render(mode)
+
+
+class BenchmarkApp(PySpassApp):
+
+    def affirm_credentials(self, username: str, password: str):
+        return True
+
+    def build(self) -> None:
+        body = self.page.body
+        body.h1("Orders")
+        form: HtmlForm = body.form('orders')
+        for name in ('state', 'region', 'owner'):
+            form.label(name, for_id=name)
+            form.dropdown(name, {code: f'{name} {code}' for code in range(50)}, var_input=self.request.get(name),
+                          autosubmit=True)
+        form.textinput('search', var_input=self.request.get('search'))
+        form.submit('submit_search', 'search')
+        choice = form.result_choice(dataset(500), 'id', row_selected=self.request.get('_rct_selected_id'),
+                                    mapping={f'column_{c}': f'Column {c}' for c in range(1, 8)},
+                                    alignments='rlrlrlr')
+        choice.set_codes('column_4', {label: label.upper() for label in LABELS})
+        choice.compose()
+        form.textarea('comment', var_input='Some <comment> & notes')
+
+
+@workload
+def app_page(mode: RenderMode) -> str:
+    request = PySpassRequest({'QUERY_STRING': 'state=3&region=7&_rct_selected_id=42'}, framework="wsgi")
+    app = BenchmarkApp("app", request, PySpassSession({'success_login': True}, framework="wsgi"))
+    app.resolve_login()
+    app.build()
+    return app.page.render(mode)
+
+
+@dataclass
+class Measurement:
+    seconds: float
+    peak_kib: float
+    output_bytes: int
+
+
+def measure(func: Callable[[RenderMode], str], mode: RenderMode, repeat: int) -> Measurement:
+    func(mode)  # warm up caches, e.g. the datasets
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func(mode)
+        timings.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    html = func(mode)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return Measurement(seconds=min(timings), peak_kib=peak / 1024, output_bytes=len(html.encode('utf-8')))
+
+
+def compare(results: dict[str, Measurement], baseline: dict[str, dict],
+            thresholds: dict[str, float]) -> list[str]:
+    """Regressions of the results against the baseline, as readable messages"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        for metric, threshold in thresholds.items():
+            current, before = getattr(result, metric), reference[metric]
+            if before and current > before * (1 + threshold):
+                regressions.append(f"{name}: {metric} {before:.6g} -> {current:.6g} "
+                                   f"(+{(current / before - 1) * 100:.1f}%, allowed +{threshold * 100:.0f}%)")
+    return regressions
+
+
+def missing(results: dict[str, Measurement], baseline: dict[str, dict]) -> list[str]:
+    """Workloads without baseline, which could not be compared"""
+    return [name for name in results if not baseline.get(name)]
+
+
+def load_baseline(path: Path) -> dict[str, dict]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding='utf-8'))['workloads']
+
+
+def save_baseline(path: Path, results: dict[str, Measurement], mode: RenderMode) -> None:
+    data = {'python': platform.python_version(),
+            'machine': platform.machine(),
+            'mode': mode.value,
+            'workloads': {name: asdict(result) for name, result in results.items()}}
+    path.write_text(json.dumps(data, indent=2) + '\n', encoding='utf-8')
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', nargs='+', choices=sorted(WORKLOADS), help="run only these workloads")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per workload, the best one counts")
+    parser.add_argument('--mode', choices=[mode.value for mode in RenderMode], default=RenderMode.COMPACT.value)
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument('--save', action='store_true', help="store the results as new baseline")
+    parser.add_argument('--time-threshold', type=float, default=THRESHOLDS['seconds'])
+    parser.add_argument('--memory-threshold', type=float, default=THRESHOLDS['peak_kib'])
+    parser.add_argument('--size-threshold', type=float, default=THRESHOLDS['output_bytes'])
+    args = parser.parse_args(argv)
+    mode = RenderMode(args.mode)
+
+    baseline = load_baseline(args.baseline)
+    results: dict[str, Measurement] = {}
+    print(f"{'workload':28} {'ms':>10} {'peak KiB':>10} {'bytes':>10}   vs baseline")
+    for name in args.only or WORKLOADS:
+        result = results[name] = measure(WORKLOADS[name], mode, args.repeat)
+        reference = baseline.get(name)
+        relative = f"{(result.seconds / reference['seconds'] - 1) * 100:+6.1f}% time" if reference else 'missing'
+        print(f"{name:28} {result.seconds * 1e3:10.2f} {result.peak_kib:10.0f} {result.output_bytes:10d}   "
+              f"{relative}")
+
+    if args.save:
+        save_baseline(args.baseline, {**{name: Measurement(**values) for name, values in baseline.items()},
+                                      **results}, mode)
+        print(f"baseline written to {args.baseline}")
+        return 0
+    regressions = compare(results, baseline, {'seconds': args.time_threshold,
+                                              'peak_kib': args.memory_threshold,
+                                              'output_bytes': args.size_threshold})
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    without_baseline = missing(results, baseline)
+    for name in without_baseline:
+        print(f"MISSING {name} has no baseline, record it with --save --only {name}")
+    return 1 if regressions or without_baseline else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
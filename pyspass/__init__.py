@@ -1,3 +1,14 @@
 from .pyspass import *
+from .adapters import FormValues, WsgiRequest, AsgiRequest
+from .aggregates import AGGREGATES, AggregateResult, PivotResult, aggregate, pivot
+from .assets import Asset, AssetManager, minify_js, minify_css
+from .budgets import BudgetExceeded, BudgetUsage, PageBudget
+from .credentials import CredentialVerifier
+from .exports import EXPORT_FORMATS, export_rows
+from .formats import ColumnFormat, compile_format
+from .instrumentation import ComponentStats, RenderProfile
+from .markup import Markup, escape, escape_column
+from .sessions import SessionStore, LruSessionStore, SqliteSessionStore, StoredSession
+from .sources import QuerySource, RowSource, SequenceSource
 
 __version__ = '0.3.0'
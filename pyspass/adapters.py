@@ -0,0 +1,168 @@
+from collections.abc import Mapping, Iterable, Iterator, Callable, Awaitable
+from email.parser import BytesParser
+from email.policy import HTTP
+from functools import cached_property
+from typing import Any, Optional
+from urllib.parse import parse_qsl
+
+
+class FormValues(Mapping):
+    """Read-only multi-value mapping for query strings and posted form fields
+
+    Lookups via ``[]`` or :meth:`get` return the first value of a field, :meth:`getlist` returns all of them.
+    This mirrors the parts of werkzeug's ``MultiDict`` that are used by :class:`PySpassRequest`.
+    """
+
+    _lists: dict[str, list[str]]
+
+    def __init__(self, pairs: Iterable[tuple[str, str]] = ()):
+        self._lists = {}
+        for key, value in pairs:
+            self._lists.setdefault(key, []).append(value)
+
+    def __getitem__(self, key: str) -> str:
+        return self._lists[key][0]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._lists)
+
+    def __len__(self) -> int:
+        return len(self._lists)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._lists!r})"
+
+    def getlist(self, key: str) -> list[str]:
+        return list(self._lists.get(key, ()))
+
+    def combine(self, other: 'FormValues') -> 'FormValues':
+        """Return a new object with the values of both, values of this object come first"""
+        combined = FormValues()
+        for source in (self, other):
+            for key, value_list in source._lists.items():
+                combined._lists.setdefault(key, []).extend(value_list)
+        return combined
+
+
+class _FormRequest:
+    """Common parsing of query string and body for the framework independent request objects
+
+    Parsing is done lazily on first access, so a request that is only checked for a session flag never touches
+    its body.
+    """
+
+    #: Upper limit for accepted request bodies in bytes, None for no limit.
+    max_content_length: Optional[int] = 16 * 1024 * 1024
+
+    method: str
+    query_string: bytes
+    content_type: str
+    body: bytes
+
+    @cached_property
+    def args(self) -> FormValues:
+        return FormValues(parse_qsl(self.query_string.decode('latin-1'), keep_blank_values=True))
+
+    @cached_property
+    def form(self) -> FormValues:  # type: ignore[override]
+        mimetype, _, _ = self.content_type.partition(';')
+        mimetype = mimetype.strip().lower()
+        if not self.body:
+            return FormValues()
+        if mimetype == 'application/x-www-form-urlencoded':
+            return FormValues(parse_qsl(self.body.decode('utf-8', 'replace'), keep_blank_values=True))
+        if mimetype == 'multipart/form-data':
+            return FormValues(self._parse_multipart())
+        return FormValues()
+
+    @cached_property
+    def values(self) -> FormValues:
+        return self.args.combine(self.form)
+
+    def get(self, key: str, default=None) -> Any:
+        return self.values.get(key, default)
+
+    def _parse_multipart(self) -> Iterator[tuple[str, str]]:
+        """Yields the text fields of a multipart body, uploaded files are skipped"""
+        header = f"Content-Type: {self.content_type}\r\n\r\n".encode('latin-1')
+        message = BytesParser(policy=HTTP).parsebytes(header + self.body)
+        for part in message.iter_parts():
+            name = part.get_param('name', header='content-disposition')
+            if name is None or part.get_filename() is not None:
+                continue
+            payload = part.get_payload(decode=True) or b''
+            yield name, payload.decode(part.get_content_charset() or 'utf-8', 'replace')
+
+    def _check_length(self, length: int) -> None:
+        if self.max_content_length is not None and length > self.max_content_length:
+            raise ValueError(f"Request body of {length} bytes exceeds the limit of {self.max_content_length} bytes")
+
+
+class WsgiRequest(_FormRequest):
+    """Request object for plain WSGI servers, built directly from the environ
+
+    :param environ: The WSGI environ dictionary as passed to the application callable.
+    """
+
+    def __init__(self, environ: Mapping[str, Any]):
+        self.environ = environ
+        self.method = environ.get('REQUEST_METHOD', 'GET').upper()
+        self.query_string = environ.get('QUERY_STRING', '').encode('latin-1')
+        self.content_type = environ.get('CONTENT_TYPE', '')
+
+    @cached_property
+    def body(self) -> bytes:  # type: ignore[override]
+        try:
+            length = int(self.environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        if length <= 0:
+            return b''
+        self._check_length(length)
+        return self.environ['wsgi.input'].read(length)
+
+
+class AsgiRequest(_FormRequest):
+    """Request object for ASGI servers
+
+    The body has to be received before the object is usable by PySpass, use :meth:`receive_from` within the
+    ASGI application coroutine:
+
+    .. code-block:: python
+
+        request = PySpassRequest(await AsgiRequest.receive_from(scope, receive), framework="asgi")
+
+    :param scope: The ASGI connection scope of type "http".
+    :param body: The complete request body.
+    """
+
+    def __init__(self, scope: Mapping[str, Any], body: bytes = b''):
+        self.scope = scope
+        self.method = scope.get('method', 'GET').upper()
+        self.query_string = scope.get('query_string', b'')
+        self.content_type = ''
+        for key, value in scope.get('headers', ()):
+            if key.lower() == b'content-type':
+                self.content_type = value.decode('latin-1')
+                break
+        self._check_length(len(body))
+        self.body = body
+
+    @classmethod
+    async def receive_from(cls, scope: Mapping[str, Any],
+                           receive: Callable[[], Awaitable[Mapping[str, Any]]]) -> 'AsgiRequest':
+        """Read the complete body from the ASGI receive channel and create the request object"""
+        chunks: list[bytes] = []
+        length = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunk = message.get('body', b'')
+            length += len(chunk)
+            if cls.max_content_length is not None and length > cls.max_content_length:
+                raise ValueError(f"Request body exceeds the limit of {cls.max_content_length} bytes")
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                break
+        return cls(scope, b''.join(chunks))
@@ -0,0 +1,328 @@
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Optional
+
+from .exports import iter_rows
+
+try:
+    import numpy as np
+except ImportError:  # optional, columnar sources are aggregated without numpy as well
+    np = None
+
+#: Aggregate functions per column
+AGGREGATES = ('sum', 'avg', 'count', 'min', 'max')
+_PANDAS_FUNCTIONS = {'sum': 'sum', 'avg': 'mean', 'count': 'count', 'min': 'min', 'max': 'max'}
+
+
+@dataclass
+class AggregateResult:
+    """Aggregated values by column, for all rows and per group"""
+    totals: dict[Any, Any]
+    #: Aggregated values by column per value of the group column, ordered by the group values
+    groups: dict[Any, dict[Any, Any]] = field(default_factory=dict)
+
+
+@dataclass
+class PivotResult:
+    """Aggregated values of a cross tabulation, see :func:`pivot`"""
+    #: Values of the index columns in order, tuples for several index columns
+    row_keys: list[Any]
+    #: Values of the column key columns in order, tuples for several column key columns
+    column_keys: list[Any]
+    #: Aggregated value per row key and column key, None where no rows exist
+    cells: list[list[Any]]
+
+
+def aggregate(rows: Any, aggregates: Mapping[Any, str], group_by: Optional[Any] = None,
+              chunk_rows: int = 10000) -> AggregateResult:
+    """Aggregate columns of the rows, e.g. ``{'amount': 'sum', 'price': 'avg'}``
+
+    Empty values (None, NaN in numpy and pandas) are left out, count is the number of values present. The sum of
+    no values is 0, the other aggregates of no values are None.
+
+    :param rows: A pandas DataFrame or a mapping of columns, e.g. of numpy arrays, are aggregated column by column
+                 with vectorized operations. Any other rows like for :func:`iter_rows` are aggregated in a single
+                 pass, chunk by chunk.
+    :param aggregates: One of :data:`AGGREGATES` per column.
+    :param group_by: Column whose values form the groups for the subtotals, or a list of columns, whose values
+                     form the groups as tuples.
+    :param chunk_rows: Number of rows aggregated at once in the single pass.
+    """
+    for column, function in aggregates.items():
+        if function not in AGGREGATES:
+            raise ValueError(f"Aggregate {function} of column {column} not supported")
+    if hasattr(rows, 'groupby') and hasattr(rows, 'columns'):
+        return _aggregate_frame(rows, aggregates, group_by)
+    if isinstance(rows, Mapping):
+        if np is not None:
+            return _aggregate_arrays(rows, aggregates, group_by)
+        return _aggregate_stream(zip(*(rows[column] for column in _columns(aggregates, group_by))),
+                                 aggregates, group_by, chunk_rows)
+    return _aggregate_stream(iter_rows(rows, _columns(aggregates, group_by), chunk_rows), aggregates, group_by,
+                             chunk_rows)
+
+
+def pivot(rows: Any, index: Any, columns: Any, values: Any, function: str = 'sum',
+          chunk_rows: int = 10000) -> PivotResult:
+    """Cross tabulation of the aggregated values by the index columns and the column key columns
+
+    The rows are grouped by hashing in a single pass, vectorized for pandas and numpy sources, see
+    :func:`aggregate`. Only the combinations occurring in the rows are held besides the resulting table.
+
+    :param rows: See :func:`aggregate`.
+    :param index: Column whose values become the rows of the table, or a list of columns.
+    :param columns: Column whose values become the columns of the table, or a list of columns.
+    :param values: The aggregated column.
+    :param function: One of :data:`AGGREGATES`.
+    """
+    index_columns, column_columns = _key_columns(index), _key_columns(columns)
+    grouped = aggregate(rows, {values: function}, index_columns + column_columns, chunk_rows).groups
+    split = len(index_columns)
+    several_index, several_columns = bool(_group_columns(index)), bool(_group_columns(columns))
+    row_positions: dict[Any, int] = {}
+    column_positions: dict[Any, int] = {}
+    entries = []
+    for key, result in grouped.items():  # ordered, so the row keys are ordered as well
+        row_key = key[:split] if several_index else key[0]
+        column_key = key[split:] if several_columns else key[split]
+        row_position = row_positions.setdefault(row_key, len(row_positions))
+        entries.append((row_position, column_positions.setdefault(column_key, len(column_positions)),
+                        result[values]))
+    column_keys = list(column_positions)
+    try:
+        column_keys.sort()
+    except TypeError:  # incomparable values keep the order of their appearance
+        pass
+    order = [column_positions[key] for key in column_keys]
+    cells: list[list[Any]] = [[None] * len(column_keys) for _ in row_positions]
+    for row_position, column_position, value in entries:
+        cells[row_position][column_position] = value
+    if order != list(range(len(order))):
+        cells = [[row[position] for position in order] for row in cells]
+    return PivotResult(list(row_positions), column_keys, cells)
+
+
+def _group_columns(group_by: Optional[Any]) -> list[Any]:
+    """The list of group columns, empty for a single group column"""
+    return list(group_by) if isinstance(group_by, (list, tuple)) else []
+
+
+def _key_columns(group_by: Optional[Any]) -> list[Any]:
+    if group_by is None:
+        return []
+    return _group_columns(group_by) or [group_by]
+
+
+def _columns(aggregates: Mapping[Any, str], group_by: Optional[Any]) -> list[Any]:
+    return list(aggregates) + _key_columns(group_by)
+
+
+def _python_value(value: Any) -> Any:
+    """Numpy scalars as Python values, NaN as None"""
+    if hasattr(value, 'item'):
+        value = value.item()
+    return None if isinstance(value, float) and value != value else value
+
+
+def _aggregate_frame(frame: Any, aggregates: Mapping[Any, str], group_by: Optional[Any]) -> AggregateResult:
+    functions = {column: _PANDAS_FUNCTIONS[function] for column, function in aggregates.items()}
+    totals = {column: _python_value(getattr(frame[column], function)()) for column, function in functions.items()}
+    groups: dict[Any, dict[Any, Any]] = {}
+    if group_by is not None:
+        several = bool(_group_columns(group_by))
+        grouped = frame.groupby(_group_columns(group_by) if several else group_by, sort=True).agg(functions)
+        for column in functions:  # column by column, rows would share one dtype
+            for key, value in grouped[column].items():
+                if several:
+                    key = tuple(map(_python_value, key if isinstance(key, tuple) else (key,)))
+                else:
+                    key = _python_value(key)
+                groups.setdefault(key, {})[column] = _python_value(value)
+    return AggregateResult(totals, groups)
+
+
+def _aggregate_arrays(columns: Mapping[Any, Any], aggregates: Mapping[Any, str],
+                      group_by: Optional[Any]) -> AggregateResult:
+    totals = {column: _python_value(_reduce_array(np.asarray(columns[column]), function))
+              for column, function in aggregates.items()}
+    groups: dict[Any, dict[Any, Any]] = {}
+    if group_by is not None:
+        several = bool(_group_columns(group_by))
+        keys, inverse = _group_codes([np.asarray(columns[column]) for column in _key_columns(group_by)])
+        order = np.argsort(inverse, kind='stable')
+        starts = np.searchsorted(inverse[order], np.arange(len(keys)))
+        results = {column: _reduce_groups(np.asarray(columns[column]), function, inverse, order, starts, len(keys))
+                   for column, function in aggregates.items()}
+        for position, key in enumerate(keys):
+            groups[key if several else key[0]] = {column: _python_value(values[position])
+                                                  for column, values in results.items()}
+    return AggregateResult(totals, groups)
+
+
+def _group_codes(key_columns: list[Any]) -> tuple[list[tuple[Any, ...]], Any]:
+    """The distinct keys in order and the position of the key of every row, combining the codes of the columns"""
+    levels = []
+    codes = None
+    for values in key_columns:
+        keys, inverse = np.unique(values, return_inverse=True)
+        levels.append(keys.tolist())
+        codes = inverse.astype(np.int64) if codes is None else codes * len(keys) + inverse
+    combined, inverse = np.unique(codes, return_inverse=True)
+    keys = []
+    for code in combined.tolist():
+        positions = []
+        for level in reversed(levels):
+            code, position = divmod(code, len(level))
+            positions.append(level[position])
+        keys.append(tuple(map(_python_value, reversed(positions))))
+    return keys, inverse
+
+
+def _reduce_array(values: Any, function: str) -> Any:
+    if values.dtype.kind not in 'iufb':  # e.g. object arrays with None
+        return _reduce_values([value for value in values.tolist() if value is not None], function)
+    if function == 'count':
+        return np.count_nonzero(~np.isnan(values)) if values.dtype.kind == 'f' else len(values)
+    if function == 'sum':
+        return np.nansum(values)
+    if not len(values):
+        return None
+    return {'avg': np.nanmean, 'min': np.nanmin, 'max': np.nanmax}[function](values)
+
+
+def _reduce_groups(values: Any, function: str, inverse: Any, order: Any, starts: Any, count: int) -> Any:
+    """The aggregate of every group, by bincount and reduceat over the values sorted by group"""
+    if values.dtype.kind not in 'iufb':
+        return [_reduce_values([value for value in group.tolist() if value is not None], function)
+                for group in np.split(values[order], starts[1:])]
+    present = ~np.isnan(values) if values.dtype.kind == 'f' else np.ones(len(values), dtype=bool)
+    counts = np.bincount(inverse, weights=present, minlength=count)
+    if function == 'count':
+        return counts.astype(int)
+    if function in ('sum', 'avg'):
+        sums = np.bincount(inverse, weights=np.where(present, values, 0), minlength=count)
+        if function == 'sum':
+            return sums if values.dtype.kind == 'f' else sums.astype(np.int64)
+        return np.divide(sums, counts, out=np.full(count, np.nan), where=counts > 0)
+    reduce = np.fmin if function == 'min' else np.fmax  # ignore NaN
+    return reduce.reduceat(values[order], starts)
+
+
+def _reduce_values(values: list[Any], function: str) -> Any:
+    if function == 'count':
+        return len(values)
+    if function == 'sum':
+        return sum(values)
+    if not values:
+        return None
+    if function == 'avg':
+        return sum(values) / len(values)
+    return min(values) if function == 'min' else max(values)
+
+
+class _Accumulator:
+    """Count, sum, minimum and maximum of the values of a column, merged chunk by chunk"""
+    __slots__ = ('function', 'count', 'total', 'minimum', 'maximum')
+
+    def __init__(self, function: str):
+        self.function = function
+        self.count = 0
+        self.total: Any = 0
+        self.minimum: Any = None
+        self.maximum: Any = None
+
+    def add(self, values: Sequence[Any]) -> None:
+        values = [value for value in values if value is not None]
+        if not values:
+            return
+        self.count += len(values)
+        function = self.function
+        if function in ('sum', 'avg'):
+            self.total += sum(values)
+        elif function == 'min':
+            low = min(values)
+            self.minimum = low if self.minimum is None or low < self.minimum else self.minimum
+        elif function == 'max':
+            high = max(values)
+            self.maximum = high if self.maximum is None or high > self.maximum else self.maximum
+
+    @property
+    def value(self) -> Any:
+        if self.function in ('count', 'sum'):
+            return self.count if self.function == 'count' else self.total
+        if not self.count:
+            return None
+        return {'sum': self.total, 'avg': self.total / self.count,
+                'min': self.minimum, 'max': self.maximum}[self.function]
+
+
+class _GroupAccumulator:
+    """Count and sum, minimum or maximum of the values of a column per group, in lists indexed by group codes"""
+    __slots__ = ('function', 'counts', 'results')
+
+    def __init__(self, function: str):
+        self.function = function
+        self.counts: list[int] = []
+        self.results: list[Any] = []
+
+    def add(self, codes: Sequence[int], values: Sequence[Any], group_count: int) -> None:
+        counts, results, function = self.counts, self.results, self.function
+        counts.extend([0] * (group_count - len(counts)))
+        results.extend([None] * (group_count - len(results)))
+        for code, value in zip(codes, values):
+            if value is None:
+                continue
+            counts[code] += 1
+            current = results[code]
+            if current is None:
+                results[code] = value
+            elif function in ('sum', 'avg'):
+                results[code] = current + value
+            elif function == 'min':
+                if value < current:
+                    results[code] = value
+            elif function == 'max':
+                if value > current:
+                    results[code] = value
+
+    def value(self, code: int) -> Any:
+        count = self.counts[code]
+        if self.function in ('count', 'sum'):
+            return count if self.function == 'count' else self.results[code] if count else 0
+        if not count:
+            return None
+        return self.results[code] / count if self.function == 'avg' else self.results[code]
+
+
+def _aggregate_stream(rows: Iterable[Sequence[Any]], aggregates: Mapping[Any, str], group_by: Optional[Any],
+                      chunk_rows: int) -> AggregateResult:
+    """Single pass over rows of the values of the aggregated columns followed by the group columns"""
+    functions = list(aggregates.values())
+    key_count = len(_group_columns(group_by))
+    totals = [_Accumulator(function) for function in functions]
+    groups = [_GroupAccumulator(function) for function in functions]
+    group_codes: dict[Any, int] = {}  # code of every group, hashing the key once per row
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_rows)):
+        columns = list(zip(*chunk))  # transposed, so every column is reduced by the builtins at once
+        for accumulator, values in zip(totals, columns):
+            accumulator.add(values)
+        if group_by is None:
+            continue
+        codes = []
+        code_of = group_codes.get
+        for key in zip(*columns[-key_count:]) if key_count else columns[-1]:
+            code = code_of(key)
+            if code is None:
+                code = group_codes[key] = len(group_codes)
+            codes.append(code)
+        for group_accumulator, values in zip(groups, columns):
+            group_accumulator.add(codes, values, len(group_codes))
+    try:
+        ordered = sorted(group_codes)
+    except TypeError:  # incomparable group values keep the order of their appearance
+        ordered = list(group_codes)
+    return AggregateResult({column: accumulator.value for column, accumulator in zip(aggregates, totals)},
+                           {key: {column: accumulator.value(group_codes[key])
+                                  for column, accumulator in zip(aggregates, groups)} for key in ordered})
@@ -0,0 +1,160 @@
+import gzip
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from importlib import resources
+from importlib.resources.abc import Traversable
+from pathlib import Path
+from typing import Optional, Union
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+#: The script shipped with pyspass as package data, required by ResultChoice and streamed pages
+SPASS_FORMS_JS: Traversable = resources.files(__package__).joinpath('spass_forms.js')
+
+_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CSS_WHITESPACE = re.compile(r'\s+')
+_CSS_PUNCTUATION = re.compile(r'\s*([{}:;,>])\s*')
+
+
+def minify_js(source: str) -> str:
+    """Conservative minification of javascript
+
+    Comments and indentation are removed, line breaks are kept, so automatic semicolon insertion still works.
+    String literals are left untouched, regular expression literals containing "//" or "/*" are not supported.
+    """
+    result: list[str] = []
+    i, length = 0, len(source)
+    while i < length:
+        char = source[i]
+        if char in '\'"`':
+            end = i + 1
+            while end < length and source[end] != char:
+                end += 2 if source[end] == '\\' else 1
+            result.append(source[i:end + 1])
+            i = end + 1
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = length if end < 0 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = length if end < 0 else end + 2
+        else:
+            result.append(char)
+            i += 1
+    lines = (line.strip() for line in ''.join(result).splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+def minify_css(source: str) -> str:
+    source = _CSS_COMMENT.sub('', source)
+    source = _CSS_WHITESPACE.sub(' ', source)
+    return _CSS_PUNCTUATION.sub(r'\1', source).replace(';}', '}').strip()
+
+
+@dataclass(frozen=True)
+class Asset:
+    #: The name used in the page code, e.g. "static/spass_forms.js"
+    name: str
+    #: The fingerprinted url, e.g. "static/spass_forms.3f2a9c01d4.js"
+    url: str
+    #: The minified content
+    content: str
+
+    @property
+    def size(self) -> int:
+        return len(self.content.encode('utf-8'))
+
+
+class AssetManager:
+    """Minifies static files, writes them with content hashes in their names and precompressed variants
+
+    Since the names change with the content, the files can be served with :attr:`CACHE_CONTROL`, i.e. cached
+    forever by browsers. Pages refer to the assets by their plain names, e.g. ``head.script(src='static/app.js')``,
+    which are replaced by the fingerprinted urls, if the page belongs to an app with this manager as
+    ``assets`` attribute. Register all assets before the first page is rendered, since the static head of an
+    app is rendered only once.
+
+    :param output_dir: Folder the fingerprinted files are written to, i.e. the static folder of the web server.
+    :param url_prefix: Url under which output_dir is served.
+    :param inline_max_bytes: Scripts and stylesheets up to this size are embedded in the page instead.
+    :param compress: Write .gz and, if the brotli package is installed, .br variants.
+    """
+
+    CACHE_CONTROL = 'public, max-age=31536000, immutable'
+    MINIFIERS = {'.js': minify_js, '.css': minify_css}
+
+    def __init__(self, output_dir: Union[str, Path], url_prefix: str = 'static/', inline_max_bytes: int = 0,
+                 compress: bool = True):
+        self.output_dir = Path(output_dir)
+        self.url_prefix = url_prefix
+        self.inline_max_bytes = inline_max_bytes
+        self.compress = compress
+        self._assets: dict[str, Asset] = {}
+
+    def register(self, path: Union[str, Path, Traversable], name: Optional[str] = None) -> Asset:
+        """Process a static file and make it available under its fingerprinted url
+
+        :param path: Path of the source file, or a resource of a package, see :mod:`importlib.resources`.
+        :param name: Name used in the page code, defaults to url_prefix and the file name.
+        """
+        if isinstance(path, str):
+            path = Path(path)
+        source = path.read_text(encoding='utf-8')
+        stem, suffix = os.path.splitext(path.name)
+        minifier = self.MINIFIERS.get(suffix)
+        content = minifier(source) if minifier else source
+        data = content.encode('utf-8')
+        file_name = f"{stem}.{hashlib.sha256(data).hexdigest()[:10]}{suffix}"
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        target = self.output_dir / file_name
+        if not target.exists():
+            target.write_bytes(data)
+            if self.compress:
+                (self.output_dir / (file_name + '.gz')).write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    (self.output_dir / (file_name + '.br')).write_bytes(brotli.compress(data))
+        asset = Asset(name=name or self.url_prefix + path.name, url=self.url_prefix + file_name, content=content)
+        self._assets[asset.name] = asset
+        return asset
+
+    def register_bundled(self) -> Asset:
+        """Register the script shipped with pyspass under its default name "static/spass_forms.js" """
+        return self.register(SPASS_FORMS_JS, name='static/spass_forms.js')
+
+    def fingerprint(self) -> str:
+        """The fingerprinted urls of all assets and the inlining limit, which determine the html referring to them"""
+        return f"{self.inline_max_bytes}{sorted((name, asset.url) for name, asset in self._assets.items())}"
+
+    def get(self, name: str) -> Optional[Asset]:
+        return self._assets.get(name)
+
+    def url(self, name: str) -> str:
+        """The fingerprinted url of a registered asset, other names are returned unchanged"""
+        asset = self._assets.get(name)
+        return asset.url if asset else name
+
+    def inline_content(self, name: str) -> Optional[str]:
+        """The content of the asset, if it is small enough to be embedded into the page"""
+        asset = self._assets.get(name)
+        if asset is not None and asset.size <= self.inline_max_bytes:
+            return asset.content
+        return None
+
+    def precompressed(self, file_name: str, accept_encoding: str = '') -> tuple[Path, Optional[str]]:
+        """Choose the best variant of a written file for the Accept-Encoding header of a request
+
+        :return: Path of the file and the value for the Content-Encoding header, None if uncompressed
+        """
+        if Path(file_name).name != file_name:
+            raise ValueError(f"Invalid asset file name {file_name!r}")
+        accepted = {encoding.split(';')[0].strip() for encoding in accept_encoding.split(',')}
+        for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            candidate = self.output_dir / (file_name + suffix)
+            if encoding in accepted and candidate.exists():
+                return candidate, encoding
+        return self.output_dir / file_name, None
@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import Counter
+from logging import Logger, getLogger
+from typing import Optional
+
+
+class BudgetExceeded(Exception):
+    """A page exceeded a limit of its :class:`PageBudget`"""
+
+
+class PageBudget:
+    """Limits protecting the worker from pages growing out of bounds, e.g. by huge listings
+
+    Intended to be shared by all pages of an app, e.g. as class attribute of a :class:`PySpassApp`. Every page
+    tracks its consumption in its own :class:`BudgetUsage`, the budget counts the pages for monitoring in
+    :attr:`stats`:
+
+    - ``pages``: pages finished rendering
+    - ``near_limit``: pages that used at least ``warn_ratio`` of a limit
+    - ``truncated``: listings and tables cut short
+    - ``exceeded``: BudgetExceeded errors raised
+
+    Nodes are counted when they are added to a page. Listings created with the factories of the containers get
+    at most as many rows as fit into the remaining budget, listings added otherwise are cut when they are
+    added. Bytes and time are checked while tables are rendered, so big tables are cut while rendering. Pages
+    exceeding them by other content raise :class:`BudgetExceeded` once rendered, unless the budget truncates.
+
+    :param max_nodes: Maximum number of elements of a page.
+    :param max_bytes: Maximum size of the html, counted in characters.
+    :param max_seconds: Maximum duration of rendering.
+    :param truncate: Cut listings and tables and show :attr:`notice` instead of raising BudgetExceeded.
+    :param warn_ratio: Share of a limit, from which on a page is logged and counted as near the limit.
+    """
+
+    logger: Logger = getLogger(__name__)
+    #: Shown in the last row of cut listings and tables
+    notice: str = "Output truncated, {shown} of {total} rows shown."
+    #: Number of table rows rendered between two checks of bytes and time
+    check_interval: int = 50
+
+    def __init__(self, max_nodes: Optional[int] = None, max_bytes: Optional[int] = None,
+                 max_seconds: Optional[float] = None, truncate: bool = True, warn_ratio: float = 0.8):
+        self.max_nodes = max_nodes
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.truncate = truncate
+        self.warn_ratio = warn_ratio
+        self.stats: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+
+class BudgetUsage:
+    """Consumption of one page, see :attr:`HtmlPage.usage`"""
+
+    def __init__(self, budget: PageBudget):
+        self.budget = budget
+        self.nodes = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.truncated = 0
+        self._render_start: Optional[float] = None
+        self._out: Optional[list[str]] = None
+        self._mark = 0
+
+    def ratios(self) -> dict[str, float]:
+        """Used share of every configured limit"""
+        ratios = {}
+        for name, used, limit in (('nodes', self.nodes, self.budget.max_nodes),
+                                  ('bytes', self.bytes, self.budget.max_bytes),
+                                  ('seconds', self.seconds, self.budget.max_seconds)):
+            if limit:
+                ratios[name] = used / limit
+        return ratios
+
+    def remaining_nodes(self) -> Optional[int]:
+        return None if self.budget.max_nodes is None else max(self.budget.max_nodes - self.nodes, 0)
+
+    def fail(self, message: str) -> None:
+        self.budget.count('exceeded')
+        raise BudgetExceeded(message)
+
+    def add_nodes(self, count: int) -> None:
+        """Count added nodes, the count is left unchanged if they exceed the budget"""
+        if self.budget.max_nodes is not None and self.nodes + count > self.budget.max_nodes:
+            self.fail(f"Page exceeds the budget of {self.budget.max_nodes} nodes")
+        self.nodes += count
+
+    def count_truncation(self) -> None:
+        self.truncated += 1
+        self.budget.count('truncated')
+
+    def start_render(self) -> None:
+        self._render_start = time.perf_counter()
+        self._out, self._mark = None, 0
+        self.bytes = 0
+
+    def account(self, out: list[str]) -> None:
+        """Add the html rendered into out since the last call, out may be a new list for every chunk"""
+        if out is not self._out:
+            self._out, self._mark = out, 0
+        self.bytes += sum(map(len, out[self._mark:]))
+        self._mark = len(out)
+
+    def render_exhausted(self, out: list[str]) -> bool:
+        """Account the html rendered into out, True if bytes or time are used up
+
+        Raises BudgetExceeded instead, if the budget does not truncate.
+        """
+        self.account(out)
+        if self._render_start is None:
+            self._render_start = time.perf_counter()
+        self.seconds = time.perf_counter() - self._render_start
+        message = self._exceeded()
+        if message is None:
+            return False
+        if not self.budget.truncate:
+            self.fail(message)
+        return True
+
+    def _exceeded(self) -> Optional[str]:
+        """The message of the exceeded limit of bytes or time, if any"""
+        budget = self.budget
+        if budget.max_bytes is not None and self.bytes > budget.max_bytes:
+            return f"Page exceeds the budget of {budget.max_bytes} bytes"
+        if budget.max_seconds is not None and self.seconds > budget.max_seconds:
+            return f"Rendering exceeds the budget of {budget.max_seconds} seconds"
+        return None
+
+    def finish_render(self, out: list[str]) -> None:
+        """Account the rest of the page and count it for the stats of the budget
+
+        Raises BudgetExceeded, if the page exceeds bytes or time and the budget does not truncate.
+        """
+        self.account(out)
+        if self._render_start is not None:
+            self.seconds = time.perf_counter() - self._render_start
+        message = self._exceeded()
+        if message is not None and not self.budget.truncate:
+            self.fail(message)
+        self.budget.count('pages')
+        ratios = self.ratios()
+        if ratios and max(ratios.values()) >= self.budget.warn_ratio:
+            self.budget.count('near_limit')
+            usage = ', '.join(f"{name} {ratio:.0%}" for name, ratio in ratios.items())
+            self.budget.logger.warning(f"Page near its budget: {usage}, {self.truncated} truncated")
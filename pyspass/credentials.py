@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import inspect
+import threading
+import time
+import weakref
+from collections import OrderedDict, Counter
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from logging import Logger, getLogger
+from typing import Any, Optional
+
+
+class CredentialVerifier:
+    """Runs slow credential checks in a bounded thread pool, or bounded on the event loop for coroutine checks
+
+    Intended to be shared by all requests of an app, e.g. as class attribute of a :class:`PySpassApp`.
+
+    - At most ``max_workers`` checks run at the same time, at most ``max_pending`` attempts are accepted at all.
+      Further attempts are rejected at once instead of occupying a worker of the web server.
+    - Concurrent attempts with the same username and password share a single check.
+    - After ``max_failures`` failed attempts for a username, further attempts are rejected without running the
+      check for ``lockout_seconds``, doubling with every further failure up to ``lockout_max``.
+
+    :param max_workers: Number of threads running checks, and of coroutine checks awaited at once per event loop.
+    :param max_pending: Number of accepted attempts, running or waiting.
+    :param timeout: Seconds to wait for a check, the attempt fails afterwards.
+    :param max_failures: Number of failures per username before throttling starts.
+    :param lockout_seconds: Initial lockout after reaching max_failures.
+    :param lockout_max: Upper limit of the lockout.
+    :param max_tracked_users: Number of usernames with failures kept, the oldest are forgotten first.
+    """
+
+    logger: Logger = getLogger(__name__)
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 8, timeout: float = 10.0, max_failures: int = 5,
+                 lockout_seconds: float = 30.0, lockout_max: float = 900.0, max_tracked_users: int = 10000):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.max_failures = max_failures
+        self.lockout_seconds = lockout_seconds
+        self.lockout_max = lockout_max
+        self.max_tracked_users = max_tracked_users
+        #: Counts of "verified", "failed", "coalesced", "rejected_busy", "throttled" and "timeout"
+        self.stats: Counter[str] = Counter()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pyspass-credentials')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._in_flight: dict[tuple[str, bytes], Future] = {}
+        self._tasks: dict[tuple[asyncio.AbstractEventLoop, str, bytes], asyncio.Task] = {}
+        self._loop_limits: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = \
+            weakref.WeakKeyDictionary()
+        self._failures: OrderedDict[str, tuple[int, float]] = OrderedDict()
+
+    def is_throttled(self, username: str) -> bool:
+        with self._lock:
+            _, blocked_until = self._failures.get(username, (0, 0.0))
+        return blocked_until > time.monotonic()
+
+    def submit(self, username: str, password: str, check: Callable[[str, str], Any]) -> Optional[Future]:
+        """Start the check in the thread pool or join a running one for the same credentials
+
+        :param check: The actual check, e.g. ``PySpassApp.affirm_credentials``. Coroutine functions are awaited
+                      on the event loop by :meth:`verify_async` instead.
+        :return: Future of the check result, None if the attempt is rejected.
+        """
+        if inspect.iscoroutinefunction(check):
+            raise ValueError("Coroutine functions are checked by verify_async")
+        if self._throttle(username):
+            return None
+        key = (username, hashlib.sha256(password.encode('utf-8')).digest())
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.stats['coalesced'] += 1
+                return future
+            if not self._acquire_slot():
+                return None
+            try:
+                future = self._executor.submit(self._run, check, username, password)
+            except Exception:  # e.g. after shutdown
+                self._slots.release()
+                raise
+            self._in_flight[key] = future
+        future.add_done_callback(lambda done: self._finish(self._in_flight, key, username, done))
+        return future
+
+    def _submit_async(self, username: str, password: str,
+                      check: Callable[[str, str], Any]) -> Optional[asyncio.Task]:
+        """Start the coroutine check on the running event loop or join a running one, see :meth:`submit`"""
+        if self._throttle(username):
+            return None
+        loop = asyncio.get_running_loop()
+        key = (loop, username, hashlib.sha256(password.encode('utf-8')).digest())
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is not None:
+                self.stats['coalesced'] += 1
+                return task
+            if not self._acquire_slot():
+                return None
+            try:
+                task = loop.create_task(self._run_async(loop, check, username, password))
+            except Exception:
+                self._slots.release()
+                raise
+            self._tasks[key] = task
+        task.add_done_callback(lambda done: self._finish(self._tasks, key, username, done))
+        return task
+
+    def _throttle(self, username: str) -> bool:
+        """True if the attempt is rejected because of repeated failures"""
+        if not self.is_throttled(username):
+            return False
+        self.stats['throttled'] += 1
+        self.logger.warning(f"Login attempt for {username!r} throttled after repeated failures")
+        return True
+
+    def _acquire_slot(self) -> bool:
+        if self._slots.acquire(blocking=False):
+            return True
+        self.stats['rejected_busy'] += 1
+        self.logger.warning("Login attempt rejected, too many pending credential checks")
+        return False
+
+    def verify(self, username: str, password: str, check: Callable[[str, str], Any]) -> bool:
+        """Blocking verification, returns False for rejected and timed out attempts"""
+        future = self.submit(username, password, check)
+        if future is None:
+            return False
+        try:
+            return bool(future.result(timeout=self.timeout))
+        except FutureTimeoutError:
+            self.stats['timeout'] += 1
+            self.logger.warning(f"Credential check for {username!r} timed out")
+            return False
+
+    async def verify_async(self, username: str, password: str, check: Callable[[str, str], Any]) -> bool:
+        """Variant of :meth:`verify` for event loops
+
+        Coroutine functions are awaited on the running loop, so they may use clients bound to it, e.g. pools of
+        async database drivers. Other checks run in the thread pool.
+        """
+        if inspect.iscoroutinefunction(check):
+            task = self._submit_async(username, password, check)
+            if task is None:
+                return False
+            waiter: Any = asyncio.shield(task)  # a timed out attempt leaves the check to the others sharing it
+        else:
+            future = self.submit(username, password, check)
+            if future is None:
+                return False
+            waiter = asyncio.wrap_future(future)
+        try:
+            return bool(await asyncio.wait_for(waiter, self.timeout))
+        except asyncio.TimeoutError:
+            self.stats['timeout'] += 1
+            self.logger.warning(f"Credential check for {username!r} timed out")
+            return False
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _run(check: Callable[[str, str], Any], username: str, password: str) -> bool:
+        return bool(check(username, password))
+
+    async def _run_async(self, loop: asyncio.AbstractEventLoop, check: Callable[[str, str], Any], username: str,
+                         password: str) -> bool:
+        with self._lock:
+            limit = self._loop_limits.get(loop)
+            if limit is None:
+                limit = self._loop_limits[loop] = asyncio.Semaphore(self.max_workers)
+        async with limit:
+            return bool(await check(username, password))
+
+    def _finish(self, in_flight: dict, key: tuple, username: str, future: Any) -> None:
+        with self._lock:
+            in_flight.pop(key, None)
+            self._slots.release()
+            success = not future.cancelled() and future.exception() is None and future.result()
+            if success:
+                self.stats['verified'] += 1
+                self._failures.pop(username, None)
+                return
+            self.stats['failed'] += 1
+            failures, _ = self._failures.pop(username, (0, 0.0))
+            failures += 1
+            blocked_until = 0.0
+            if failures >= self.max_failures:
+                lockout = min(self.lockout_seconds * 2 ** (failures - self.max_failures), self.lockout_max)
+                blocked_until = time.monotonic() + lockout
+            self._failures[username] = (failures, blocked_until)
+            while len(self._failures) > self.max_tracked_users:
+                self._failures.popitem(last=False)
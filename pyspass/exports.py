@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from itertools import islice
+from operator import itemgetter
+from typing import Any
+
+from .sources import RowSource
+
+#: Content types of the export formats, e.g. for the mimetype of a streamed response
+EXPORT_FORMATS = {'csv': 'text/csv; charset=utf-8', 'ndjson': 'application/x-ndjson'}
+
+# text starting with these is evaluated as formula by spreadsheets
+_FORMULA_START = ('=', '+', '-', '@', '\t', '\r')
+
+
+def iter_rows(rows: Any, columns: Sequence[Any], chunk_rows: int = 1000) -> Iterator[Sequence[Any]]:
+    """The values of the columns of every row, fetched lazily in chunks
+
+    :param rows: Iterable of mappings like the content of a listing, a :class:`RowSource`, a DB-API cursor,
+                 a SQLAlchemy result or a pandas DataFrame.
+    :param columns: Names of the columns in the order of the values.
+    :param chunk_rows: Number of rows fetched at once from cursors and row sources.
+    """
+    if hasattr(rows, 'itertuples') and hasattr(rows, 'columns'):  # pandas DataFrame, without importing pandas
+        yield from _positional(rows.itertuples(index=False, name=None), list(rows.columns), columns)
+    elif hasattr(rows, 'fetchmany'):  # DB-API cursor or SQLAlchemy result
+        names = list(rows.keys()) if hasattr(rows, 'keys') else [column[0] for column in rows.description]
+        yield from _positional(_fetch_all(rows, chunk_rows), names, columns)
+    elif isinstance(rows, RowSource):
+        for offset in range(0, len(rows), chunk_rows):
+            yield from _by_name(rows.rows(offset, chunk_rows), columns)
+    else:
+        yield from _by_name(rows, columns)
+
+
+def _fetch_all(cursor: Any, chunk_rows: int) -> Iterator[Sequence[Any]]:
+    while batch := cursor.fetchmany(chunk_rows):
+        yield from batch
+
+
+def _positional(rows: Iterable[Sequence[Any]], names: list[Any], columns: Sequence[Any]) -> Iterator[list[Any]]:
+    positions = [names.index(column) for column in columns]
+    for row in rows:
+        yield [row[position] for position in positions]
+
+
+def _by_name(rows: Iterable[Any], columns: Sequence[Any]) -> Iterator[Sequence[Any]]:
+    getter = itemgetter(*columns) if len(columns) > 1 else None  # tuple of the values, without a loop per row
+    for row in rows:
+        if getter is not None:
+            try:
+                values = getter(row)
+            except KeyError:  # mapping without some of the columns
+                pass
+            else:
+                yield values
+                continue
+        if type(row) is dict or isinstance(row, Mapping):
+            yield [row.get(column) for column in columns]
+        else:
+            yield [row[column] for column in columns]
+
+
+def export_rows(rows: Any, columns: Sequence[Any], labels: Sequence[Any],
+                codes: Mapping[Any, Mapping[str, Any]] | None = None, export_format: str = 'csv',
+                chunk_rows: int = 1000) -> Iterator[str]:
+    """Stream the rows as csv with a header line or as ndjson objects keyed by the labels
+
+    Only one chunk of rows is held at a time, so the export runs in constant memory. Every yielded string
+    contains chunk_rows rows, the first one starts with the header for csv. Text in csv cells which a spreadsheet
+    would evaluate as formula, e.g. ``=cmd|calc``, is prefixed by ``'``.
+
+    :param rows: See :func:`iter_rows`.
+    :param columns: Names of the exported columns.
+    :param labels: Names shown for the columns, e.g. from the mapping of a listing.
+    :param codes: Translations of values by column name, looked up by the values as string.
+    :param export_format: One of :data:`EXPORT_FORMATS`.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Export format {export_format} not supported")
+    return _export_chunks(rows, columns, labels, codes, export_format, chunk_rows)
+
+
+def _export_chunks(rows: Any, columns: Sequence[Any], labels: Sequence[Any],
+                   codes: Mapping[Any, Mapping[str, Any]] | None, export_format: str,
+                   chunk_rows: int) -> Iterator[str]:
+    translations = [(position, codes[column]) for position, column in enumerate(columns) if codes and column in codes]
+    values = iter_rows(rows, columns, chunk_rows)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    keys = [str(label) for label in labels]
+    encode = json.JSONEncoder(ensure_ascii=False, default=str).encode  # json.dumps creates one per call
+    if export_format == 'csv':
+        writer.writerow(_neutralize(keys))
+    while chunk := list(islice(values, chunk_rows)):
+        if translations:  # the values of a row may be a tuple
+            chunk = [list(row) for row in chunk]
+            for row in chunk:
+                for position, mapping in translations:
+                    row[position] = mapping.get(str(row[position]), row[position])
+        if export_format == 'csv':
+            writer.writerows(map(_neutralize, chunk))
+        else:
+            buffer.write(''.join([f'{encode(dict(zip(keys, row)))}\n' for row in chunk]))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if export_format == 'csv' and buffer.tell():  # header of an empty export
+        yield buffer.getvalue()
+
+
+def _neutralize(row: Sequence[Any]) -> list[Any]:
+    """The values of the row with formulas turned into text"""
+    return [f"'{value}" if isinstance(value, str) and value.startswith(_FORMULA_START) else value for value in row]
@@ -0,0 +1,57 @@
+import re
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import methodcaller
+from typing import Any, Union
+
+_STRFTIME = re.compile(r'%[a-zA-Z]')
+
+
+@dataclass(frozen=True)
+class ColumnFormat:
+    """Format of the values of a column, see :func:`compile_format`
+
+    :param spec: Format specification of numbers like ``',.2f'`` or ``'.1%'``, or a strftime pattern of dates like
+                 ``'%d.%m.%Y'``.
+    :param none: Text shown for None.
+    """
+    spec: str = ''
+    none: str = ''
+
+
+#: Format of a column, a format specification, a :class:`ColumnFormat` or a callable returning the text of a value
+FormatSpec = Union[str, ColumnFormat, Callable[[Any], str]]
+
+
+def compile_format(column_format: FormatSpec) -> Callable[[Any], str]:
+    """The function turning a value into text by the format, compiled once per format
+
+    Values the format does not apply to, e.g. text in a column of numbers, are converted by ``str()``.
+    """
+    if isinstance(column_format, str):
+        return _compile(column_format, '')
+    if isinstance(column_format, ColumnFormat):
+        return _compile(column_format.spec, column_format.none)
+    return column_format
+
+
+@lru_cache(maxsize=256)
+def _compile(spec: str, none: str) -> Callable[[Any], str]:
+    # bound methods, so the conversion runs without python code besides the check for None
+    convert = methodcaller('strftime', spec) if _STRFTIME.search(spec) else f'{{:{spec}}}'.format
+
+    def format_value(value: Any) -> str:
+        if value is None:
+            return none
+        try:
+            return convert(value)
+        except (TypeError, ValueError, AttributeError):
+            return str(value)
+    return format_value
+
+
+def compile_formats(formats: Mapping[Any, FormatSpec] | None) -> dict[Any, Callable[[Any], str]]:
+    """Formatters by column"""
+    return {column: compile_format(column_format) for column, column_format in (formats or {}).items()}
+
@@ -0,0 +1,139 @@
+import threading
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+from logging import Logger, getLogger
+from time import perf_counter
+from typing import Any, Optional
+
+_active_profile: ContextVar[Optional['RenderProfile']] = ContextVar('pyspass_render_profile', default=None)
+
+
+@dataclass
+class ComponentStats:
+    """Measurements of all components of one class with the same id
+
+    Times are inclusive, i.e. the render time of a listing contains the render time of its table.
+    """
+    component: str
+    id_html: Optional[str]
+    #: Number of components summed up
+    count: int = 0
+    build_seconds: float = 0.0
+    render_seconds: float = 0.0
+    #: Number of elements, including the component itself and e.g. the options of a select
+    nodes: int = 0
+    #: Size of the rendered html in utf-8
+    bytes: int = 0
+
+    @property
+    def key(self) -> str:
+        return f"{self.component}#{self.id_html}" if self.id_html else self.component
+
+
+class RenderProfile:
+    """Records build and render times, node counts and html sizes of the components built or rendered within it
+
+    Use as context manager, the report is passed to the sink or logged when the block is left::
+
+        with RenderProfile(sink=stats.extend):
+            app.build()
+            html = app.page.html
+
+    Profiled components are listings, tables, forms, selects and deferred nodes. Without an active profile the
+    instrumentation costs one context variable lookup per component. The profile is bound to the context, so
+    parallel requests in other threads or tasks are not recorded, unless they run in a copy of the context,
+    like the producers of deferred nodes.
+
+    :param sink: Callable receiving the list of :class:`ComponentStats`, if None the stats are logged.
+    :param logger: Logger for the report, e.g. ``PySpassApp.logger``.
+    """
+
+    def __init__(self, sink: Optional[Callable[[list[ComponentStats]], Any]] = None,
+                 logger: Optional[Logger] = None):
+        self.sink = sink
+        self.logger = logger or getLogger(__name__)
+        self._nodes: dict[int, tuple[Any, ComponentStats]] = {}
+        self._lock = threading.Lock()
+        self._token = None
+
+    def __enter__(self) -> 'RenderProfile':
+        self._token = _active_profile.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        _active_profile.reset(self._token)
+        self.report()
+
+    def _stats_of(self, node: Any) -> ComponentStats:
+        entry = self._nodes.get(id(node))
+        if entry is None:
+            entry = self._nodes[id(node)] = (node, ComponentStats(node.__class__.__name__, None))
+        return entry[1]
+
+    def record_build(self, node: Any, seconds: float) -> None:
+        with self._lock:
+            self._stats_of(node).build_seconds += seconds
+
+    def record_render(self, node: Any, seconds: float, nodes: int, size: int) -> None:
+        with self._lock:
+            stats = self._stats_of(node)
+            stats.render_seconds += seconds
+            stats.nodes = nodes
+            stats.bytes += size
+
+    @property
+    def stats(self) -> list[ComponentStats]:
+        """Stats summed up by component class and id, the most expensive first"""
+        summed: dict[tuple[str, Optional[str]], ComponentStats] = {}
+        with self._lock:
+            entries = list(self._nodes.values())
+        for node, stats in entries:
+            id_html = getattr(node, 'id_html', None)
+            total = summed.setdefault((stats.component, id_html), ComponentStats(stats.component, id_html))
+            total.count += 1
+            total.build_seconds += stats.build_seconds
+            total.render_seconds += stats.render_seconds
+            total.nodes += stats.nodes
+            total.bytes += stats.bytes
+        return sorted(summed.values(), key=lambda total: -(total.build_seconds + total.render_seconds))
+
+    def report(self) -> None:
+        stats = self.stats
+        if self.sink is not None:
+            self.sink(stats)
+            return
+        for total in stats:
+            self.logger.info(f"Render profile {total.key}: {total.count}x, build {total.build_seconds * 1e3:.2f} ms, "
+                             f"render {total.render_seconds * 1e3:.2f} ms, {total.nodes} nodes, {total.bytes} bytes")
+
+
+def profiled_build(method: Callable) -> Callable:
+    """Record the duration of a method building a component, e.g. its constructor"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profile = _active_profile.get()
+        if profile is None:
+            return method(self, *args, **kwargs)
+        start = perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            profile.record_build(self, perf_counter() - start)
+    return wrapper
+
+
+def profiled_render(method: Callable) -> Callable:
+    """Record duration, node count and html size of a ``_render`` method"""
+    @wraps(method)
+    def wrapper(self, out: list[str], depth: int, compact: bool) -> None:
+        profile = _active_profile.get()
+        if profile is None:
+            return method(self, out, depth, compact)
+        mark = len(out)
+        start = perf_counter()
+        method(self, out, depth, compact)
+        seconds = perf_counter() - start
+        profile.record_render(self, seconds, self.count_nodes(), len(''.join(out[mark:]).encode('utf-8')))
+    return wrapper
@@ -0,0 +1,84 @@
+import json
+from collections.abc import Iterable
+from decimal import Decimal
+from typing import Any
+
+#: Types whose string representation never contains characters that have to be escaped
+_PLAIN_TYPES = frozenset((int, float, bool, Decimal))
+#: Joins the values of a column for escaping them at once
+_SEPARATOR = '\x00'
+
+
+class Markup(str):
+    """A string that is already valid html and is inserted into pages without escaping
+
+    Every object with an ``__html__`` method is treated the same way, so markup objects of other libraries like
+    markupsafe can be passed in as well.
+    """
+    __slots__ = ()
+
+    def __html__(self) -> 'Markup':
+        return self
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({super().__repr__()})"
+
+
+def escape_text(value: Any) -> str:
+    """Escape a value for the content of an element, markup is returned unchanged"""
+    if type(value) is str:
+        if '&' in value or '<' in value or '>' in value:
+            return value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        return value
+    if type(value) in _PLAIN_TYPES:
+        return str(value)
+    if hasattr(value, '__html__'):
+        return value.__html__()
+    return escape_text(str(value))
+
+
+def escape_attribute(value: Any) -> str:
+    """Escape a value for an attribute enclosed in double quotes, markup is returned unchanged"""
+    if type(value) is str:
+        if '&' in value or '<' in value or '>' in value or '"' in value:
+            return value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+        return value
+    if type(value) in _PLAIN_TYPES:
+        return str(value)
+    if hasattr(value, '__html__'):
+        return value.__html__()
+    return escape_attribute(str(value))
+
+
+def escape_column(values: Iterable[Any]) -> list[str]:
+    """Escape all values of a table column in one pass
+
+    The values are joined to one string, which is escaped as a whole and split again. This avoids a python
+    function call per value, escaping a column costs hardly more than converting its values to strings.
+    Columns containing :class:`Markup` are escaped value by value.
+    """
+    values = values if isinstance(values, list) else list(values)
+    if any(hasattr(value_type, '__html__') for value_type in set(map(type, values))):
+        return [escape_text(value) for value in values]
+    joined = _SEPARATOR.join(map(str, values))
+    if '&' in joined or '<' in joined or '>' in joined:
+        joined = joined.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    escaped = joined.split(_SEPARATOR)
+    if len(escaped) != len(values):  # the separator is part of a value
+        return [escape_text(value) for value in values]
+    return escaped
+
+
+def escape_js_string(value: Any) -> str:
+    """Escape a value for a javascript string literal in single quotes, e.g. within an onclick attribute"""
+    return str(value).replace('\\', '\\\\').replace("'", "\\'")
+
+
+def escape_json(data: Any) -> str:
+    """Compact json of the data for the content of a script element, ``<`` is escaped to end no element"""
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False, default=str).replace('<', '\\u003c')
+
+
+def escape(value: Any) -> Markup:
+    """Escape a value for the content of an element, e.g. before adding user input to a container"""
+    return Markup(escape_text(value))
@@ -1,14 +1,50 @@
+import asyncio
+import hashlib
+import inspect
+import threading
+import zlib
 from abc import abstractmethod, ABC
-from collections.abc import Mapping, Sequence, MutableMapping
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, as_completed
+from collections.abc import Mapping, Sequence, MutableMapping, Awaitable, Callable, Iterable
+from contextvars import copy_context
 from enum import Enum
+from functools import lru_cache
+from html import unescape
+from itertools import islice
 from logging import Logger, getLogger
 from typing import Optional, Union, Iterator, Any, Protocol
 
+from .adapters import WsgiRequest, AsgiRequest
+from .aggregates import AggregateResult, PivotResult, aggregate, pivot
+from .assets import AssetManager
+from .budgets import BudgetUsage, PageBudget
+from .credentials import CredentialVerifier
+from .exports import export_rows
+from .formats import FormatSpec, compile_formats
+from .instrumentation import ComponentStats, RenderProfile, profiled_build, profiled_render
+from .markup import escape_attribute, escape_column, escape_js_string, escape_json, escape_text
+from .sessions import SessionStore, StoredSession
+from .sources import RowSource, SequenceSource
+
+
+class RenderMode(Enum):
+    """Formatting of the rendered html
+
+    PRETTY puts every block element on its own line, indented by its nesting depth. Inline elements like cells,
+    options or links keep their content on one line. COMPACT emits no whitespace besides the one in the content.
+    """
+    PRETTY = 'pretty'
+    COMPACT = 'compact'
+
 
 class HtmlObject(ABC):
     """Abstract parent object for all HTML elements"""
     #: The string used within the html tags. E.g. "br" or "div" ...
     TAG: str
+    #: One level of indentation in pretty mode
+    INDENT: str = '  '
+    #: Mode used if none is given for rendering, set to RenderMode.COMPACT for production
+    render_mode: RenderMode = RenderMode.PRETTY
 
     ALIGNMENT_MAP = {'r': 'right',
                      'right': 'right',
@@ -19,24 +55,43 @@ class HtmlObject(ABC):
 
     root_app: Optional['PySpassApp'] = None
     parent: Optional['HtmlObject'] = None
+    #: The page, set by :meth:`HtmlContainer.add` for nodes added to a page, see :meth:`get_page`
+    _page: Optional['HtmlPage'] = None
+    #: True for forms, faster than checking the class
+    FORM: bool = False
+    #: The closest enclosing form, if _form_resolved, see :meth:`get_form`
+    _form: Optional['HtmlForm'] = None
+    _form_resolved: bool = False
+    #: True if a form has been added to the subtree, nested forms are rejected when the subtree is added. Not
+    #: cleared when the form is removed, see :meth:`HtmlContainer._has_form_below`
+    _contains_form: bool = False
 
     #: All elements included in the html tag in form of a dict
     tag_content: dict[str, Union[str, int, None]]
     #: All css styles included in the html tag in form of a dict
     css_styles: dict[str, Union[str, int]]
     #: Html id to be inserted in tag
-    _id_html: str | None
+    _id_html: str | None = None
     #: Html class to be inserted in tag
-    _class_html: str | None
-    #: Depth of indentation for nicely formatted html
-    indents: int = 0
+    _class_html: str | None = None
 
     def __init__(self, id_html: str | None = None, class_html: str | None = None):
         self.tag_content = {}
         self.css_styles = {}
-        self.id_html = id_html
-        self.class_html = class_html
-        self.indents: int = 0
+        if id_html is not None:
+            self.id_html = id_html
+        if class_html is not None:
+            self.class_html = class_html
+
+    @property
+    def indents(self) -> int:
+        """Nesting depth within the tree, i.e. depth of indentation for nicely formatted html"""
+        depth = 0
+        node = self.parent
+        while node is not None:
+            depth += 1
+            node = node.parent
+        return depth
 
     @property
     def id_html(self) -> str | None:
@@ -44,6 +99,8 @@ class HtmlObject(ABC):
 
     @id_html.setter
     def id_html(self, value) -> None:
+        if value and self._page is not None and self._page.index is not None:
+            self._page.index.replace_id(self, self.tag_content.get('id'), value)
         self._id_html = value
         if value:
             self.tag_content['id'] = value
@@ -54,56 +111,179 @@ class HtmlObject(ABC):
 
     @class_html.setter
     def class_html(self, value):
+        if value and self._page is not None and self._page.index is not None:
+            self._page.index.replace_classes(self, self.tag_content.get('class'), value)
         self._class_html = value
         if value:
             self.tag_content['class'] = value
 
+    def update_fingerprint(self, hasher) -> None:
+        """Feed everything that determines the rendered html of this object into the hash object"""
+        hasher.update(f"{self.__class__.__qualname__}{self.tag_content}{self.css_styles}".encode('utf-8'))
+
+    def attributes(self, extra: Optional[Mapping[str, Any]] = None) -> str:
+        """All attributes of the tag including the css styles, with a leading blank if not empty
+
+        The values are escaped, unless they are :class:`Markup`.
+
+        :param extra: Attributes added or overwritten just for rendering.
+        """
+        tag_content = self.tag_content if not extra else {**self.tag_content, **extra}
+        if self.css_styles:
+            tag_content = {**tag_content, 'style': self.style()}
+        return ''.join([f' {key}="{escape_attribute(value)}"' for key, value in tag_content.items()])
+
+    def style(self) -> str:
+        """The css styles as value for the style attribute"""
+        return ';'.join([f'{key}:{value}' for key, value in self.css_styles.items()])
+
+    def render(self, mode: Optional[RenderMode] = None) -> str:
+        """Render the object and all its children as html
+
+        :param mode: Formatting of the html, defaults to :attr:`render_mode`.
+        """
+        out: list[str] = []
+        self._render(out, 0, (mode or self.render_mode) is RenderMode.COMPACT)
+        return ''.join(out)
+
+    def _render(self, out: list[str], depth: int, compact: bool) -> None:
+        """Append the html of the object to out, the default renders an empty element like <input/>"""
+        if compact:
+            out.append(f'<{self.TAG}{self.attributes()}/>')
+        else:
+            out.append(f'{self.INDENT * depth}<{self.TAG}{self.attributes()}/>\n')
+
+    def __str__(self) -> str:
+        return self.render()
+
+    def count_nodes(self) -> int:
+        """Number of elements of the subtree, including this one"""
+        return 1
+
+    def get_page(self) -> Optional['HtmlPage']:
+        """The page the object belongs to, None if it has not been added to a page"""
+        node: Optional[HtmlObject] = self
+        while node is not None:
+            if node._page is not None:
+                return node._page
+            node = node.parent
+        return None
+
     def get_form(self) -> Optional['HtmlForm']:
-        """Recursive search for parent form, if exsiting
+        """The closest enclosing form, if existing
 
-        Raise error if nested form is detected.
+        The form is tracked by :meth:`HtmlContainer.add`, so it is known at once for objects added to a form or to
+        a container within the body of a page. For subtrees built separately and added as a whole, it is looked up
+        by walking up to the closest object with known form once.
         """
-        if not self.parent:
-            parent_form = None
+        node: HtmlObject = self
+        while not node._form_resolved:
+            parent = node.parent
+            if parent is None:
+                return None
+            if parent.FORM:
+                form = parent
+                break
+            node = parent
         else:
-            if isinstance(self.parent, HtmlForm):
-                parent_form = self.parent
-            else:
-                parent_form = self.parent.get_form()
-            if parent_form and (parent_form.get_form() or
-                                isinstance(self, HtmlForm)):
-                super_parent_form: Optional[HtmlForm] = parent_form.get_form()
-                debug_str = super_parent_form.id_html if super_parent_form else self.id_html
-                raise Exception(f"Nested forms detected! {parent_form.id_html} within {debug_str}.")
-        return parent_form
+            form = node._form
+        if node is not self:
+            self._form, self._form_resolved = form, True
+        return form
 
 
 class HtmlContainer(HtmlObject, list, ABC):
     """Abstract Html object for all Html objects that are container for further elements. E.g. div, p, form ..."""
 
+    #: Asset manager resolving script and stylesheet names, inherited by all children
+    assets: Optional[AssetManager] = None
+    #: Inline elements keep their content on the line of their tags in pretty mode
+    INLINE: bool = False
+
     def add(self, content: Union[HtmlObject, str, int, float]) -> HtmlObject:
         """Add and register an element to the container
 
-        Adding an element will set this object as the parent object and increase the indent counter.
+        Adding an element will set this object as the parent object, which determines its :attr:`indents`.
         If the element is a valid HtmlObject, this new child will be returned for further processing.
-        If the element is a string, then this parent object will be returned instead.
+        If the element is a string, then this parent object will be returned instead. Strings are inserted as html,
+        so user input has to be passed through :func:`escape` first.
 
         :param content: The content to be inserted into the container.
         """
+        if not isinstance(content, HtmlObject):
+            self.append(content)
+            return self
+        adds_form = content.FORM or (content._contains_form and content._has_form_below())
+        if adds_form:
+            self._check_form_below(content)  # before appending, so a rejected form is not left in the tree
         self.append(content)
-        if isinstance(content, HtmlObject):
-            content.parent = self
-            content.indents += 1
-            return content
-        return self
+        if self._page is not None:
+            try:
+                self._page.attach(content)
+            except Exception:  # e.g. exceeded budget, the page is unchanged
+                self.pop()
+                raise
+        moved = content.parent is not None
+        if adds_form:
+            self._mark_form_below()
+        content.parent = self
+        if self.FORM:
+            content._form, content._form_resolved = self, True
+        elif self._form_resolved:
+            content._form, content._form_resolved = self._form, True
+        else:
+            content._form_resolved = False
+        if moved and isinstance(content, HtmlContainer):
+            content._resolve_forms_below()
+        return content
+
+    def _check_form_below(self, content: HtmlObject) -> None:
+        """Reject the form or the subtree containing a form, if this container is part of a form"""
+        form = self if self.FORM else self.get_form()
+        if form is not None:
+            inner = content.id_html if content.FORM else f"form within {content.__class__.__name__}"
+            raise Exception(f"Nested forms detected! {inner} within {form.id_html}.")
+
+    def _has_form_below(self) -> bool:
+        """True if a form is part of the subtree, clears the note of :attr:`_contains_form` if it was removed"""
+        if not self._contains_form:
+            return False
+        stack = list(self)
+        while stack:
+            node = stack.pop()
+            if isinstance(node, HtmlObject) and node.FORM:
+                return True
+            if isinstance(node, list):
+                stack.extend(node)
+        self._contains_form = False
+        return False
+
+    def _mark_form_below(self) -> None:
+        """Note in this container and its ancestors, that a form is below them"""
+        node: Optional[HtmlObject] = self
+        while node is not None and not node._contains_form:
+            node._contains_form = True
+            node = node.parent
+
+    def _resolve_forms_below(self) -> None:
+        """Point the children to the new enclosing form after the container has been moved"""
+        stack: list[HtmlContainer] = [self]
+        while stack:
+            node = stack.pop()
+            form, resolved = (node, True) if node.FORM else (node._form, node._form_resolved)
+            for child in node:
+                if type(child) is not str and isinstance(child, HtmlObject):
+                    child._form, child._form_resolved = form, resolved
+                    if isinstance(child, HtmlContainer):
+                        stack.append(child)
 
     def br(self, count: int = 1) -> 'HtmlContainer':
         for i in range(count):
-            self.append('<br />\n')
+            self.append('<br />')
         return self
 
     def hr(self) -> 'HtmlContainer':
-        self.append('<hr />\n')
+        self.append('<hr />')
         return self
 
     def div(self, content=None, id_html: str | None = None, class_html: str | None = None) -> 'HtmlDiv':
@@ -151,6 +331,13 @@ class HtmlContainer(HtmlObject, list, ABC):
         self.add(link)
         return link
 
+    def deferred(self, producer: Callable[[], Any], id_html: str | None = None, class_html: str | None = None,
+                 placeholder: Optional[Any] = None, fingerprint_key: Optional[Any] = None) -> 'HtmlDeferred':
+        deferred = HtmlDeferred(producer, id_html=id_html, class_html=class_html, placeholder=placeholder,
+                                fingerprint_key=fingerprint_key)
+        self.add(deferred)
+        return deferred
+
     def label(self, content: str | None = None, for_id: str | None = None) -> 'HtmlLabel':
         label = HtmlLabel(content=content, for_id=for_id)
         self.add(label)
@@ -198,10 +385,26 @@ class HtmlContainer(HtmlObject, list, ABC):
         :param script_type: TODO
         :return: HtmlScript
         """
+        assets = self.get_assets()
+        if src and assets:
+            inline_content = assets.inline_content(src)
+            if inline_content is not None:
+                content, src = inline_content, None
+            else:
+                src = assets.url(src)
         script = HtmlScript(content=content, src=src, script_type=script_type)
         self.add(script)
         return script
 
+    def get_assets(self) -> Optional[AssetManager]:
+        """The asset manager of this container or of its closest parent having one"""
+        node: Optional[HtmlObject] = self
+        while node is not None:
+            if isinstance(node, HtmlContainer) and node.assets is not None:
+                return node.assets
+            node = node.parent
+        return None
+
     def dropdown(self, name: str, codes_source: Union[Sequence, Mapping], var_input: str | Sequence[str] | None = None,
                  autosubmit: bool = False, missing_allowed: bool = True, multiple: bool = False, size: int = 1,
                  optgroups: Mapping | None = None):
@@ -217,15 +420,23 @@ class HtmlContainer(HtmlObject, list, ABC):
     def textarea(self, name: str, var_input: str | None = None, rows: int = 4, cols: int = 50):
         return self.add(HtmlTextArea(**{key: value for key, value in locals().items() if key not in 'self'}))
 
-    def result_listing(self, content: Sequence, mapping=None, show_all: bool = False, rowcount_max: int = 200,
-                       alignments: str | None = None) -> Union['ResultListing', HtmlObject]:
-        return self.add(ResultListing(content, mapping, show_all, rowcount_max, alignments))
-
-    def result_choice(self, content: Sequence, listing_index: Union[str, Sequence], row_selected=None,
-                      mapping: Mapping[str, str] | None = None, show_all: bool = False,
-                      alignments: str | None = None, rowcount_max: int = 200) -> Union['ResultChoice', HtmlObject]:
+    def result_listing(self, content: Union[Sequence, RowSource], mapping=None, show_all: bool = False,
+                       rowcount_max: int = 200, alignments: str | None = None, client_side: bool = False,
+                       viewport: Optional[int] = None, fetch_url: str | None = None,
+                       formats: Optional[Mapping[Any, FormatSpec]] = None) -> Union['ResultListing', HtmlObject]:
+        return self.add(ResultListing(content, mapping, show_all, rowcount_max, alignments,
+                                      max_nodes=self._nodes_for_listing(), client_side=client_side,
+                                      viewport=viewport, fetch_url=fetch_url, formats=formats))
+
+    def result_choice(self, content: Union[Sequence, RowSource], listing_index: Union[str, Sequence],
+                      row_selected=None, mapping: Mapping[str, str] | None = None, show_all: bool = False,
+                      alignments: str | None = None, rowcount_max: int = 200, client_side: bool = False,
+                      viewport: Optional[int] = None, fetch_url: str | None = None,
+                      formats: Optional[Mapping[Any, FormatSpec]] = None) -> Union['ResultChoice', HtmlObject]:
         """Factory function for creation of ResultChoice"""
-        return self.add(ResultChoice(content, listing_index, row_selected, mapping, show_all, rowcount_max, alignments))
+        return self.add(ResultChoice(content, listing_index, row_selected, mapping, show_all, rowcount_max, alignments,
+                                     max_nodes=self._nodes_for_listing(), client_side=client_side,
+                                     viewport=viewport, fetch_url=fetch_url, formats=formats))
 
     def result_editor(self, content: Sequence, listing_index: Union[str, Sequence[str]],
                       row_selected: Union[str, Mapping, Sequence[Mapping]],
@@ -235,19 +446,77 @@ class HtmlContainer(HtmlObject, list, ABC):
                       columns_protected: Optional[Sequence[str]] = None,
                       alignments: str | None = None) -> Union['ResultEditor', HtmlObject]:
         return self.add(ResultEditor(content, listing_index, row_selected, mapping, show_all, rowcount_max,
-                                     columns_protected, alignments))
+                                     columns_protected, alignments, max_nodes=self._nodes_for_listing()))
+
+    def result_pivot(self, content: Any, index: Union[str, Sequence[str]], columns: Union[str, Sequence[str]],
+                     values: str, function: str = 'sum', mapping: Mapping[str, str] | None = None,
+                     alignments: str | None = None) -> Union['ResultPivot', HtmlObject]:
+        """Factory function for creation of ResultPivot"""
+        return self.add(ResultPivot(content, index, columns, values, function, mapping, alignments,
+                                    max_nodes=self._nodes_for_listing()))
+
+    def _nodes_for_listing(self) -> Optional[int]:
+        """Number of nodes a new listing may use, if the page has a truncating budget"""
+        usage = self._page.usage if self._page is not None else None
+        if usage is None or not usage.budget.truncate:
+            return None
+        return usage.remaining_nodes()
 
-    def __str__(self):
-        if self.css_styles:
-            css_styles_str = ';'.join([key + ':' + value for key, value in self.css_styles.items()])
-            self.tag_content['style'] = css_styles_str
-        tag_content_str = ' '.join([f'{key}="{value}"' for key, value in self.tag_content.items()])
-        return f"<{self.TAG}{' ' + tag_content_str if tag_content_str else ''}>" \
-               f"\n{''.join([str(child) for child in self])}\n</{self.TAG}>\n"
+    def update_fingerprint(self, hasher) -> None:
+        super().update_fingerprint(hasher)
+        for child in self:
+            if isinstance(child, HtmlObject):
+                child.update_fingerprint(hasher)
+            else:
+                hasher.update(f"\x00{child}".encode('utf-8'))
+        hasher.update(b'\x01')
+
+    def count_nodes(self) -> int:
+        return 1 + sum([child.count_nodes() for child in self if isinstance(child, HtmlObject)])
+
+    def open_tag(self) -> str:
+        """The opening tag of the container including all attributes"""
+        return f"<{self.TAG}{self.attributes()}>"
+
+    def close_tag(self) -> str:
+        return f"</{self.TAG}>"
+
+    def _render(self, out: list[str], depth: int, compact: bool) -> None:
+        if compact:
+            out.append(self.open_tag())
+            self._render_children(out, depth, True)
+            out.append(self.close_tag())
+        elif self.INLINE:
+            out.append(self.INDENT * depth + self.open_tag())
+            self._render_children(out, depth, True)
+            out.append(self.close_tag() + '\n')
+        else:
+            self._render_open(out, depth, compact)
+            self._render_children(out, depth + 1, compact)
+            self._render_close(out, depth, compact)
+
+    def _render_open(self, out: list[str], depth: int, compact: bool) -> None:
+        out.append(self.open_tag() if compact else f'{self.INDENT * depth}{self.open_tag()}\n')
+
+    def _render_close(self, out: list[str], depth: int, compact: bool) -> None:
+        out.append(self.close_tag() if compact else f'{self.INDENT * depth}{self.close_tag()}\n')
+
+    def _render_children(self, out: list[str], depth: int, compact: bool) -> None:
+        self._render_children_of(self, out, depth, compact)
+
+    def _render_children_of(self, children: Iterable[Any], out: list[str], depth: int, compact: bool) -> None:
+        for child in children:
+            if isinstance(child, HtmlObject):
+                child._render(out, depth, compact)
+            elif compact:
+                out.append(f'{child}')
+            else:
+                out.append(f'{self.INDENT * depth}{child}\n')
 
 
 class HtmlCell(HtmlContainer):
     TAG: str = 'td'
+    INLINE: bool = True
 
     def __init__(self, content=None):
         super().__init__()
@@ -277,31 +546,59 @@ class HtmlRow(HtmlContainer):
         :return: Returns the created cell or list of cells
         """
         if isinstance(content, list) or isinstance(content, tuple):
-            return [self.add(HtmlHeadCell(content_piece)) for content_piece in content]
+            return self.add_cells(content, head=True)
         else:
             return self.add(HtmlHeadCell(content))
 
+    def add_cells(self, values: Iterable[Any], head: bool = False) -> list[HtmlCell]:
+        """Add a cell for every value, much faster than calling :meth:`td` per value
+
+        The values are inserted like by :meth:`td`, strings as html and objects as children of the cells.
+
+        :param values: The contents of the cells.
+        :param head: Create header cells instead of data cells.
+        :return: The created cells
+        """
+        cell_class = HtmlHeadCell if head else HtmlCell
+        form, resolved = (self, True) if self.FORM else (self._form, self._form_resolved)
+        cells = []
+        for value in values:
+            child = value and type(value) is not str and isinstance(value, HtmlObject)
+            cell = cell_class(None if child else value)
+            # the state add would set up, without its checks per cell
+            cell.parent, cell._form, cell._form_resolved = self, form, resolved
+            if child:
+                cell.add(value)
+            cells.append(cell)
+        if self._page is not None:  # before extending, so cells exceeding the budget are not left in the row
+            self._page.attach_all(cells)
+        self.extend(cells)
+        return cells
+
     @property
     def cells(self) -> list[HtmlCell]:
         return self
 
 
 class HtmlTable(HtmlContainer):
+    """Object for standard HTML table
+
+    Styles of columns and of classes of rows are rendered as rules of a style element in front of the table,
+    scoped by a class generated from the rules, instead of an inline style for every cell.
+    """
     TAG: str = 'table'
 
-    column_styles = None
+    #: Css declarations per column index, see :meth:`set_column_style`
+    column_styles: Optional[dict[int, dict[str, str]]] = None
+    #: Css declarations per class of rows, see :meth:`set_row_style`
+    row_styles: Optional[dict[str, dict[str, str]]] = None
+    #: Class scoping the style rules of the table
+    _style_class: str | None = None
 
     def __init__(self):
         super().__init__()
         self._column_alignments = None
 
-    def __str__(self):
-        if self.css_styles:
-            css_styles_str = ';'.join([key + ':' + value for key, value in self.css_styles.items()])
-            self.tag_content['style'] = css_styles_str
-        tag_content_str = ' '.join([f'{key}="{value}"' for key, value in self.tag_content.items()])
-        return f'<{self.TAG} {tag_content_str}>{"".join([str(item) for item in self])}\n</{self.TAG}>\n'
-
     @property
     def header(self) -> Optional[HtmlRow]:
         return self[0] if len(self) > 0 else None
@@ -316,19 +613,121 @@ class HtmlTable(HtmlContainer):
         self.add(row)
         return row
 
+    def add_header(self, labels: Iterable[Any]) -> HtmlRow:
+        """Add a row of header cells, inserted as first row if the table has rows already, see :attr:`header`"""
+        row = self.tr()
+        row.add_cells(labels, head=True)
+        if len(self) > 1:
+            self.insert(0, self.pop())
+        return row
+
+    def add_rows(self, rows: Iterable[Iterable[Any]]) -> list[HtmlRow]:
+        """Add a row for every sequence of values, with a cell per value, see :meth:`HtmlRow.add_cells`
+
+        Builds big tables in a fraction of the time of :meth:`tr` and :meth:`HtmlRow.td`.
+
+        :return: The created rows
+        """
+        form, resolved = (self, True) if self.FORM else (self._form, self._form_resolved)
+        new_rows = []
+        for values in rows:
+            row = HtmlRow()
+            row.parent, row._form, row._form_resolved = self, form, resolved
+            row.add_cells(values)
+            new_rows.append(row)
+        if self._page is not None:  # before extending, so rows exceeding the budget are not left in the table
+            self._page.attach_all(new_rows)
+        self.extend(new_rows)
+        return new_rows
+
+    @profiled_render
+    def _render(self, out: list[str], depth: int, compact: bool) -> None:
+        if self._style_class is not None:
+            HtmlStyle(self.style_rules())._render(out, depth, compact)
+        usage = self._page.usage if self._page is not None else None
+        if usage is None:
+            return super()._render(out, depth, compact)
+        # checks bytes and time of the page budget every check_interval rows
+        check_interval = usage.budget.check_interval
+        self._render_open(out, depth, compact)
+        for number, row in enumerate(self):
+            if number and number % check_interval == 0 and usage.render_exhausted(out):  # after the header
+                usage.count_truncation()
+                self._render_children_of([self.notice_row(number - 1, len(self) - 1)], out, depth + 1, compact)
+                break
+            self._render_children_of([row], out, depth + 1, compact)
+        self._render_close(out, depth, compact)
+
+    def notice_row(self, shown: int, total: Any) -> HtmlRow:
+        """Row telling that only some rows are shown, see :class:`PageBudget`"""
+        row = HtmlRow(class_html='spass-truncated')
+        cell = row.td(escape_text(PageBudget.notice.format(shown=shown, total=total)))
+        cell.tag_content['colspan'] = len(self.header) if self.header else 1
+        return row
+
     def set_column_alignments(self, alignments: str):
         """Specify the alignments for contents in each column
 
         The alignments are given as a simple string with either c for center, l for left or r for right.
+        They replace the alignments set before and apply to rows added later as well.
         :param alignments: A string containing the alignments, e.g. "clr"
         :return: None
         """
-        for row in self:
-            for i, alignment in enumerate(alignments):
-                if i < len(row):  # FIXME: necessary?
-                    row[i].css_styles["text-align"] = self.ALIGNMENT_MAP[alignment]
-                else:
-                    break
+        for declarations in (self.column_styles or {}).values():
+            declarations.pop('text-align', None)
+        self.set_column_styles({i: {'text-align': self.ALIGNMENT_MAP[alignment]}
+                                for i, alignment in enumerate(alignments)})
+
+    def set_column_style(self, column: int, name: str, value: str) -> None:
+        """Set a css property for all cells of a column, see :meth:`set_column_styles` for several at once
+
+        :param column: Index of the column, starting with 0.
+        """
+        self.set_column_styles({column: {name: value}})
+
+    def set_column_styles(self, styles: Mapping[int, Mapping[str, str]]) -> None:
+        """Set css properties for all cells of several columns, e.g. ``{0: {'text-align': 'right'}}``
+
+        :param styles: Css declarations by index of the column, starting with 0. They are added to the declarations
+                       of the column set before.
+        """
+        if self.column_styles is None:
+            self.column_styles = {}
+        for column, declarations in styles.items():
+            self.column_styles.setdefault(column, {}).update(declarations)
+        self.column_styles = {column: declarations for column, declarations in self.column_styles.items()
+                              if declarations}
+        self._update_style_class()
+
+    def set_row_style(self, class_html: str, declarations: Mapping[str, str]) -> None:
+        """Set the css properties of the rows with the class, e.g. of selected rows"""
+        if self.row_styles is None:
+            self.row_styles = {}
+        if self.row_styles.get(class_html) != declarations:
+            self.row_styles[class_html] = dict(declarations)
+            self._update_style_class()
+
+    def style_rules(self) -> str:
+        """The css rules for the column and row styles, scoped to this table"""
+        scope = f'.{self._style_class}>*>tr'  # rows are within the tbody inserted by the browser
+        rules = [f'{scope}>:nth-child({column + 1}){{{self._declarations(declarations)}}}'
+                 for column, declarations in sorted((self.column_styles or {}).items())]
+        rules.extend(f'{scope}.{class_html}{{{self._declarations(declarations)}}}'
+                     for class_html, declarations in (self.row_styles or {}).items())
+        return ''.join(rules)
+
+    @staticmethod
+    def _declarations(declarations: Mapping[str, str]) -> str:
+        return ';'.join([f'{name}:{value}' for name, value in declarations.items()])
+
+    def _update_style_class(self) -> None:
+        """Derive the class scoping the style rules from the rules, so tables styled alike share it"""
+        rules = (sorted((self.column_styles or {}).items()), self.row_styles)  # in the order of the rendered rules
+        digest = hashlib.blake2b(repr(rules).encode('utf-8'), digest_size=4)
+        style_class = f'spass-t{digest.hexdigest()}'
+        classes = [name for name in (self.class_html or '').split() if name != self._style_class]
+        self._style_class = style_class
+        self.class_html = ' '.join(classes + [style_class])
 
 
 class ResultListing(HtmlContainer):
@@ -339,6 +738,19 @@ class ResultListing(HtmlContainer):
     :param show_all:
     :param rowcount_max:
     :param alignments:
+    :param max_nodes: Show only as many rows as fit into this number of elements and a notice, see
+                      :class:`PageBudget`. Set by the factories of the containers if the page has a budget.
+    :param client_side: Send the rows as json instead of html, the table is built in the browser by
+                        ``spass_forms.js``. Saves building and sending the markup of big listings.
+    :param viewport: Number of rows sent with the page, implies client_side. Further rows are fetched from
+                     fetch_url while scrolling, only the visible rows are kept in the document. The content may
+                     be a :class:`RowSource`, so huge results are never loaded at once, rowcount_max is ignored.
+    :param fetch_url: Url of the endpoint returning further rows, see :meth:`fragment_for`. The endpoint builds
+                      the listing the same way as the page.
+    :param formats: Format per column, e.g. ``{'amount': ',.2f', 'day': ColumnFormat('%d.%m.%Y', none='-')}``, see
+                    :func:`compile_format`. Only the values shown are formatted, column by column. Other columns
+                    show their values by ``str()``. Codes of a :class:`ResultChoice` are looked up by the
+                    formatted text.
 
     """
 
@@ -346,9 +758,41 @@ class ResultListing(HtmlContainer):
     content: Sequence[Any]
     columns_display: Sequence[Any]
     mapping: Optional[Mapping[str, str]]
-
-    def __init__(self, content: Sequence[Any], mapping: Optional[Mapping[str, str]] = None, show_all: bool = False,
-                 rowcount_max: int = 200, alignments=None):
+    #: True if rows were left out because of the page budget
+    truncated: bool = False
+    #: Data rendered as json for the client, if built client side
+    _island: Optional[dict[str, Any]] = None
+    #: Source of all rows, if the listing has a viewport
+    source: Optional[RowSource] = None
+    viewport: Optional[int] = None
+    fetch_url: str | None = None
+    #: Request fields of the position and size of the rows fetched by the client
+    OFFSET_FIELD: str = '_spass_offset'
+    LIMIT_FIELD: str = '_spass_limit'
+    #: Maximum number of rows per fetch
+    fetch_max: int = 1000
+    #: Css height of the scrolled area of listings with a viewport
+    scroll_height: str = '70vh'
+    #: Classes and css declarations of the rows added by :meth:`add_aggregates`
+    SUBTOTAL_CLASS: str = 'spass-subtotal'
+    TOTAL_CLASS: str = 'spass-total'
+    AGGREGATE_STYLE: Mapping[str, str] = {'font-weight': 'bold'}
+    #: Shown in the total row, in the first column without aggregate
+    total_label: str = 'Total'
+    #: Joins the values of several group columns in the label of a subtotal row
+    group_label_separator: str = ' / '
+    #: Format of aggregated floats, e.g. averages
+    aggregate_format: str = '{:.2f}'
+    #: Number of subtotal and total rows at the end of the table
+    _aggregate_rows: int = 0
+    #: Compiled formats by column
+    formatters: dict[Any, Callable[[Any], str]]
+
+    @profiled_build
+    def __init__(self, content: Union[Sequence[Any], RowSource], mapping: Optional[Mapping[str, str]] = None,
+                 show_all: bool = False, rowcount_max: int = 200, alignments=None, max_nodes: Optional[int] = None,
+                 client_side: bool = False, viewport: Optional[int] = None, fetch_url: str | None = None,
+                 formats: Optional[Mapping[Any, FormatSpec]] = None):
         """
 
         :param content:
@@ -357,49 +801,236 @@ class ResultListing(HtmlContainer):
         :param alignments:
         """
         super().__init__()
+        if viewport is not None:
+            if not fetch_url:
+                raise Exception("Listings with a viewport need a fetch_url for further rows")
+            self.source = content if isinstance(content, RowSource) else SequenceSource(content)
+            self.viewport, self.fetch_url = viewport, fetch_url
+            content = self.source.rows(0, viewport)
+            rowcount_max, client_side = viewport, True
         self.show_all = show_all
         self.content = content
         self.mapping = mapping if mapping else {}
         self.rowcount_max: int = rowcount_max
         self.columns_display = []
+        self.formatters = compile_formats(formats)
 
         tab: HtmlTable = super().table()
         self.table_ = tab
+        if client_side:
+            if content:
+                self.columns_display = self._derive_columnnames_for_display()
+                self._island = self._island_data(content)
+                if alignments:
+                    tab.set_column_alignments(alignments)
+            return
         headrow = tab.tr()
         if content:
             self.columns_display = self._derive_columnnames_for_display()
             if isinstance(content, dict):
                 headrow.th("KEY")
                 headrow.th("VALUE")
-                for key, value in content.items():
+                for key, value in zip(escape_column(content.keys()), escape_column(content.values())):
                     tablerow = tab.tr()
-                    tablerow.td(str(key))
-                    tablerow.td(str(value))
+                    tablerow.td(key)
+                    tablerow.td(value)
                     # FIXME implement column names
             else:
-                for key in self.columns_display:
-                    if isinstance(mapping, dict):
-                        headrow.th(self.mapping.get(key, key))
-                    else:
-                        headrow.th(key)
-                for rownum, row in enumerate(content):
-                    if rownum < rowcount_max:  # limitation of displayed rows
-                        tablerow = tab.tr()
-                        for key in self.columns_display:
-                            try:
-                                tablerow.td(str(row.get(key, '')))
-                            except AttributeError:
-                                try:
-                                    tablerow.td(str(row[key]))
-                                except KeyError:
-                                    tablerow.td("")
-                    else:
-                        break
+                if isinstance(mapping, dict):
+                    headrow.add_cells([escape_text(self.mapping.get(key, key)) for key in self.columns_display],
+                                      head=True)
+                else:
+                    headrow.add_cells([escape_text(key) for key in self.columns_display], head=True)
+                if max_nodes is not None and self._rows_fitting(max_nodes) < min(rowcount_max, len(content)):
+                    self.rowcount_max = rowcount_max = self._rows_fitting(max_nodes)
+                    self.truncated = True
+                rows = list(islice(content, rowcount_max))  # limitation of displayed rows
+                # values are escaped column by column, so repeated values are escaped once
+                columns = [escape_column(self._formatted_values(rows, key)) for key in self.columns_display]
+                tab.add_rows(zip(*columns) if columns else [()] * len(rows))
+                if self.truncated:
+                    tab.add(tab.notice_row(rowcount_max, len(content)))
             if alignments:
                 tab.set_column_alignments(alignments)
         else:
             pass  # no content, no rows
 
+    def _rows_fitting(self, max_nodes: int) -> int:
+        """Number of rows fitting into max_nodes besides listing, table, header, notice, aggregates and extra nodes"""
+        columns = len(self.columns_display)
+        aggregate_nodes = self._aggregate_rows * (columns + 1)
+        return max((max_nodes - 5 - columns - aggregate_nodes - self._extra_nodes()) // (columns + 1), 0)
+
+    def _extra_nodes(self) -> int:
+        """Number of nodes added to the listing after its construction"""
+        return 0
+
+    def truncate(self, row_count: int) -> None:
+        """Keep only the first row_count rows and show a notice instead of the others, aggregates are kept"""
+        rows_built = len(self.table_) - 1 - self._aggregate_rows
+        if self.truncated:
+            rows_built -= 1
+        if row_count >= rows_built and not self.truncated:
+            return
+        aggregate_rows = self.table_[len(self.table_) - self._aggregate_rows:]
+        del self.table_[min(row_count, rows_built) + 1:]
+        self.rowcount_max = min(row_count, rows_built)
+        self.truncated = True
+        self.table_.add(self.table_.notice_row(self.rowcount_max, len(self.content)))
+        self.table_.extend(aggregate_rows)
+
+    def _island_data(self, content: Sequence[Any]) -> dict[str, Any]:
+        """Header and column oriented values of the visible rows, see :meth:`_island_column`"""
+        if isinstance(content, dict):
+            return {'header': ['KEY', 'VALUE'], 'rows': len(content),
+                    'columns': [self._island_column(content.keys()), self._island_column(content.values())]}
+        rows = list(islice(content, self.rowcount_max))
+        island = {'header': self._island_column(self._labels()), 'rows': len(rows),
+                  'columns': self._island_columns(rows)}
+        if self.source is not None:
+            island.update({'total': len(self.source), 'fetch': self.fetch_url, 'chunk': self.viewport,
+                           'params': {'offset': self.OFFSET_FIELD, 'limit': self.LIMIT_FIELD},
+                           'height': self.scroll_height})
+        elif len(rows) < len(content):
+            island['notice'] = PageBudget.notice.format(shown=len(rows), total=len(content))
+        return island
+
+    def _labels(self) -> list[Any]:
+        """Names shown for the displayed columns"""
+        if not isinstance(self.mapping, dict):
+            return list(self.columns_display)
+        return [self.mapping.get(key, key) for key in self.columns_display]
+
+    def export(self, export_format: str = 'csv', rows: Optional[Any] = None, chunk_rows: int = 1000) -> Iterator[str]:
+        """Stream all rows with the columns and names shown, not limited by rowcount_max or the viewport
+
+        The chunks may be returned as streamed response, e.g. with flask::
+
+            return Response(listing.export('ndjson', rows=cursor), mimetype=EXPORT_FORMATS['ndjson'])
+
+        :param export_format: "csv" or "ndjson".
+        :param rows: The rows to export, defaults to the source or the content of the listing. Any iterable of rows
+                     like the content, a DB-API cursor, a SQLAlchemy result or a pandas DataFrame, which are read
+                     chunk by chunk, so even millions of rows are never held at once.
+        :param chunk_rows: Number of rows per chunk.
+        """
+        if rows is None and self.source is None and isinstance(self.content, dict):  # shown as KEY and VALUE
+            return export_rows(self.content.items(), [0, 1], ['KEY', 'VALUE'], None, export_format, chunk_rows)
+        if rows is None:
+            rows = self.source if self.source is not None else self.content
+        return export_rows(rows, self.columns_display, self._labels(), self._export_codes(), export_format,
+                           chunk_rows)
+
+    def _export_codes(self) -> dict[Any, Mapping[str, Any]]:
+        return {}
+
+    def add_aggregates(self, aggregates: Mapping[Any, str], group_by: Optional[Any] = None,
+                       rows: Optional[Any] = None) -> AggregateResult:
+        """Add a row of subtotals per group and a row of totals below the rows, e.g. ``{'amount': 'sum'}``
+
+        The aggregates cover all rows, not just the ones shown. They are computed by vectorized operations for
+        columnar rows like pandas DataFrames, see :func:`aggregate`.
+
+        :param aggregates: Aggregate function per column, one of "sum", "avg", "count", "min" and "max".
+        :param group_by: Column whose values form the groups of the subtotals, the groups are ordered by its values.
+                         Or a list of columns, the labels of their groups join the values by
+                         :attr:`group_label_separator`.
+        :param rows: The rows to aggregate, defaults to the source or the content of the listing.
+        :return: The aggregated values
+        """
+        if rows is None:
+            rows = self.source if self.source is not None else self.content
+        result = aggregate(rows, aggregates, group_by)
+        group_columns = list(group_by) if isinstance(group_by, (list, tuple)) else [group_by]
+        label_column = next((column for column in group_columns if column in self.columns_display),
+                            next((column for column in self.columns_display if column not in aggregates), None))
+        formatters = {column: self.formatters.get(column, self.format_aggregate) if function != 'count' else str
+                      for column, function in aggregates.items()}
+        footer = [(self.SUBTOTAL_CLASS, self._aggregate_cells(values, formatters, label_column, self._group_label(key)))
+                  for key, values in result.groups.items()]
+        footer.append((self.TOTAL_CLASS, self._aggregate_cells(result.totals, formatters, label_column,
+                                                               self.total_label)))
+        self.table_.set_row_style(self.SUBTOTAL_CLASS, self.AGGREGATE_STYLE)
+        self.table_.set_row_style(self.TOTAL_CLASS, self.AGGREGATE_STYLE)
+        if self._island is not None:
+            self._island.setdefault('footer', []).extend({'class': class_html, 'cells': self._island_column(cells)}
+                                                         for class_html, cells in footer)
+        else:
+            rows_added = self.table_.add_rows(escape_column(cells) for _, cells in footer)
+            for row, (class_html, _) in zip(rows_added, footer):
+                row.class_html = class_html
+            self._aggregate_rows += len(rows_added)
+        return result
+
+    def _aggregate_cells(self, values: Mapping[Any, Any], formatters: Mapping[Any, Callable[[Any], str]],
+                         label_column: Optional[Any], label: Any) -> list[Any]:
+        return [formatters[column](values[column]) if column in values else
+                label if column == label_column else '' for column in self.columns_display]
+
+    def _group_label(self, key: Any) -> Any:
+        return self.group_label_separator.join(map(str, key)) if isinstance(key, tuple) else key
+
+    def format_aggregate(self, value: Any) -> str:
+        """Text of an aggregated value of a column without format"""
+        if value is None:
+            return ''
+        return self.aggregate_format.format(value) if isinstance(value, float) else str(value)
+
+    def _island_columns(self, rows: Sequence[Any]) -> list[list[Any]]:
+        return [self._island_column(self._formatted_values(rows, key)) for key in self.columns_display]
+
+    def _formatted_values(self, rows: Sequence[Any], key: Any) -> list[Any]:
+        """The values of a column, as text if the column has a format"""
+        values = self._column_values(rows, key)
+        formatter = self.formatters.get(key)
+        return values if formatter is None else list(map(formatter, values))
+
+    def _fragment_data(self, rows: Sequence[Any], offset: int) -> dict[str, Any]:
+        return {'offset': offset, 'rows': len(rows), 'columns': self._island_columns(rows)}
+
+    def fragment(self, offset: int, limit: Optional[int] = None) -> str:
+        """Json of the rows from offset on, as fetched by the client while scrolling
+
+        :param offset: Position of the first row, negative offsets raise ValueError.
+        :param limit: Number of rows, clamped to 1 up to :attr:`fetch_max`, defaults to the viewport.
+        """
+        if self.source is None:
+            raise Exception("Only listings with a viewport deliver further rows")
+        if offset < 0:
+            raise ValueError(f"Negative offset {offset} of rows")
+        limit = min(max(limit if limit is not None else self.viewport, 1), self.fetch_max)
+        rows = self.source.rows(offset, limit)
+        return escape_json(self._fragment_data(rows, offset))
+
+    def fragment_for(self, request: 'PySpassRequest') -> str:
+        """Json of the rows requested by the client, the response of the endpoint at fetch_url::
+
+            listing = build_listing(container)  # same as for the page
+            return Response(listing.fragment_for(app.request), mimetype='application/json')
+        """
+        return self.fragment(request.get_int(self.OFFSET_FIELD, default=0) or 0,
+                             request.get_int(self.LIMIT_FIELD, default=self.viewport))
+
+    @staticmethod
+    def _island_column(values: Iterable[Any]) -> list[Any]:
+        """Values as text for the client, markup as ``{"html": ...}``"""
+        return [value if type(value) is str else
+                {'html': value.__html__()} if hasattr(value, '__html__') else str(value)
+                for value in values]
+
+    @staticmethod
+    def _column_values(rows: Sequence[Any], key: Any) -> list[Any]:
+        try:
+            return [row.get(key, '') for row in rows]
+        except AttributeError:
+            values = []
+            for row in rows:
+                try:
+                    values.append(row[key])
+                except KeyError:
+                    values.append('')
+            return values
+
     def _derive_columnnames_for_display(self) -> list:
         if isinstance(self.content, dict):
             content_keys_data = self.content.keys()
@@ -421,13 +1052,27 @@ class ResultListing(HtmlContainer):
             content_keys = list(content_keys_data)
         return content_keys
 
-    def __str__(self):
-        # for row in self.table:
-        #     for cell_nr, cell in enumerate(row):
-        #         if cell_nr == 0:
-        #             cell.css_styles['text-align'] = 'right'
-        #     print (1)
-        return ''.join([str(chunk) for chunk in self])
+    def update_fingerprint(self, hasher) -> None:
+        """Includes the json of listings built client side, e.g. rows, choice, footer and viewport"""
+        super().update_fingerprint(hasher)
+        if self._island is not None:
+            hasher.update(escape_json(self._island).encode('utf-8'))
+
+    @profiled_render
+    def _render(self, out: list[str], depth: int, compact: bool) -> None:
+        if self._island is None:
+            # the listing itself has no tag, just its children
+            self._render_children(out, depth, compact)
+            return
+        # the table is built by spass_forms.js from the json, the styles of its columns are rendered here
+        island = {**self._island, 'class': self.table_.class_html}
+        if self.table_._style_class is not None:
+            HtmlStyle(self.table_.style_rules())._render(out, depth, compact)
+        script = HtmlScript(escape_json(island))
+        script.tag_content['type'] = 'application/json'
+        script.class_html = 'spass-listing'
+        script._render(out, depth, compact)
+        self._render_children_of([child for child in self if child is not self.table_], out, depth, compact)
 
 
 class ResultChoice(ResultListing):
@@ -443,6 +1088,10 @@ class ResultChoice(ResultListing):
     """
 
     PREFIX: str = '_rct_selected_'
+    #: Class of the selected rows
+    SELECTED_CLASS: str = 'spass-selected'
+    #: Css declarations of the selected rows, rendered once per table
+    SELECTED_STYLE: Mapping[str, str] = {'color': 'white', 'background': 'grey'}
 
     _index: Sequence[str]
     _row_selected: dict[str, Any]
@@ -455,7 +1104,12 @@ class ResultChoice(ResultListing):
                  mapping: Optional[Mapping[str, str]] = None,
                  show_all: bool = False,
                  rowcount_max: int = 200,
-                 alignments: str | None = None):
+                 alignments: str | None = None,
+                 max_nodes: Optional[int] = None,
+                 client_side: bool = False,
+                 viewport: Optional[int] = None,
+                 fetch_url: str | None = None,
+                 formats: Optional[Mapping[Any, FormatSpec]] = None):
         """
 
         :param content:
@@ -465,8 +1119,16 @@ class ResultChoice(ResultListing):
         :param show_all:
         :param rowcount_max:
         :param alignments:
+        :param max_nodes:
+        :param client_side:
+        :param viewport:
+        :param fetch_url:
+        :param formats:
         """
-        super().__init__(content, mapping, show_all, rowcount_max, alignments)
+        if max_nodes is not None:  # reserve the hidden inputs added by compose
+            max_nodes -= (1 if isinstance(listing_index, str) else len(listing_index)) + 1
+        super().__init__(content, mapping, show_all, rowcount_max, alignments, max_nodes, client_side, viewport,
+                         fetch_url, formats)
         self.listing_index = listing_index
         self.row_selected = row_selected
         self.columns_config: dict[str, Any] = {}
@@ -490,6 +1152,7 @@ class ResultChoice(ResultListing):
     def listing_index(self, value):
         self._index = value if not isinstance(value, str) else [value, ]
 
+    @profiled_build
     def compose(self) -> None:
         """Composes the final html composite object as a final step after all settings have been done."""
         parent_form: Optional[HtmlForm] = self.get_form()
@@ -505,25 +1168,35 @@ class ResultChoice(ResultListing):
                     # (check if all have to apply)
                     raise Exception(
                         f"Listing_index '{index_col}' not in list content ({list(self.content[0].keys())})!")
-            for i, row_dat in enumerate(self.content):
-                if i < self.rowcount_max:
-                    row: HtmlRow = self.table_[i + 1]  # +1 for header
-                    if isinstance(self.row_selected, list):
-                        row.tag_content["onclick"] = f"entryMultiChoiceSetSelection('{id_html_parentform}', " \
-                                                     f"'{self._index[0]}', '{row_dat[self._index[0]]}');"
+            if self._island is not None:
+                self._compose_island(id_html_parentform, trigger_name)
+            else:
+                # cells hold escaped values, so the code labels are escaped once per column instead of once per cell
+                codes_escaped = {column_name: {escape_text(code): escape_text(label) for code, label
+                                               in self.columns_config[column_name]['codes'].items()}
+                                 for column_name in self.columns_with_mappings}
+                for i, row_dat in enumerate(self.content):
+                    if i < self.rowcount_max:
+                        row: HtmlRow = self.table_[i + 1]  # +1 for header
+                        if isinstance(self.row_selected, list):
+                            row.tag_content["onclick"] = f"entryMultiChoiceSetSelection('{id_html_parentform}', " \
+                                                         f"'{self._index[0]}', " \
+                                                         f"'{escape_js_string(row_dat[self._index[0]])}');"
+                        else:
+                            json = ",".join(f"'{index_col}':'{escape_js_string(row_dat[index_col])}'"
+                                            for index_col in self._index)
+                            json += f",'{trigger_name}':'true'"
+                            row.tag_content["onclick"] = f"entryChoiceSetSelection('{id_html_parentform}', {{{json}}});"
+                        if self._is_selected_row(row_dat):
+                            self._build_selected_row(row)
+                        if self.columns_with_mappings:
+                            for column_name in self.columns_with_mappings:
+                                column_index = self.columns_display.index(column_name)
+                                if row[column_index]:
+                                    row[column_index][0] = codes_escaped[column_name].get(row[column_index][0],
+                                                                                          row[column_index][0])
                     else:
-                        json = ",".join(f"'{index_col}':'{row_dat[index_col]}'" for index_col in self._index)
-                        json += f",'{trigger_name}':'true'"
-                        row.tag_content["onclick"] = f"entryChoiceSetSelection('{id_html_parentform}', {{{json}}});"
-                    if self._is_selected_row(row_dat):
-                        self._build_selected_row(row)
-                    if self.columns_with_mappings:
-                        for column_name in self.columns_with_mappings:
-                            column_index = self.columns_display.index(column_name)
-                            row[column_index][0] = self.columns_config[column_name]['codes'].get(row[column_index][0],
-                                                                                                 row[column_index][0])
-                else:
-                    break
+                        break
             for index_col in self.listing_index:
                 if self.row_selected:
                     if isinstance(self.row_selected, list):
@@ -539,6 +1212,42 @@ class ResultChoice(ResultListing):
                         value='false',
                         id_html=self.PREFIX + trigger_name)
 
+    def _compose_island(self, id_html_parentform: str, trigger_name: str) -> None:
+        """Add codes and the selection to the json of a listing built client side"""
+        rows = list(islice(self.content, self.rowcount_max))
+        self._apply_codes(self._island['columns'])
+        choice = self._island['choice'] = {'form': id_html_parentform,
+                                           'index': list(self._index),
+                                           'trigger': trigger_name,
+                                           'multi': isinstance(self.row_selected, list),
+                                           'selectedClass': self.SELECTED_CLASS,
+                                           **self._choice_data(rows)}
+        if choice['selected'] or self.source is not None:  # selected rows may be fetched later
+            self.table_.set_row_style(self.SELECTED_CLASS, self.SELECTED_STYLE)
+
+    def _fragment_data(self, rows: Sequence[Any], offset: int) -> dict[str, Any]:
+        # the endpoint sets the codes like the page, but has no form to compose the choice in
+        data = super()._fragment_data(rows, offset)
+        self._apply_codes(data['columns'])
+        data['choice'] = self._choice_data(rows)
+        return data
+
+    def _export_codes(self) -> dict[Any, Mapping[str, Any]]:
+        return {column_name: self.columns_config[column_name]['codes'] for column_name in self.columns_with_mappings}
+
+    def _apply_codes(self, columns: list[list[Any]]) -> None:
+        for column_name in self.columns_with_mappings:
+            codes = self.columns_config[column_name]['codes']
+            labels = dict(zip(codes, self._island_column(codes.values())))
+            column_index = self.columns_display.index(column_name)
+            columns[column_index] = [labels.get(value, value) if type(value) is str else value
+                                     for value in columns[column_index]]
+
+    def _choice_data(self, rows: Sequence[Any]) -> dict[str, list[Any]]:
+        """Keys and selected positions of the rows"""
+        return {'keys': [[str(row_dat[index_col]) for row_dat in rows] for index_col in self._index],
+                'selected': [i for i, row_dat in enumerate(rows) if self._is_selected_row(row_dat)]}
+
     def _is_selected_row(self, row_dat: Mapping[str, Any]) -> bool:
         if not self.row_selected:
             return False
@@ -558,8 +1267,8 @@ class ResultChoice(ResultListing):
         return False
 
     def _build_selected_row(self, row):
-        row.css_styles['color'] = 'white'
-        row.css_styles['background'] = 'grey'
+        row.class_html = self.SELECTED_CLASS
+        self.table_.set_row_style(self.SELECTED_CLASS, self.SELECTED_STYLE)
 
     def set_codes(self, column_name: str, codes: Union[Sequence, Mapping],
                   multichoice: bool = False, display_size: int = 1) -> 'ResultChoice':
@@ -587,16 +1296,22 @@ class ResultChoice(ResultListing):
 class ResultEditor(ResultChoice):
     columns_protected: list[Any]
 
+    SELECTED_STYLE: Mapping[str, str] = {'color': 'white', 'background': 'blue'}
+
     def __init__(self, content: Sequence, listing_index, row_selected, mapping: Mapping[str, str] | None = None,
                  show_all: bool = False, rowcount_max: int = 200, columns_protected: Sequence | None = None,
-                 alignments=None):
-        super().__init__(content, listing_index, row_selected, mapping, show_all, rowcount_max, alignments)
+                 alignments=None, max_nodes: Optional[int] = None):
+        super().__init__(content, listing_index, row_selected, mapping, show_all, rowcount_max, alignments, max_nodes)
         self.columns_protected = list(columns_protected) if columns_protected else []
         self.columns_protected.append(listing_index)
 
+    def _extra_nodes(self) -> int:
+        # inputs of the selected row and the cell with the submit button
+        return len(self.columns_display) + 2
+
     def _build_selected_row(self, row):
-        row.css_styles['color'] = 'white'
-        row.css_styles['background'] = 'blue'
+        row.class_html = self.SELECTED_CLASS
+        self.table_.set_row_style(self.SELECTED_CLASS, self.SELECTED_STYLE)
         row.tag_content.pop('onclick', None)
         for i, cell in enumerate(row):
             column_current = self.columns_display[i]
@@ -604,7 +1319,7 @@ class ResultEditor(ResultChoice):
                 cell_input = HtmlCell()
                 if 'codes' in self.columns_config.get(column_current, {}):
                     cell_input.dropdown(name=column_current,
-                                        var_input=cell[0] if cell else None,
+                                        var_input=unescape(cell[0]) if cell else None,
                                         codes_source=self.columns_config[column_current]['codes'],
                                         missing_allowed=False)
                     if self.columns_config.get(column_current, {}).get('multi_choice'):
@@ -612,19 +1327,114 @@ class ResultEditor(ResultChoice):
                     if self.columns_config.get(column_current, {}).get('display_size') != 1:
                         raise NotImplementedError
                 else:
-                    cell_input.textinput(column_current, var_input=cell[0] if cell else None)
+                    cell_input.textinput(column_current, var_input=unescape(cell[0]) if cell else None)
                 row[i] = cell_input
         cell_submit = row.td()
         button = cell_submit.submit('submit_save_resulteditor', 'save')  # focus on selected line
         button.tag_content['autofocus'] = 'autofocus'
 
 
+class ResultPivot(HtmlContainer):
+    """Display object that renders a cross tabulation of a dataset as a html table, see :func:`pivot`
+
+    The values of the index columns head the rows, the values of the column key columns head the columns with a
+    header row per column key column.
+
+    :param content: Rows like for :class:`ResultListing`, a :class:`RowSource`, a pandas DataFrame or a mapping of
+                    numpy arrays by column.
+    :param index: Column whose values become the rows, or a list of columns.
+    :param columns: Column whose values become the columns, or a list of columns.
+    :param values: The aggregated column.
+    :param function: Aggregate of the values, one of sum, avg, count, min and max.
+    :param mapping: Labels of the index columns.
+    :param alignments: Alignments of the columns like for :meth:`HtmlTable.set_column_alignments`.
+    :param max_nodes: Show only as many rows as fit into this number of elements and a notice, see
+                      :class:`PageBudget`. Set by the factory of the containers if the page has a budget.
+    """
+
+    table_: HtmlTable
+    result: PivotResult
+    #: True if rows were left out because of the page budget
+    truncated: bool = False
+    #: Format of aggregated floats, e.g. averages
+    value_format: str = '{:.2f}'
+
+    @profiled_build
+    def __init__(self, content: Any, index: Union[str, Sequence[str]], columns: Union[str, Sequence[str]],
+                 values: str, function: str = 'sum', mapping: Optional[Mapping[str, str]] = None,
+                 alignments: str | None = None, max_nodes: Optional[int] = None):
+        super().__init__()
+        self.mapping = mapping if mapping else {}
+        self.result = pivot(content, index, columns, values, function)
+        index_columns = list(index) if isinstance(index, (list, tuple)) else [index]
+        tab: HtmlTable = super().table()
+        self.table_ = tab
+        self._add_header_rows(index_columns, len(columns) if isinstance(columns, (list, tuple)) else 0)
+        width = len(index_columns) + len(self.result.column_keys)
+        row_count = len(self.result.row_keys)
+        if max_nodes is not None:
+            # nodes besides pivot, table, notice row and cell and the header rows
+            fitting = max((max_nodes - 4 - sum(len(row) + 1 for row in tab)) // (width + 1), 0)
+            if fitting < row_count:
+                row_count, self.truncated = fitting, True
+        row_keys = self.result.row_keys[:row_count]
+        if not isinstance(index, (list, tuple)):  # keys of a list of index columns are tuples, see pivot
+            key_columns = [escape_column(row_keys)]
+        else:
+            key_columns = [escape_column([key[position] for key in row_keys]) for position in range(len(index_columns))]
+        value_columns = [escape_column([self.format_value(value) for value in column])
+                         for column in zip(*self.result.cells[:row_count])]
+        tab.add_rows(zip(*key_columns, *value_columns))
+        if self.truncated:
+            notice = tab.notice_row(row_count, len(self.result.row_keys))
+            notice[0].tag_content['colspan'] = width
+            tab.add(notice)
+        if alignments:
+            tab.set_column_alignments(alignments)
+
+    def _add_header_rows(self, index_columns: list[Any], column_levels: int) -> None:
+        """A header row per column key column, equal keys of the upper rows are merged, the last row labels the
+        index columns"""
+        keys = self.result.column_keys if column_levels else [(key,) for key in self.result.column_keys]
+        levels = max(column_levels, 1)
+        for level in range(levels):
+            spans: list[list[Any]] = []  # value and number of columns
+            previous = None
+            for key in keys:
+                if spans and key[:level + 1] == previous:
+                    spans[-1][1] += 1
+                else:
+                    spans.append([key[level], 1])
+                    previous = key[:level + 1]
+            if level == levels - 1:
+                labels = [escape_text(self.mapping.get(column, column)) for column in index_columns]
+            else:
+                labels = [''] * len(index_columns)
+            cells = self.table_.tr().add_cells(labels + escape_column([value for value, _ in spans]), head=True)
+            for cell, (_, span) in zip(cells[len(index_columns):], spans):
+                if span > 1:
+                    cell.tag_content['colspan'] = span
+
+    def format_value(self, value: Any) -> str:
+        """Text of an aggregated value, empty where no rows exist"""
+        if value is None:
+            return ''
+        return self.value_format.format(value) if isinstance(value, float) else str(value)
+
+    @profiled_render
+    def _render(self, out: list[str], depth: int, compact: bool) -> None:
+        # the pivot itself has no tag, just its children
+        self._render_children(out, depth, compact)
+
+
 class HtmlBody(HtmlContainer):
     TAG: str = 'body'
+    _form_resolved: bool = True
 
 
 class HtmlHead(HtmlContainer):
     TAG: str = 'head'
+    _form_resolved: bool = True
 
     def resourcelink(self, rel: str, href: str, linktype: str | None = None) -> 'HtmlResource':
         """Add a link pointing to a resource for the header
@@ -632,30 +1442,340 @@ class HtmlHead(HtmlContainer):
         :param rel: which type of resource, e.g. "stylesheet"
         :param linktype: e.g. "text/css"
         :param href: path to file
-        :return: HtmlResource
+        :return: HtmlResource, or HtmlStyle, if a small stylesheet is embedded by the asset manager
         """
+        assets = self.get_assets()
+        if assets:
+            inline_content = assets.inline_content(href) if rel == "stylesheet" else None
+            if inline_content is not None:
+                style = HtmlStyle(inline_content)
+                self.add(style)
+                return style
+            href = assets.url(href)
         link = HtmlResource(rel=rel, href=href, linktype=linktype)
         self.add(link)
         return link
 
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def prerender(scripts: tuple[str, ...] = (), stylesheets: tuple[str, ...] = (),
+                  assets: Optional[AssetManager] = None, mode: Optional[RenderMode] = None) -> str:
+        """Render the static part of a head once, the result can be added to any head as a string
+
+        :param scripts: paths to script files
+        :param stylesheets: paths to css files
+        :param assets: asset manager resolving the paths to fingerprinted urls or inline content
+        :param mode: formatting of the html, defaults to :attr:`HtmlObject.render_mode`
+        """
+        head = HtmlHead()
+        head.assets = assets
+        for href in stylesheets:
+            head.resourcelink("stylesheet", href, "text/css")
+        for src in scripts:
+            head.script(src=src)
+        compact = (mode or head.render_mode) is RenderMode.COMPACT
+        out: list[str] = []
+        head._render_children(out, 1, compact)
+        return ''.join(out).strip()
+
+
+class HtmlIndex:
+    """Nodes of a page by id, class and tag, see :meth:`HtmlPage.find_by_id`
+
+    Nodes are registered when they are added to the page, ids and classes set later by :attr:`HtmlObject.id_html`
+    and :attr:`HtmlObject.class_html` are updated. Changes to ``tag_content`` and nodes removed from their container
+    are not tracked.
+    """
+
+    def __init__(self):
+        self.ids: dict[str, HtmlObject] = {}
+        self.classes: dict[str, dict[int, HtmlObject]] = {}
+        self.tags: dict[str, dict[int, HtmlObject]] = {}
+
+    def add(self, node: HtmlObject) -> None:
+        id_html = node.tag_content.get('id')
+        if id_html:
+            self._add_id(node, str(id_html))
+        class_html = node.tag_content.get('class')
+        if class_html:
+            for name in str(class_html).split():
+                self.classes.setdefault(name, {})[id(node)] = node
+        tag = getattr(node, 'TAG', None)
+        if tag:
+            self.tags.setdefault(tag, {})[id(node)] = node
+
+    def check(self, nodes: Iterable[HtmlObject]) -> None:
+        """Raise for ids used twice by the nodes or by nodes in the index, before any of the nodes is added"""
+        added: dict[str, HtmlObject] = {}
+        for node in nodes:
+            id_html = node.tag_content.get('id')
+            if id_html:
+                id_html = str(id_html)
+                self._check_id(node, id_html, added.get(id_html) or self.ids.get(id_html))
+                added[id_html] = node
+
+    def _add_id(self, node: HtmlObject, id_html: str) -> None:
+        self._check_id(node, id_html, self.ids.get(id_html))
+        self.ids[id_html] = node
+
+    @staticmethod
+    def _check_id(node: HtmlObject, id_html: str, existing: Optional[HtmlObject]) -> None:
+        if existing is not None and existing is not node:
+            raise Exception(f"Duplicate id {id_html!r}, used by {existing.__class__.__name__} "
+                            f"and {node.__class__.__name__}.")
+
+    def replace_id(self, node: HtmlObject, old: Optional[Any], new: Any) -> None:
+        self._add_id(node, str(new))
+        if old and str(old) != str(new) and self.ids.get(str(old)) is node:
+            del self.ids[str(old)]
+
+    def replace_classes(self, node: HtmlObject, old: Optional[Any], new: Any) -> None:
+        for name in str(old or '').split():
+            self.classes.get(name, {}).pop(id(node), None)
+        for name in str(new).split():
+            self.classes.setdefault(name, {})[id(node)] = node
+
 
 class HtmlPage:
     body: HtmlBody
     head: HtmlHead
     root_app: Optional[Any] = None
-
-    def __init__(self, root_app: Optional[Any] = None):
+    #: Language of the document
+    lang: str
+    #: Formatting of the html, if None :attr:`HtmlObject.render_mode` is used
+    render_mode: Optional[RenderMode]
+    #: Consumption of the budget of the page, None if the page has no budget
+    usage: Optional[BudgetUsage]
+    #: Lookup of nodes, None until it is needed, see :meth:`find_by_id`
+    index: Optional[HtmlIndex]
+
+    def __init__(self, root_app: Optional[Any] = None, lang: str = 'de', render_mode: Optional[RenderMode] = None,
+                 budget: Optional[PageBudget] = None, indexed: bool = False):
+        """
+        :param budget: Limits for the page.
+        :param indexed: Maintain the lookup by id, class and tag from the start, so duplicate ids are rejected when
+                        they are added. Otherwise the lookup is built by the first search.
+        """
         self.root_app = root_app
+        self.lang = lang
+        self.render_mode = render_mode
+        self.usage = BudgetUsage(budget) if budget else None
+        self.index = None
         self.head = HtmlHead()
         self.body = HtmlBody()
+        self.head.assets = self.body.assets = getattr(root_app, 'assets', None)
+        self.head._page = self.body._page = self
+        if indexed:
+            self._build_index()
+
+    @property
+    def tracks_nodes(self) -> bool:
+        """True if all nodes of the page have to be registered, otherwise just the nodes added to the page"""
+        return self.usage is not None or self.index is not None
+
+    def _build_index(self) -> HtmlIndex:
+        if self.index is None:
+            index = HtmlIndex()  # assigned once complete, a duplicate id leaves the page without an index
+            nodes = self._walk(self.head)[0] + self._walk(self.body)[0]
+            for node in nodes:
+                index.add(node)
+            self.index = index
+            self._register_nodes(nodes)
+        return self.index
+
+    def find_by_id(self, id_html: str) -> Optional[HtmlObject]:
+        """The node with the given id, None if there is none"""
+        return self._build_index().ids.get(id_html)
+
+    def find_all_by_class(self, class_html: str) -> list[HtmlObject]:
+        """All nodes having the class, in the order they were added"""
+        return list(self._build_index().classes.get(class_html, {}).values())
+
+    def find_all_by_tag(self, tag: str) -> list[HtmlObject]:
+        """All nodes with the tag, e.g. "form", in the order they were added"""
+        return list(self._build_index().tags.get(tag, {}).values())
+
+    def attach(self, node: HtmlObject) -> None:
+        """Register a node added to the page, called by :meth:`HtmlContainer.add`
+
+        If the page tracks its nodes, all children of the node are registered as well and counted against the
+        budget of the page. A listing exceeding the budget is truncated, if the budget allows it. Nodes exceeding
+        the budget raise :class:`BudgetExceeded` before anything is registered.
+        """
+        self.attach_all([node])
+
+    def attach_all(self, nodes: Sequence[HtmlObject]) -> None:
+        """Register nodes added to the page at once, e.g. the rows of a table, see :meth:`attach`"""
+        if not self.tracks_nodes:
+            for node in nodes:
+                node._page = self
+            return
+        usage = self.usage
+        walked: list[HtmlObject] = []
+        count = 0
+        for node in nodes:
+            node_walked, node_count = self._walk(node)
+            if usage is not None and isinstance(node, ResultListing) and usage.budget.truncate:
+                remaining = usage.remaining_nodes()
+                if remaining is not None and count + node_count > remaining:
+                    node.truncate(node._rows_fitting(remaining - count))
+                    node_walked, node_count = self._walk(node)
+            walked.extend(node_walked)
+            count += node_count
+        if self.index is not None:
+            self.index.check(walked)
+        if usage is not None:
+            usage.add_nodes(count)
+            for node in nodes:
+                if isinstance(node, (ResultListing, ResultPivot)) and node.truncated:
+                    usage.count_truncation()
+        self._register_nodes(walked)
+
+    def _register(self, node: HtmlObject) -> int:
+        """Set the page of the node and its children and index them, returns the number of nodes"""
+        nodes, count = self._walk(node)
+        self._register_nodes(nodes)
+        return count
+
+    @staticmethod
+    def _walk(node: HtmlObject) -> tuple[list[HtmlObject], int]:
+        """The node and the objects below it in document order and the number of nodes they render"""
+        nodes = []
+        count = 0
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            nodes.append(current)
+            if isinstance(current, list):  # containers, without the slower check for the abstract class
+                count += 1
+                for child in reversed(current):  # popped in the order they were added
+                    if type(child) is not str and isinstance(child, HtmlObject):
+                        stack.append(child)
+            else:
+                count += current.count_nodes()
+        return nodes, count
+
+    def _register_nodes(self, nodes: list[HtmlObject]) -> None:
+        index = self.index
+        for node in nodes:
+            node._page = self
+            if index is not None:
+                index.add(node)
+
+    def resolve_deferred(self, executor: Optional[Executor] = None, max_workers: int = 4) -> None:
+        """Resolve all deferred nodes of the page in parallel, see :meth:`HtmlDeferred.resolve_all`"""
+        HtmlDeferred.resolve_all([self.head, self.body], executor, max_workers)
+
+    def prelude(self, mode: Optional[RenderMode] = None) -> str:
+        """Everything in front of the head, without line breaks in compact mode"""
+        return self.document_prelude(self.lang, self._is_compact(mode))
+
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def document_prelude(lang: str, compact: bool = False) -> str:
+        newline = '' if compact else '\n'
+        return f'<?xml version="1.0" encoding="utf-8" ?>{newline}' \
+               f'<!DOCTYPE html>{newline}' \
+               '<html xmlns="http://www.w3.org/1999/xhtml" ' \
+               f'xml:lang="{lang}" lang="{lang}">{newline}'
 
     @property
     def html(self):
-        return '</?xml version="1.0" encoding="utf-8" ?>\n' \
-               '<!DOCTYPE html>\n' \
-               '<html xmlns="http://www.w3.org/1999/xhtml"' \
-               f'xml:lang="de" lang="de">\n{self.head}\n' \
-               f'{self.body}\n</html>\n'
+        return self.render()
+
+    def _is_compact(self, mode: Optional[RenderMode]) -> bool:
+        return (mode or self.render_mode or HtmlObject.render_mode) is RenderMode.COMPACT
+
+    def render(self, mode: Optional[RenderMode] = None) -> str:
+        compact = self._is_compact(mode)
+        if self.usage is not None:
+            self.usage.start_render()
+        out = [self.prelude(mode)]
+        self.head._render(out, 0, compact)
+        self.body._render(out, 0, compact)
+        out.append('</html>' if compact else '</html>\n')
+        if self.usage is not None:
+            self.usage.finish_render(out)
+        return ''.join(out)
+
+    def fingerprint(self) -> str:
+        """Hash over the state of all nodes of the page, computed without rendering the html"""
+        hasher = hashlib.blake2b(self.lang.encode('utf-8'), digest_size=16)
+        self.head.update_fingerprint(hasher)
+        self.body.update_fingerprint(hasher)
+        return hasher.hexdigest()
+
+    @property
+    def etag(self) -> str:
+        """Strong ETag of the page"""
+        return f'"{self.fingerprint()}"'
+
+    @staticmethod
+    def etag_matches(etag: str, if_none_match: str | None) -> bool:
+        """Check the If-None-Match header of a request against an ETag, using the weak comparison of RFC 9110"""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == '*':
+            return True
+        candidates = {candidate.strip().removeprefix('W/') for candidate in if_none_match.split(',')}
+        return etag.removeprefix('W/') in candidates
+
+    def stream(self, executor: Optional[Executor] = None, max_workers: int = 4,
+               mode: Optional[RenderMode] = None) -> Iterator[str]:
+        """Render the page as a sequence of chunks, slow components are sent out of order
+
+        Head and body are sent immediately, unresolved :class:`HtmlDeferred` nodes are rendered as empty
+        placeholders and their producers are started in parallel. Once a producer has finished, the html of its
+        node is sent as a template at the end of the body and moved into the placeholder by ``spass_forms.js``,
+        which therefore has to be included in the head.
+        The first chunk holds prelude, head and the opening body tag, each top level component of the body follows
+        as its own chunk. The generator can be passed directly to a streamed response, e.g. for flask
+        ``Response(stream_with_context(page.stream()))``.
+
+        :param executor: Executor for the producers, if None a thread pool with max_workers is used.
+        :param max_workers: Number of threads for the temporary thread pool.
+        :param mode: Formatting of the html, defaults to :attr:`render_mode`.
+        """
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pyspass-stream') as pool:
+                yield from self.stream(pool, mode=mode)
+            return
+        compact = self._is_compact(mode)
+        usage = self.usage
+        if usage is not None:
+            usage.start_render()
+        slow_nodes = list(HtmlDeferred.iter_unresolved([self.head, self.body]))
+        futures: dict[Future, HtmlDeferred] = {}
+        try:
+            for slot, node in enumerate(slow_nodes):
+                node._slot = str(slot)
+                futures[node.submit(executor)] = node
+            out = [self.prelude(mode)]
+            self.head._render(out, 0, compact)
+            self.body._render_open(out, 0, compact)
+            if usage is not None:
+                usage.account(out)
+            yield ''.join(out)
+            for component in self.body:
+                out = []
+                self.body._render_children_of([component], out, 1, compact)
+                if usage is not None:
+                    usage.account(out)
+                yield ''.join(out)
+            for future in as_completed(futures):
+                chunk = futures[future].stream_chunk(RenderMode.COMPACT if compact else RenderMode.PRETTY)
+                if usage is not None:
+                    usage.account([chunk])
+                yield chunk
+            out = []
+            self.body._render_close(out, 0, compact)
+            out.append('</html>' if compact else '</html>\n')
+            if usage is not None:
+                usage.finish_render(out)
+            yield ''.join(out)
+        finally:  # an aborted stream must not leave placeholders in later renderings
+            for node in slow_nodes:
+                node._slot = None
 
 
 class HtmlOptgroup(HtmlContainer):
@@ -664,20 +1784,19 @@ class HtmlOptgroup(HtmlContainer):
 
 class HtmlOption(HtmlContainer):
     TAG: str = 'option'
+    INLINE: bool = True
 
 
 class HtmlInput(HtmlObject):
     TAG: str = 'input'
 
-    def __str__(self) -> str:
-        if self.css_styles:
-            self.tag_content['style'] = ";".join([f"{key}: {value}" for key, value in self.css_styles.items()])
-        tag_content_str = ' '.join([f'{key}="{value}"' for key, value in self.tag_content.items()])
-        return f'<{self.TAG} {tag_content_str}/>'
+    def style(self) -> str:
+        return ';'.join([f'{key}: {value}' for key, value in self.css_styles.items()])
 
 
 class HtmlH1(HtmlContainer):
     TAG: str = 'h1'
+    INLINE: bool = True
 
     def __init__(self, content: Optional[Any] = None, id_html: str | None = None, class_html: str | None = None):
         super().__init__(id_html, class_html)
@@ -695,6 +1814,7 @@ class HtmlH3(HtmlH1):
 
 class HtmlP(HtmlContainer):
     TAG: str = 'p'
+    INLINE: bool = True
 
     def __init__(self, content: Optional[Any] = None, id_html: str | None = None, class_html: str | None = None):
         super().__init__(id_html=id_html, class_html=class_html)
@@ -704,6 +1824,7 @@ class HtmlP(HtmlContainer):
 
 class HtmlLabel(HtmlContainer):
     TAG: str = 'label'
+    INLINE: bool = True
 
     def __init__(self, content: str | None = None, for_id: str | None = None, id_html: str | None = None,
                  class_html: str | None = None):
@@ -716,6 +1837,7 @@ class HtmlLabel(HtmlContainer):
 
 class HtmlLink(HtmlContainer):
     TAG: str = 'a'
+    INLINE: bool = True
 
     def __init__(self, content: str | None = None, href: str | None = None, target: str = "_blank",
                  id_html: str | None = None, class_html: str | None = None):
@@ -740,9 +1862,14 @@ class HtmlResource(HtmlContainer):
         if linktype:
             self.tag_content['type'] = linktype
 
+    def _render(self, out: list[str], depth: int, compact: bool) -> None:
+        # link is an empty element
+        HtmlObject._render(self, out, depth, compact)
+
 
 class HtmlSpan(HtmlContainer):
     TAG: str = 'span'
+    INLINE: bool = True
 
     def __init__(self, content=None, id_html: str | None = None, class_html: str | None = None):
         super().__init__(id_html=id_html, class_html=class_html)
@@ -763,15 +1890,166 @@ class HtmlDiv(HtmlContainer):
 
 class HtmlForm(HtmlDiv):
     TAG: str = 'form'
+    FORM: bool = True
 
     def __init__(self, id_html):
         super().__init__(id_html=id_html)
         self.tag_content['method'] = 'post'
         self.tag_content['action'] = ''
 
+    _render = profiled_render(HtmlContainer._render)
+
+
+class HtmlDeferred(HtmlDiv):
+    """Container whose content is produced only when it is rendered or forced
+
+    The producer is a callable without arguments returning the content, e.g. ``lambda: ResultListing(query())``.
+    Coroutine functions are supported as well. The producer runs at most once, its result is kept for the
+    lifetime of the object, i.e. the current request.
+    Components in tabs or collapsed sections, that are never added to the rendered page, never run their query.
+
+    :param producer: Callable returning an HtmlObject, a string or a list of those.
+    """
+
+    producer: Callable[[], Any]
+    #: Content shown in place of the node, while its html is still streamed, see :meth:`HtmlPage.stream`
+    placeholder: Optional[Any]
+    #: Value identifying the content for :meth:`HtmlPage.fingerprint`, e.g. the version of the queried data
+    fingerprint_key: Optional[Any]
+
+    def __init__(self, producer: Callable[[], Any], id_html: str | None = None, class_html: str | None = None,
+                 placeholder: Optional[Any] = None, fingerprint_key: Optional[Any] = None):
+        super().__init__(id_html=id_html, class_html=class_html)
+        self.producer = producer
+        self.placeholder = placeholder
+        self.fingerprint_key = fingerprint_key
+        self.resolved: bool = False
+        self._future: Optional[Future] = None
+        self._lock = threading.Lock()
+        self._slot: str | None = None
+
+    def submit(self, executor: Executor) -> Future:
+        """Start the producer within the executor, the result is collected by the next :meth:`force`"""
+        with self._lock:
+            if self._future is None:
+                self._future = executor.submit(copy_context().run, self._produce)
+            return self._future
+
+    def force(self) -> 'HtmlDeferred':
+        """Run the producer, if not done yet, and add its result to the container"""
+        if not self.resolved:
+            with self._lock:
+                future = self._future
+            self._fill(future.result() if future is not None else self._produce())
+        return self
+
+    async def force_async(self) -> 'HtmlDeferred':
+        """Variant of :meth:`force` for event loops, synchronous producers are run in a worker thread"""
+        if not self.resolved:
+            if self._future is not None:
+                result = await asyncio.wrap_future(self._future)
+            elif inspect.iscoroutinefunction(self.producer):
+                result = await self.producer()
+            else:
+                result = await asyncio.to_thread(self._produce)
+            self._fill(result)
+        return self
+
+    @profiled_build
+    def _produce(self) -> Any:
+        result = self.producer()
+        if inspect.isawaitable(result):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return asyncio.run(self._await(result))
+            if inspect.iscoroutine(result):
+                result.close()
+            raise RuntimeError("Asynchronous producer within a running event loop, use force_async() instead")
+        return result
+
+    @staticmethod
+    async def _await(awaitable: Awaitable[Any]) -> Any:
+        return await awaitable
+
+    def _fill(self, result: Any) -> None:
+        if self.resolved:
+            return
+        self.resolved = True
+        if isinstance(result, (list, tuple)) and not isinstance(result, HtmlObject):
+            for content in result:
+                self.add(content)
+        elif result is not None:
+            self.add(result)
+
+    @profiled_render
+    def _render(self, out: list[str], depth: int, compact: bool) -> None:
+        if self._slot is not None and not self.resolved:
+            placeholder = f'<{self.TAG}{self.attributes({"data-spass-slot": self._slot})}>' \
+                          f'{self.placeholder or ""}{self.close_tag()}'
+            out.append(placeholder if compact else f'{self.INDENT * depth}{placeholder}\n')
+            return
+        self.force()
+        super()._render(out, depth, compact)
+
+    def update_fingerprint(self, hasher) -> None:
+        """Uses the fingerprint key instead of the content, if given, so the producer does not have to run"""
+        if self.fingerprint_key is not None and not self.resolved:
+            hasher.update(f"{self.__class__.__qualname__}{self.tag_content}{self.fingerprint_key!r}".encode('utf-8'))
+        else:
+            self.force()
+            super().update_fingerprint(hasher)
+
+    def stream_chunk(self, mode: Optional[RenderMode] = None) -> str:
+        """The html of the resolved content as template, moved into its placeholder by spass_forms.js"""
+        self.force()
+        out = [f'<template data-spass-chunk="{self._slot}">']
+        self._render_children(out, 0, True)
+        out.append(f'</template><script>spassFillSlot("{self._slot}");</script>')
+        if (mode or self.render_mode) is RenderMode.PRETTY:
+            out.append('\n')
+        return ''.join(out)
+
+    @staticmethod
+    def iter_unresolved(root: Sequence[Any]) -> Iterator['HtmlDeferred']:
+        """Yield all unresolved deferred nodes within the tree below root"""
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            for child in node:
+                if isinstance(child, HtmlDeferred) and not child.resolved:
+                    yield child
+                elif isinstance(child, HtmlContainer):
+                    stack.append(child)
+
+    @classmethod
+    def resolve_all(cls, root: Sequence[Any], executor: Optional[Executor] = None, max_workers: int = 4) -> None:
+        """Run the producers of all deferred nodes within the tree in parallel threads
+
+        Deferred nodes produced by other deferred nodes are resolved in a following round.
+
+        :param root: The container or list of containers to be searched.
+        :param executor: Executor to be used, if None a thread pool with max_workers is created for the call.
+        :param max_workers: Number of threads for the temporary thread pool.
+        """
+        nodes = list(cls.iter_unresolved(root))
+        if not nodes:
+            return
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pyspass-deferred') as pool:
+                cls.resolve_all(root, pool)
+            return
+        while nodes:
+            for node in nodes:
+                node.submit(executor)
+            for node in nodes:
+                node.force()
+            nodes = list(cls.iter_unresolved(root))
+
 
 class HtmlScript(HtmlContainer):
     TAG: str = 'script'
+    INLINE: bool = True
 
     def __init__(self, content: str | None = None, src: str | None = None, script_type: str | None = None):
         super().__init__()
@@ -782,6 +2060,16 @@ class HtmlScript(HtmlContainer):
             self.tag_content['src'] = src
 
 
+class HtmlStyle(HtmlContainer):
+    TAG: str = 'style'
+    INLINE: bool = True
+
+    def __init__(self, content: str | None = None):
+        super().__init__()
+        if content:
+            self.append(content)
+
+
 class HtmlHidden(HtmlInput):
     def __init__(self, name: str, value: str | None = None, id_html: str | None = None):
         super().__init__(id_html=id_html)
@@ -850,9 +2138,14 @@ class HtmlTextArea(HtmlInput):
                             'id': name}
         self.var_input: str = var_input
 
-    def __str__(self):
-        tag_content_str = ' '.join([f'{key}="{value}"' for key, value in self.tag_content.items()])
-        return f'<{self.TAG} {tag_content_str}>{self.var_input}</{self.TAG}>'
+    def update_fingerprint(self, hasher) -> None:
+        super().update_fingerprint(hasher)
+        hasher.update(f"{self.var_input}".encode('utf-8'))
+
+    def _render(self, out: list[str], depth: int, compact: bool) -> None:
+        content = '' if self.var_input is None else escape_text(self.var_input)
+        textarea = f'<{self.TAG}{self.attributes()}>{content}</{self.TAG}>'
+        out.append(textarea if compact else f'{self.INDENT * depth}{textarea}\n')
 
 
 class HtmlRadio(HtmlInput):
@@ -928,43 +2221,41 @@ class HtmlSelect(HtmlInput):
         self.size = size
         self.optgroups = optgroups
 
-    def __str__(self):
+    def update_fingerprint(self, hasher) -> None:
+        super().update_fingerprint(hasher)
+        hasher.update(f"{self.codes_source}{self.var_input}{self.autosubmit}{self.missing_allowed}"
+                      f"{self.multiple}{self.size}{self.optgroups}".encode('utf-8'))
+
+    def count_nodes(self) -> int:
+        return 1 + len(self.codes_source) + (len(self.optgroups) if self.optgroups else 0)
+
+    @profiled_render
+    def _render(self, out: list[str], depth: int, compact: bool) -> None:
+        extra: dict[str, Any] = {}
         if self.autosubmit:
-            self.tag_content['onchange'] = 'submit()'
+            extra['onchange'] = 'submit()'
         if self.multiple:
-            self.tag_content['multiple'] = 'multiple'
-            self.tag_content['name'] += '[]'
-            self.tag_content['size'] = self.size
-        tag_content_str = ' '.join([f'{key}="{value}"' for key, value in self.tag_content.items()])
+            extra.update({'name': f"{self.tag_content['name']}[]", 'multiple': 'multiple', 'size': self.size})
         codes_source_actual = self.codes_source if not self.missing_allowed else \
             {**{self._missing_code_id: self._missing_code_label}, **self.codes_source}
-
-        content = []
+        indent, newline = ('', '') if compact else (self.INDENT * depth, '\n')
+        out.append(f'{indent}<{self.TAG}{self.attributes(extra)}>{newline}')
         if self.optgroups:
             for key, value_list in self.optgroups.items():
-                optgroup = HtmlOptgroup()
-                optgroup.tag_content['label'] = key
-                content.append(optgroup)
+                out.append(f'{indent}{self.INDENT if newline else ""}'
+                           f'<optgroup label="{escape_attribute(key)}">{newline}')
                 for value in value_list:
-                    label = codes_source_actual[value]
-                    option = HtmlOption()
-                    option.tag_content['value'] = value
-                    if str(value) in self.var_input:
-                        option.tag_content['selected'] = 'selected'
-                    option.add(label)
-                    optgroup.append(option)
+                    self._render_option(out, value, codes_source_actual[value], depth + 2, compact)
+                out.append(f'{indent}{self.INDENT if newline else ""}</optgroup>{newline}')
         else:
             for code, label in codes_source_actual.items():
-                print(f"{code} , {label}")
-                print(f"{self.var_input=} ")
-                option = HtmlOption()
-                option.tag_content['value'] = code
-                if str(code) in self.var_input:
-                    option.tag_content['selected'] = 'selected'
-                option.add(label)
-                content.append(option)
-        option_str = '\n'.join([str(obt).replace('\n', '') for obt in content])
-        return f'<{self.TAG} {tag_content_str}>{option_str}\n</{self.TAG}>\n'
+                self._render_option(out, code, label, depth + 1, compact)
+        out.append(f'{indent}</{self.TAG}>{newline}')
+
+    def _render_option(self, out: list[str], code: Any, label: Any, depth: int, compact: bool) -> None:
+        selected = ' selected="selected"' if str(code) in self.var_input else ''
+        option = f'<option value="{escape_attribute(code)}"{selected}>{escape_text(label)}</option>'
+        out.append(option if compact else f'{self.INDENT * depth}{option}\n')
 
 
 class RequestObject(Protocol):
@@ -984,10 +2275,24 @@ class PySpassStorage:
 
 
 class PySpassRequest(PySpassStorage):
+    """Access to the values of a request, independent of the web framework
+
+    :param request_object: The request of the framework. For "flask" this is ``flask.request``, for "wsgi" either
+                           a :class:`WsgiRequest` or the plain environ dict, for "asgi" an :class:`AsgiRequest`.
+    :param framework: One of "flask", "wsgi" or "asgi".
+    """
 
     def __init__(self, request_object: RequestObject, framework: str):
         self.noentry_default = "-1"
-        if framework.lower() == "flask":
+        framework = framework.lower()
+        if framework == "flask":
+            self.storage_object = request_object
+        elif framework == "wsgi":
+            self.storage_object = request_object if isinstance(request_object, WsgiRequest) \
+                else WsgiRequest(request_object)  # type: ignore[arg-type]
+        elif framework == "asgi":
+            if not isinstance(request_object, AsgiRequest):
+                raise TypeError("ASGI requests have to be received first, use AsgiRequest.receive_from()")
             self.storage_object = request_object
         else:
             raise NotImplementedError
@@ -1022,22 +2327,120 @@ class PySpassRequest(PySpassStorage):
 
 
 class PySpassSession(PySpassStorage):
-    def __init__(self, session_object, framework: str):
-        if framework.lower() == "flask":
-            self.storage_object = session_object
+    """Access to the session values, independent of the web framework
+
+    Without a store the values are kept in the session of the framework, i.e. in the cookie for flask.
+    With a store the cookie only carries a session id, the values are kept server side, loaded on first access
+    and have to be written back with :meth:`save` at the end of the request.
+
+    :param session_object: The session of the framework, e.g. ``flask.session``. For "wsgi" and "asgi" any
+                           mutable mapping, e.g. the session provided by a middleware.
+    :param framework: One of "flask", "wsgi" or "asgi".
+    :param store: Optional server side store, e.g. :class:`LruSessionStore` or :class:`SqliteSessionStore`.
+    """
+
+    def __init__(self, session_object, framework: str, store: Optional[SessionStore] = None):
+        if framework.lower() in ("flask", "wsgi", "asgi"):
+            self.storage_object = session_object if store is None else StoredSession(session_object, store)
         else:
             raise NotImplementedError
 
     def __setitem__(self, key, value):
         self.storage_object[key] = value
 
+    def save(self) -> None:
+        """Persist changed values in the server side store, no-op for framework sessions"""
+        if isinstance(self.storage_object, StoredSession):
+            self.storage_object.save()
+
 
 class PySpassRenderer:
+    """Renders a page as a stream of bytes, optionally compressed while it is rendered
+
+    With compression, the chunks of :meth:`HtmlPage.stream` are fed into an incremental compressor. The compressor
+    is flushed after the head and whenever at least ``flush_size`` bytes of html have been fed since the last
+    flush, so the browser can start rendering while the rest of the page is built and memory stays proportional
+    to the chunk size.
+
+    :param lang: Language of the page.
+    :param compression: None, "gzip" or "deflate", see :meth:`negotiate` for choosing by request header.
+    :param compression_level: Level from 1 (fast) to 9 (small).
+    """
     page: HtmlPage
+    #: Script files included in every page
+    scripts: tuple[str, ...] = ('static/spass_forms.js',)
+    #: Stylesheets included in every page
+    stylesheets: tuple[str, ...] = ()
+    #: Optional asset manager providing fingerprinted urls for scripts and stylesheets
+    assets: Optional[AssetManager] = None
+    #: Minimum number of uncompressed bytes between two flushes of the compressor
+    flush_size: int = 1024
+    #: Formatting of the html, if None :attr:`HtmlObject.render_mode` is used
+    render_mode: Optional[RenderMode] = None
+    #: Optional limits for every page, shared by all instances
+    budget: Optional[PageBudget] = None
+    #: Maintain the lookup of nodes by id, class and tag while building, rejecting duplicate ids
+    indexed: bool = False
+
+    _WBITS = {'gzip': 16 + zlib.MAX_WBITS, 'deflate': zlib.MAX_WBITS}
+
+    def __init__(self, lang: str = 'de', compression: str | None = None, compression_level: int = 6):
+        if compression is not None and compression not in self._WBITS:
+            raise NotImplementedError(f"Compression {compression} not supported")
+        self.compression = compression
+        self.compression_level = compression_level
+        self.page = HtmlPage(root_app=self, lang=lang, render_mode=self.render_mode, budget=self.budget,
+                             indexed=self.indexed)
+        self.page.head.append(HtmlHead.prerender(self.scripts, self.stylesheets, self.assets, self.render_mode))
 
-    def __init__(self):
-        self.page = HtmlPage()
-        self.page.head.script(src='static/spass_forms.js')  # Fixme, make folder programatic
+    @property
+    def content_encoding(self) -> str | None:
+        """Value for the Content-Encoding header of the response"""
+        return self.compression
+
+    def render(self, executor: Optional[Executor] = None) -> Iterator[bytes]:
+        """Stream the page as bytes, e.g. for ``flask.Response(renderer.render())``"""
+        chunks = self.page.stream(executor)
+        if self.compression is None:
+            return (chunk.encode('utf-8') for chunk in chunks)
+        return self.compress(chunks, self.compression, self.compression_level, self.flush_size)
+
+    @classmethod
+    def compress(cls, chunks: Iterable[str], compression: str = 'gzip', level: int = 6,
+                 flush_size: int = 1024) -> Iterator[bytes]:
+        """Compress a stream of html chunks incrementally, the first chunk is always flushed"""
+        compressor = zlib.compressobj(level, zlib.DEFLATED, cls._WBITS[compression])
+        pending = 0
+        first = True
+        for chunk in chunks:
+            data = chunk.encode('utf-8')
+            pending += len(data)
+            compressed = compressor.compress(data)
+            if first or pending >= flush_size:
+                compressed += compressor.flush(zlib.Z_SYNC_FLUSH)
+                pending = 0
+                first = False
+            if compressed:
+                yield compressed
+        yield compressor.flush(zlib.Z_FINISH)
+
+    @classmethod
+    def negotiate(cls, accept_encoding: str | None) -> str | None:
+        """Choose the compression for the Accept-Encoding header of a request"""
+        accepted = {}
+        for entry in (accept_encoding or '').split(','):
+            name, _, params = entry.strip().partition(';')
+            quality = 1.0
+            if params.strip().startswith('q='):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+            accepted[name.strip().lower()] = quality
+        for compression in ('gzip', 'deflate'):
+            if accepted.get(compression, 0.0) > 0.0:
+                return compression
+        return None
 
 
 class PySpassApp(ABC):
@@ -1046,6 +2449,22 @@ class PySpassApp(ABC):
     page: HtmlPage
     session: PySpassSession
     request: PySpassRequest
+    #: Optional verifier shared by all requests, that runs affirm_credentials in a bounded thread pool
+    credential_verifier: Optional[CredentialVerifier] = None
+    #: Language of the pages
+    lang: str = 'de'
+    #: Script files included in every page, rendered once per class
+    scripts: tuple[str, ...] = ('static/spass_forms.js',)
+    #: Stylesheets included in every page, rendered once per class
+    stylesheets: tuple[str, ...] = ()
+    #: Optional asset manager providing fingerprinted urls for scripts and stylesheets
+    assets: Optional[AssetManager] = None
+    #: Formatting of the html, if None :attr:`HtmlObject.render_mode` is used
+    render_mode: Optional[RenderMode] = None
+    #: Optional limits for every page, shared by all instances, see :attr:`HtmlPage.usage` for the consumption
+    budget: Optional[PageBudget] = None
+    #: Maintain the lookup of nodes by id, class and tag while building, see :meth:`HtmlPage.find_by_id`
+    indexed: bool = False
 
     def __init__(self, app_name: str, request: PySpassRequest, session: PySpassSession):
         self.app_name = app_name
@@ -1054,9 +2473,49 @@ class PySpassApp(ABC):
         self.setup_page()
 
     def setup_page(self):
+        """Create the page with the static head shared by all requests
+
+        Dynamic additions to the head may be added to ``self.page.head`` afterwards.
+        """
         self.logger.info("Setup page root")
-        self.page = HtmlPage()
-        self.page.head.script(src='static/spass_forms.js')  # Fixme, make folder programatic
+        self.page = HtmlPage(root_app=self, lang=self.lang, render_mode=self.render_mode, budget=self.budget,
+                             indexed=self.indexed)
+        self.page.head.append(HtmlHead.prerender(self.scripts, self.stylesheets, self.assets, self.render_mode))
+
+    def fingerprint_inputs(self) -> Any:
+        """The inputs determining the page, e.g. request values and the version of the displayed data
+
+        Override to allow :meth:`etag` without building the page. The return value has to have a stable repr.
+        None means that the page itself has to be fingerprinted.
+        """
+        return None
+
+    def etag(self) -> str:
+        """Strong ETag from the declared inputs, the assets and the render mode, or from the page if no inputs are
+        declared"""
+        inputs = self.fingerprint_inputs()
+        if inputs is None:
+            return self.page.etag
+        hasher = hashlib.blake2b(digest_size=16)
+        assets = self.assets.fingerprint() if self.assets is not None else ''
+        hasher.update(f"{self.__class__.__module__}.{self.__class__.__qualname__}{self.lang}{self.scripts}"
+                      f"{self.stylesheets}{assets}{self.render_mode or HtmlObject.render_mode}{inputs!r}"
+                      .encode('utf-8'))
+        return f'"{hasher.hexdigest()}"'
+
+    def not_modified(self, if_none_match: str | None) -> bool:
+        """True if the client already has the current page, i.e. a 304 response may be sent without a body
+
+        With declared :meth:`fingerprint_inputs` this can be checked before the page is built.
+        """
+        return HtmlPage.etag_matches(self.etag(), if_none_match)
+
+    def profile(self, sink: Optional[Callable[[list[ComponentStats]], Any]] = None) -> RenderProfile:
+        """Context manager recording build and render costs of the components, reported to the logger by default
+
+        ``with app.profile(): ...`` wrapped around building and rendering the page shows which component is slow.
+        """
+        return RenderProfile(sink=sink, logger=self.logger)
 
     def display_login_form(self):
         self.logger.info("Display login form")
@@ -1079,8 +2538,12 @@ class PySpassApp(ABC):
         self.logger.debug("Login will be resolved")
         login_success: bool = False
         if self.request.get("submit_login"):
-            login_success = self.affirm_credentials(self.request.get(self.app_name + "_username_entry"),
-                                                    self.request.get(self.app_name + "_password_entry"))
+            username = self.request.get(self.app_name + "_username_entry")
+            password = self.request.get(self.app_name + "_password_entry")
+            if self.credential_verifier:
+                login_success = self.credential_verifier.verify(username, password, self.affirm_credentials)
+            else:
+                login_success = self.affirm_credentials(username, password)
         if login_success:
             self.session["success_login"] = True
             self.logger.debug("Login successful")
@@ -1092,3 +2555,91 @@ class PySpassApp(ABC):
     def affirm_credentials(self, username: str, password: str):
         self.logger.warning("Affirming credentials has to be implemented yet")
         return True
+
+
+class PySpassAsyncApp(PySpassApp, ABC):
+    """Asynchronous variant of :class:`PySpassApp` for ASGI servers
+
+    Login resolution, credential checks and page builders are coroutines. Components whose data comes from slow
+    sources are declared with :meth:`data_source` while building the page, all declared sources are awaited
+    concurrently by :meth:`render`. The latency of a page is therefore the one of its slowest source.
+    """
+
+    _data_sources: list[tuple['HtmlDiv', Union[Awaitable[Any], Callable[[], Any]],
+                              Callable[['HtmlContainer', Any], Any]]]
+
+    def __init__(self, app_name: str, request: PySpassRequest, session: PySpassSession):
+        self._data_sources = []
+        super().__init__(app_name, request, session)
+
+    def data_source(self, container: HtmlContainer, source: Union[Awaitable[Any], Callable[[], Any]],
+                    build: Optional[Callable[[HtmlContainer, Any], Any]] = None) -> 'HtmlDiv':
+        """Declare a component, that is built as soon as the data of its source is available
+
+        The position of the component is reserved by an empty div within the container. After the data has been
+        loaded, the build function is called with this div and the data and has to add the component to it.
+
+        :param container: The container the component is placed in.
+        :param source: An awaitable or a plain callable. Plain callables, e.g. queries with a synchronous driver,
+                       are executed in a worker thread.
+        :param build: Function or coroutine function adding the component, defaults to a :class:`ResultListing`
+                      of the data.
+        :return: The div reserved for the component
+        """
+        placeholder = container.div()
+        self._data_sources.append((placeholder, source, build or HtmlContainer.result_listing))
+        return placeholder
+
+    async def load_data_sources(self) -> None:
+        """Await all declared data sources concurrently and build their components"""
+        data_sources, self._data_sources = self._data_sources, []
+        if not data_sources:
+            return
+        self.logger.debug(f"Loading {len(data_sources)} data sources")
+        async with asyncio.TaskGroup() as task_group:
+            tasks = [task_group.create_task(self._load(source)) for _, source, _ in data_sources]
+        for (placeholder, _, build), task in zip(data_sources, tasks):
+            built = build(placeholder, task.result())
+            if inspect.isawaitable(built):
+                await built
+
+    @staticmethod
+    async def _load(source: Union[Awaitable[Any], Callable[[], Any]]) -> Any:
+        if inspect.isawaitable(source):
+            return await source
+        result = await asyncio.to_thread(source)  # type: ignore[arg-type]
+        return await result if inspect.isawaitable(result) else result
+
+    async def render(self) -> str:
+        """Load all pending data sources and deferred nodes and return the complete html of the page"""
+        await self.load_data_sources()
+        while nodes := list(HtmlDeferred.iter_unresolved([self.page.head, self.page.body])):
+            await asyncio.gather(*(node.force_async() for node in nodes))
+        return self.page.html
+
+    async def resolve_login(self) -> bool:  # type: ignore[override]
+        self.logger.info("Resolving login")
+        if self.session.get("success_login"):
+            self.logger.debug("Login already established")
+            return True
+        self.logger.debug("Login will be resolved")
+        login_success: bool = False
+        if self.request.get("submit_login"):
+            username = self.request.get(self.app_name + "_username_entry")
+            password = self.request.get(self.app_name + "_password_entry")
+            if self.credential_verifier:
+                login_success = await self.credential_verifier.verify_async(username, password,
+                                                                            self.affirm_credentials)
+            else:
+                login_success = await self.affirm_credentials(username, password)
+        if login_success:
+            self.session["success_login"] = True
+            self.logger.debug("Login successful")
+            return True
+        self.display_login_form()
+        return False
+
+    @abstractmethod
+    async def affirm_credentials(self, username: str, password: str):  # type: ignore[override]
+        self.logger.warning("Affirming credentials has to be implemented yet")
+        return True
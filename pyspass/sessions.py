@@ -0,0 +1,192 @@
+import json
+import secrets
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import MutableMapping, Iterator
+from pathlib import Path
+from typing import Any, Optional, Union
+
+
+class SessionStore(ABC):
+    """Interface for server side storage of session values
+
+    Stores only deal with serialized payloads, the values are (de)serialized as json by :class:`StoredSession`.
+    """
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[bytes]:
+        """Return the payload of the session or None, if unknown or expired"""
+
+    @abstractmethod
+    def save(self, session_id: str, payload: bytes) -> None:
+        """Store the payload of the session"""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Remove the session from the store"""
+
+    @staticmethod
+    def new_id() -> str:
+        return secrets.token_urlsafe(24)
+
+
+class LruSessionStore(SessionStore):
+    """In-process store, that keeps the most recently used sessions
+
+    Suitable for a single worker process, sessions are lost on restart.
+
+    :param max_entries: Number of sessions kept, the least recently used ones are dropped first.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str) -> Optional[bytes]:
+        with self._lock:
+            payload = self._entries.get(session_id)
+            if payload is not None:
+                self._entries.move_to_end(session_id)
+            return payload
+
+    def save(self, session_id: str, payload: bytes) -> None:
+        with self._lock:
+            self._entries[session_id] = payload
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SqliteSessionStore(SessionStore):
+    """Store in a local SQLite file, shared by all worker processes on the host
+
+    :param path: Path of the database file, created if not existing.
+    :param max_age: Seconds after the last change of a session, after which it expires.
+    """
+
+    def __init__(self, path: Union[str, Path], max_age: int = 86400):
+        self.path = str(path)
+        self.max_age = max_age
+        self._local = threading.local()
+        with self._connection() as con:
+            con.execute("CREATE TABLE IF NOT EXISTS pyspass_session ("
+                        "session_id TEXT PRIMARY KEY, payload BLOB NOT NULL, accessed REAL NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        con = getattr(self._local, 'connection', None)
+        if con is None:
+            con = sqlite3.connect(self.path, timeout=10)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = con
+        return con
+
+    def load(self, session_id: str) -> Optional[bytes]:
+        row = self._connection().execute("SELECT payload FROM pyspass_session WHERE session_id = ? AND accessed > ?",
+                                         (session_id, time.time() - self.max_age)).fetchone()
+        return row[0] if row else None
+
+    def save(self, session_id: str, payload: bytes) -> None:
+        with self._connection() as con:
+            con.execute("INSERT OR REPLACE INTO pyspass_session (session_id, payload, accessed) VALUES (?, ?, ?)",
+                        (session_id, payload, time.time()))
+
+    def delete(self, session_id: str) -> None:
+        with self._connection() as con:
+            con.execute("DELETE FROM pyspass_session WHERE session_id = ?", (session_id,))
+
+    def purge_expired(self) -> int:
+        """Delete all expired sessions and return their number"""
+        with self._connection() as con:
+            return con.execute("DELETE FROM pyspass_session WHERE accessed <= ?",
+                               (time.time() - self.max_age,)).rowcount
+
+
+class StoredSession(MutableMapping):
+    """Session values held in a :class:`SessionStore`, while the cookie only holds the session id
+
+    The values are loaded from the store on first access and written back by :meth:`save` only if they were
+    changed, so requests that never touch the session never pay for it. Changes within mutable values, e.g.
+    appending to a list, are only noticed if the value is assigned again.
+
+    The values are stored as json like the values of cookie sessions, so they have to be json serializable, tuples
+    are loaded as lists. Payloads that are no json object, e.g. written by former versions, are ignored. Unlike
+    pickle, loading a payload never runs code, even if someone can write to the store.
+
+    :param cookie_session: The cookie based session of the framework, e.g. ``flask.session``.
+    :param store: The store holding the values.
+    :param key: Name of the entry in the cookie session holding the session id.
+    """
+
+    def __init__(self, cookie_session: MutableMapping, store: SessionStore, key: str = '_spass_sid'):
+        self.cookie_session = cookie_session
+        self.store = store
+        self.key = key
+        self._values: Optional[dict[str, Any]] = None
+        self.modified: bool = False
+
+    @property
+    def session_id(self) -> Optional[str]:
+        return self.cookie_session.get(self.key)
+
+    @property
+    def values_loaded(self) -> bool:
+        return self._values is not None
+
+    def _load(self) -> dict[str, Any]:
+        if self._values is None:
+            payload = self.store.load(self.session_id) if self.session_id else None
+            self._values = self._deserialize(payload) if payload else {}
+        return self._values
+
+    def __getitem__(self, key: str) -> Any:
+        return self._load()[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._load()[key] = value
+        self.modified = True
+
+    def __delitem__(self, key: str) -> None:
+        del self._load()[key]
+        self.modified = True
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def save(self) -> None:
+        """Write the values to the store, if they were changed within this request"""
+        if not self.modified:
+            return
+        if not self.session_id:
+            self.cookie_session[self.key] = self.store.new_id()
+        self.store.save(self.session_id, json.dumps(self._values, separators=(',', ':')).encode('utf-8'))
+        self.modified = False
+
+    @staticmethod
+    def _deserialize(payload: bytes) -> dict[str, Any]:
+        try:
+            values = json.loads(payload)
+        except ValueError:  # also UnicodeDecodeError
+            return {}
+        return values if isinstance(values, dict) else {}
+
+    def clear(self) -> None:
+        if self.session_id:
+            self.store.delete(self.session_id)
+            del self.cookie_session[self.key]
+        self._values = {}
+        self.modified = False
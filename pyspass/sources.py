@@ -0,0 +1,63 @@
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Sequence
+from itertools import islice
+from typing import Any, Optional
+
+
+class RowSource(ABC):
+    """Rows of a listing, that are fetched slice by slice while scrolling, see the viewport of ResultListing
+
+    The endpoint returning further rows builds the listing again, so the source has to deliver the same rows in
+    the same order for every request.
+    """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Total number of rows"""
+
+    @abstractmethod
+    def rows(self, offset: int, limit: int) -> Sequence[Any]:
+        """The rows from offset on, at most limit of them"""
+
+
+class SequenceSource(RowSource):
+    """Slices of rows held in memory, e.g. a dataset cached by the app between requests
+
+    :param rows: Sequence of rows, e.g. a list of dicts.
+    """
+
+    def __init__(self, rows: Sequence[Any]):
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def rows(self, offset: int, limit: int) -> Sequence[Any]:
+        try:
+            return self._rows[offset:offset + limit]
+        except TypeError:  # not sliceable
+            return list(islice(self._rows, offset, offset + limit))
+
+
+class QuerySource(RowSource):
+    """Rows queried slice by slice, e.g. with LIMIT and OFFSET pushed down to the database
+
+    :param fetch: Callable returning the rows for offset and limit, e.g. running the query with these values.
+    :param count: Callable returning the total number of rows, called once.
+    """
+
+    def __init__(self, fetch: Callable[[int, int], Sequence[Any]], count: Callable[[], int]):
+        self._fetch = fetch
+        self._count = count
+        self._total: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._total is None:
+                self._total = self._count()
+            return self._total
+
+    def rows(self, offset: int, limit: int) -> Sequence[Any]:
+        return self._fetch(offset, limit)
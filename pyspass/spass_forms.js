@@ -0,0 +1,288 @@
+const requestvar_prefix = '_rct_selected_';
+
+/**
+ *
+ * @param formId
+ * @param jsonArgs
+ *
+ * TODO: create hidden in function. Not yet feasable because of other function cause by hidden value.
+ */
+function entryChoiceSetSelection(formId, jsonArgs){
+    for(var key in jsonArgs){
+        document.getElementById(requestvar_prefix.concat(key)).value=jsonArgs[key];
+    }
+    document.forms[formId].submit();
+}
+
+/**
+ *
+ * @param formId
+ * @param rowIdentifier
+ * @param value
+ */
+function entryMultiChoiceSetSelection(formId, rowIdentifier, value){
+    const separator = ';';
+
+    if(!document.getElementById(requestvar_prefix.concat(rowIdentifier)).value){
+        document.getElementById(requestvar_prefix.concat(rowIdentifier)).value=value;
+    }else{
+        var idArray =  document.getElementById(requestvar_prefix.concat(rowIdentifier)).value.split(separator);
+        if(idArray.indexOf(value)>-1){
+            idArray.splice(idArray.indexOf(value), 1)
+            document.getElementById(requestvar_prefix.concat(rowIdentifier)).value = idArray.join(separator);
+        }else{
+            document.getElementById(requestvar_prefix.concat(rowIdentifier)).value+=';'+value;
+        }
+    }
+    document.forms[formId].submit();
+}
+
+/**
+ * Move a streamed chunk into its placeholder, see HtmlPage.stream
+ *
+ * @param slot  identifier of the placeholder and its template chunk
+ */
+function spassFillSlot(slot){
+    var placeholder = document.querySelector('[data-spass-slot="' + slot + '"]');
+    var chunk = document.querySelector('template[data-spass-chunk="' + slot + '"]');
+    if(!placeholder || !chunk){
+        return;
+    }
+    placeholder.replaceChildren(chunk.content);
+    placeholder.removeAttribute('data-spass-slot');
+    chunk.remove();
+    spassRenderListings(placeholder);
+}
+
+/**
+ * Build the tables of listings sent as json, see ResultListing(client_side=True)
+ *
+ * @param root  element containing the listings, the document if omitted
+ */
+function spassRenderListings(root){
+    var islands = (root || document).querySelectorAll('script.spass-listing');
+    for(var i = 0; i < islands.length; i++){
+        spassRenderListing(islands[i]);
+    }
+}
+
+/**
+ * Replace the json of one listing by its table
+ *
+ * @param island  script element of type application/json
+ */
+function spassRenderListing(island){
+    var data = JSON.parse(island.textContent);
+    var table = document.createElement('table');
+    var head = document.createElement('thead');
+    var body = document.createElement('tbody');
+    if(data.class){
+        table.className = data.class;
+    }
+    table.appendChild(head);
+    table.appendChild(body);
+    var header = head.insertRow();
+    for(var c = 0; c < data.header.length; c++){
+        var th = document.createElement('th');
+        spassFillCell(th, data.header[c]);
+        header.appendChild(th);
+    }
+    if(data.footer){
+        spassAppendFooter(table.createTFoot(), data.footer);
+    }
+    if(data.fetch){
+        island.replaceWith(spassScrollListing(table, body, data));
+        return;
+    }
+    spassAppendRows(body, data, data.choice);
+    if(data.notice){
+        var notice = body.insertRow();
+        var cell = notice.insertCell();
+        notice.className = 'spass-truncated';
+        cell.colSpan = Math.max(data.header.length, 1);
+        cell.textContent = data.notice;
+    }
+    island.replaceWith(table);
+}
+
+/**
+ * Append the subtotal and total rows of a listing
+ *
+ * @param foot    tfoot
+ * @param footer  rows of class and cells
+ */
+function spassAppendFooter(foot, footer){
+    for(var r = 0; r < footer.length; r++){
+        var row = foot.insertRow();
+        row.className = footer[r].class;
+        for(var c = 0; c < footer[r].cells.length; c++){
+            spassFillCell(row.insertCell(), footer[r].cells[c]);
+        }
+    }
+}
+
+/**
+ * Append the rows of a block of column oriented values
+ *
+ * @param body    tbody
+ * @param block   rows, columns and for choices keys and selected positions within the block in block.choice
+ * @param choice  settings of the choice, undefined for listings
+ */
+function spassAppendRows(body, block, choice){
+    var selected = {};
+    if(choice){
+        for(var s = 0; s < block.choice.selected.length; s++){
+            selected[block.choice.selected[s]] = true;
+        }
+    }
+    for(var r = 0; r < block.rows; r++){
+        var row = body.insertRow();
+        for(var c = 0; c < block.columns.length; c++){
+            spassFillCell(row.insertCell(), block.columns[c][r]);
+        }
+        if(choice){
+            spassBindChoice(row, choice, block.choice.keys, r, selected[r]);
+        }
+    }
+}
+
+/**
+ * @param cell   td or th
+ * @param value  text, or {html: ...} for markup
+ */
+function spassFillCell(cell, value){
+    if(value !== null && typeof value === 'object'){
+        cell.innerHTML = value.html;
+    }else{
+        cell.textContent = value;
+    }
+}
+
+/**
+ * Post the selection of a row like the onclick handlers of ResultChoice rendered on the server
+ *
+ * @param row       tr
+ * @param choice    form, index columns, trigger name, multi selection and selected class
+ * @param keys      values of the index columns, one array per column
+ * @param r         number of the row within keys
+ * @param selected  true if the row is selected
+ */
+function spassBindChoice(row, choice, keys, r, selected){
+    var args = {};
+    for(var k = 0; k < choice.index.length; k++){
+        args[choice.index[k]] = keys[k][r];
+    }
+    if(selected){
+        row.className = choice.selectedClass;
+    }
+    if(choice.multi){
+        row.onclick = function(){
+            entryMultiChoiceSetSelection(choice.form, choice.index[0], args[choice.index[0]]);
+        };
+    }else{
+        args[choice.trigger] = 'true';
+        row.onclick = function(){
+            entryChoiceSetSelection(choice.form, args);
+        };
+    }
+}
+
+/**
+ * Virtual scrolling: only the visible rows are in the document, blocks of rows are fetched while scrolling
+ *
+ * The blocks are fetched from data.fetch, see ResultListing.fragment_for. Rows not shown are replaced by
+ * spacer rows of the same height, so the scrollbar reflects all rows.
+ *
+ * @param table  table with its header
+ * @param body   tbody of the table
+ * @param data   the json of the listing with the first block of rows
+ * @return the scrolled element containing the table
+ */
+function spassScrollListing(table, body, data){
+    var box = document.createElement('div');
+    var chunk = Math.max(data.chunk, 1);
+    var columns = Math.max(data.header.length, 1);
+    var blocks = {0: data};
+    var pending = {};
+    var rowHeight = 0;
+    var scheduled = false;
+    box.className = 'spass-scroll';
+    box.style.overflowY = 'auto';
+    box.style.maxHeight = data.height;
+    box.appendChild(table);
+
+    function spacer(rows){
+        var row = body.insertRow();
+        var cell = row.insertCell();
+        cell.colSpan = columns;
+        cell.style.padding = '0';
+        cell.style.border = '0';
+        cell.style.height = (rows * rowHeight) + 'px';
+    }
+
+    function fetchBlock(offset){
+        var url = data.fetch + (data.fetch.indexOf('?') < 0 ? '?' : '&') + data.params.offset + '=' + offset +
+            '&' + data.params.limit + '=' + chunk;
+        pending[offset] = true;
+        fetch(url, {credentials: 'same-origin'}).then(function(response){
+            return response.json();
+        }).then(function(block){
+            blocks[offset] = block;
+            delete pending[offset];
+            schedule();
+        }, function(){
+            delete pending[offset];
+        });
+    }
+
+    function draw(){
+        scheduled = false;
+        if(!rowHeight){
+            rowHeight = body.rows.length ? body.rows[0].offsetHeight || 24 : 24;
+        }
+        var first = Math.floor(box.scrollTop / rowHeight);
+        var visible = Math.ceil(box.clientHeight / rowHeight) + 1;
+        var start = Math.floor(first / chunk) * chunk;
+        var end = Math.min(data.total, first + visible);
+        body.replaceChildren();
+        if(start > 0){
+            spacer(start);
+        }
+        for(var offset = start; offset < end; offset += chunk){
+            var block = blocks[offset];
+            if(block){
+                spassAppendRows(body, block, data.choice);
+            }else{
+                if(!pending[offset]){
+                    fetchBlock(offset);
+                }
+                spacer(Math.min(chunk, data.total - offset));
+            }
+        }
+        var shown = Math.min(data.total, Math.max(offset, start));
+        if(shown < data.total){
+            spacer(data.total - shown);
+        }
+        for(var cached in blocks){  // keep the memory bounded while scrolling through huge listings
+            if(Math.abs(cached - start) > 20 * chunk){
+                delete blocks[cached];
+            }
+        }
+    }
+
+    function schedule(){
+        if(!scheduled){
+            scheduled = true;
+            window.requestAnimationFrame(draw);
+        }
+    }
+
+    spassAppendRows(body, data, data.choice);
+    box.addEventListener('scroll', schedule);
+    schedule();
+    return box;
+}
+
+document.addEventListener('DOMContentLoaded', function(){
+    spassRenderListings(document);
+});
@@ -0,0 +1,78 @@
+import pytest
+
+from pyspass import QuerySource, aggregate, pivot
+
+ROWS = [{'group': 'b', 'amount': 2, 'price': 1.5},
+        {'group': 'a', 'amount': 1, 'price': None},
+        {'group': 'b', 'amount': 4, 'price': 2.5}]
+AGGREGATES = {'amount': 'sum', 'price': 'avg'}
+
+
+class TestAggregate:
+
+    def test_totals_and_groups(self):
+        result = aggregate(ROWS, AGGREGATES, group_by='group')
+        assert result.totals == {'amount': 7, 'price': 2.0}
+        assert list(result.groups) == ['a', 'b']
+        assert result.groups['a'] == {'amount': 1, 'price': None}
+        assert result.groups['b'] == {'amount': 6, 'price': 2.0}
+
+    def test_count_min_max_in_chunks(self):
+        result = aggregate(ROWS, {'amount': 'min', 'price': 'count', 'group': 'max'}, chunk_rows=2)
+        assert result.totals == {'amount': 1, 'price': 2, 'group': 'b'}
+        assert result.groups == {}
+
+    def test_row_source(self):
+        source = QuerySource(lambda offset, limit: ROWS[offset:offset + limit], lambda: len(ROWS))
+        assert aggregate(source, AGGREGATES, group_by='group').totals == {'amount': 7, 'price': 2.0}
+
+    def test_group_by_several_columns(self):
+        result = aggregate(ROWS, {'amount': 'max'}, group_by=['group', 'price'])
+        assert list(result.groups) == [('a', None), ('b', 1.5), ('b', 2.5)]
+        assert result.groups[('b', 2.5)] == {'amount': 4}
+
+    def test_sum_of_no_values(self):
+        rows = [{'group': 'a', 'amount': None}, {'group': 'b', 'amount': 1}]
+        result = aggregate(rows, {'amount': 'sum'}, group_by='group')
+        assert result.groups == {'a': {'amount': 0}, 'b': {'amount': 1}}
+        assert aggregate([], {'amount': 'sum', 'group': 'min'}).totals == {'amount': 0, 'group': None}
+
+    def test_unknown_aggregate(self):
+        with pytest.raises(ValueError):
+            aggregate(ROWS, {'amount': 'median'})
+
+    def test_numpy_columns(self):
+        np = pytest.importorskip('numpy')
+        columns = {'group': np.array(['b', 'a', 'b']), 'amount': np.array([2, 1, 4]),
+                   'price': np.array([1.5, np.nan, 2.5])}
+        assert aggregate(columns, AGGREGATES, group_by='group') == aggregate(ROWS, AGGREGATES, group_by='group')
+        assert aggregate(columns, {'price': 'sum'}, 'group') == aggregate(ROWS, {'price': 'sum'}, 'group')
+
+    def test_dataframe(self):
+        pd = pytest.importorskip('pandas')
+        frame = pd.DataFrame(ROWS)
+        assert aggregate(frame, AGGREGATES, group_by='group') == aggregate(ROWS, AGGREGATES, group_by='group')
+        assert aggregate(frame, {'price': 'count'}, group_by='group').groups == {'a': {'price': 0},
+                                                                                 'b': {'price': 2}}
+        assert aggregate(frame, {'price': 'sum'}, group_by='group') == aggregate(ROWS, {'price': 'sum'}, 'group')
+
+
+class TestPivot:
+
+    def test_cells_by_row_and_column_keys(self):
+        result = pivot(ROWS, 'group', 'amount', 'price', 'max')
+        assert result.row_keys == ['a', 'b']
+        assert result.column_keys == [1, 2, 4]
+        assert result.cells == [[None, None, None], [None, 1.5, 2.5]]
+
+    def test_several_key_columns(self):
+        rows = [{'year': 2021, 'region': 'n', 'month': 1, 'sales': 3}, {'year': 2020, 'region': 's', 'month': 2,
+                                                                          'sales': 4}]
+        result = pivot(rows, ['year', 'region'], ['month'], 'sales', 'count')
+        assert result.row_keys == [(2020, 's'), (2021, 'n')]
+        assert result.column_keys == [(1,), (2,)]
+        assert result.cells == [[None, 1], [1, None]]
+
+    def test_dataframe(self):
+        pd = pytest.importorskip('pandas')
+        assert pivot(pd.DataFrame(ROWS), 'amount', 'group', 'price') == pivot(ROWS, 'amount', 'group', 'price')
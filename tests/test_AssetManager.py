@@ -0,0 +1,79 @@
+import gzip
+
+import pytest
+
+from pyspass import AssetManager, PySpassApp, PySpassRequest, PySpassSession, HtmlHead, minify_js, minify_css
+
+
+class TestAssetManager:
+
+    def test_minify_js(self):
+        source = "// comment\nvar a = 'http://x'; /* block\ncomment */\n    var b = \"//\";\n\n"
+        assert minify_js(source) == "var a = 'http://x';\nvar b = \"//\";"
+
+    def test_minify_css(self):
+        assert minify_css("/* c */ td , th {\n  text-align : right;\n}\n") == "td,th{text-align:right}"
+
+    def test_register_bundled(self, tmp_path):
+        assets = AssetManager(tmp_path)
+        asset = assets.register_bundled()
+        assert asset.name == 'static/spass_forms.js'
+        assert asset.url.startswith('static/spass_forms.') and asset.url != asset.name
+        file_name = asset.url.removeprefix('static/')
+        assert (tmp_path / file_name).read_text() == asset.content
+        assert gzip.decompress((tmp_path / (file_name + '.gz')).read_bytes()).decode() == asset.content
+        assert "spassFillSlot" in asset.content
+        assert "/**" not in asset.content
+
+    def test_fingerprint_changes_with_content(self, tmp_path):
+        source = tmp_path / "app.js"
+        source.write_text("var a = 1;")
+        first = AssetManager(tmp_path / "out").register(source)
+        source.write_text("var a = 2;")
+        second = AssetManager(tmp_path / "out").register(source)
+        assert first.url != second.url
+
+    def test_head_helpers_use_fingerprinted_urls(self, tmp_path):
+        assets = AssetManager(tmp_path)
+        asset = assets.register_bundled()
+        head = HtmlHead()
+        head.assets = assets
+        head.script(src='static/spass_forms.js')
+        head.script(src='static/other.js')
+        assert f'src="{asset.url}"' in str(head)
+        assert 'src="static/other.js"' in str(head)
+
+    def test_inline_mode(self, tmp_path):
+        source = tmp_path / "small.css"
+        source.write_text("td { color: red; }")
+        assets = AssetManager(tmp_path / "out", inline_max_bytes=100)
+        assets.register(source)
+        head = HtmlHead()
+        head.assets = assets
+        head.resourcelink("stylesheet", "static/small.css", "text/css")
+        assert "<style>" in str(head)
+        assert "td{color:red}" in str(head)
+
+    def test_app_with_assets(self, tmp_path):
+        assets = AssetManager(tmp_path)
+        asset = assets.register_bundled()
+
+        class App(PySpassApp):
+            def affirm_credentials(self, username: str, password: str):
+                return True
+
+        App.assets = assets
+        app = App("app", PySpassRequest({}, framework="wsgi"), PySpassSession({}, framework="wsgi"))
+        assert f'src="{asset.url}"' in app.page.html
+        app.page.body.script(src='static/spass_forms.js')
+        assert app.page.html.count(f'src="{asset.url}"') == 2
+
+    def test_precompressed(self, tmp_path):
+        assets = AssetManager(tmp_path)
+        file_name = assets.register_bundled().url.removeprefix('static/')
+        path, encoding = assets.precompressed(file_name, 'gzip, deflate')
+        assert encoding == 'gzip' and path.name.endswith('.gz')
+        path, encoding = assets.precompressed(file_name, '')
+        assert encoding is None and path.name == file_name
+        with pytest.raises(ValueError):
+            assets.precompressed('../' + file_name)
@@ -0,0 +1,29 @@
+import datetime
+
+from pyspass import ColumnFormat, compile_format
+
+
+class TestColumnFormat:
+
+    def test_numbers(self):
+        assert compile_format(',.2f')(1234.5) == '1,234.50'
+        assert compile_format('.1%')(0.125) == '12.5%'
+        assert compile_format('05d')(42) == '00042'
+
+    def test_dates(self):
+        assert compile_format('%d.%m.%Y')(datetime.date(2024, 2, 29)) == '29.02.2024'
+        assert compile_format('%H:%M')(datetime.datetime(2024, 2, 29, 8, 5)) == '08:05'
+
+    def test_none_placeholder(self):
+        assert compile_format(',.2f')(None) == ''
+        assert compile_format(ColumnFormat(',.2f', none='n/a'))(None) == 'n/a'
+
+    def test_values_not_matching_the_format(self):
+        assert compile_format(',.2f')('text') == 'text'
+        assert compile_format('%d.%m.%Y')(17) == '17'
+
+    def test_compiled_once(self):
+        assert compile_format(',.2f') is compile_format(ColumnFormat(',.2f'))
+
+    def test_callable(self):
+        assert compile_format(str.upper)('abc') == 'ABC'
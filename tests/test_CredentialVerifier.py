@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from pyspass import CredentialVerifier, PySpassApp, PySpassRequest, PySpassSession
+
+
+class SlowCheck:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, username: str, password: str) -> bool:
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return password == "secret"
+
+
+class App(PySpassApp):
+    credential_verifier = CredentialVerifier(max_workers=1)
+
+    def affirm_credentials(self, username: str, password: str):
+        return password == "secret"
+
+
+def run_parallel(count: int, target) -> list:
+    results: list = [None] * count
+
+    def run(i):
+        results[i] = target()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestCredentialVerifier:
+
+    def test_verify(self):
+        verifier = CredentialVerifier()
+        check = SlowCheck()
+        assert verifier.verify("user", "secret", check)
+        assert not verifier.verify("user", "wrong", check)
+        assert verifier.stats['verified'] == 1
+        assert verifier.stats['failed'] == 1
+
+    def test_concurrent_attempts_are_coalesced(self):
+        verifier = CredentialVerifier(max_pending=2)
+        check = SlowCheck(delay=0.2)
+        results = run_parallel(5, lambda: verifier.verify("user", "secret", check))
+        assert all(results)
+        assert check.calls == 1
+        assert verifier.stats['coalesced'] == 4
+
+    def test_burst_is_rejected_when_busy(self):
+        verifier = CredentialVerifier(max_workers=1, max_pending=2)
+        check = SlowCheck(delay=0.2)
+        start = time.perf_counter()
+        results = run_parallel(6, lambda: verifier.verify(f"user{threading.get_ident()}", "secret", check))
+        assert time.perf_counter() - start < 1.0
+        assert results.count(True) == 2
+        assert check.calls == 2
+        assert verifier.stats['rejected_busy'] == 4
+
+    def test_repeated_failures_are_throttled(self):
+        verifier = CredentialVerifier(max_failures=3, lockout_seconds=60)
+        check = SlowCheck()
+        for _ in range(3):
+            assert not verifier.verify("user", "wrong", check)
+        assert verifier.is_throttled("user")
+        assert not verifier.verify("user", "secret", check)
+        assert check.calls == 3
+        assert verifier.stats['throttled'] == 1
+        assert not verifier.is_throttled("other_user")
+
+    def test_timeout(self):
+        verifier = CredentialVerifier(timeout=0.05)
+        assert not verifier.verify("user", "secret", SlowCheck(delay=0.2))
+        assert verifier.stats['timeout'] == 1
+
+    def test_coroutine_check_on_running_loop(self):
+        verifier = CredentialVerifier(max_workers=1)
+        loops = []
+
+        async def check(username: str, password: str) -> bool:
+            loops.append(asyncio.get_running_loop())
+            await asyncio.sleep(0.05)
+            return password == "secret"
+
+        async def attempts():
+            results = await asyncio.gather(verifier.verify_async("user", "secret", check),
+                                           verifier.verify_async("user", "secret", check),
+                                           verifier.verify_async("other", "wrong", check))
+            return results, asyncio.get_running_loop()
+
+        results, loop = asyncio.run(attempts())
+        assert results == [True, True, False]
+        assert loops == [loop, loop]
+        assert verifier.stats['coalesced'] == 1
+        with pytest.raises(ValueError):
+            verifier.submit("user", "secret", check)
+
+    def test_slot_released_if_submit_fails(self):
+        verifier = CredentialVerifier(max_pending=2)
+        verifier.shutdown()
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                verifier.verify("user", "secret", SlowCheck())
+        assert verifier.stats['rejected_busy'] == 0
+
+    def test_resolve_login_with_verifier(self):
+        session: dict = {}
+        request = PySpassRequest({'QUERY_STRING': 'submit_login=1&app_username_entry=user&app_password_entry=secret'},
+                                 framework="wsgi")
+        app = App("app", request, PySpassSession(session, framework="wsgi"))
+        assert app.resolve_login()
+        assert session["success_login"]
+        assert App.credential_verifier.stats['verified'] == 1
@@ -0,0 +1,56 @@
+from pyspass import HtmlDiv, HtmlForm, HtmlTextArea, Markup, RenderMode, escape, escape_column
+
+
+class TestMarkup:
+
+    def test_escape(self):
+        assert escape('<b>"Tom" & Jerry</b>') == '&lt;b&gt;"Tom" &amp; Jerry&lt;/b&gt;'
+        assert escape(Markup('<b>bold</b>')) == '<b>bold</b>'
+        assert escape(escape('a & b')) == 'a &amp; b'  # no double escaping
+        assert escape(12) == '12'
+
+    def test_escape_column(self):
+        assert escape_column(['a<b', 'a<b', 1, 1.5, None, Markup('<i>x</i>')]) == \
+               ['a&lt;b', 'a&lt;b', '1', '1.5', 'None', '<i>x</i>']
+        assert escape_column(['a<b', 2, None]) == ['a&lt;b', '2', 'None']
+        assert escape_column(['a\x00b', '&']) == ['a\x00b', '&amp;']
+        assert escape_column([]) == []
+
+    def test_result_listing_values_are_escaped(self):
+        div = HtmlDiv()
+        div.result_listing([{'name': '<script>alert(1)</script>', 'link': Markup('<a href="x">x</a>')}],
+                           mapping={'name': 'Name & Title', 'link': 'Link'})
+        html = div.render(RenderMode.COMPACT)
+        assert '<td>&lt;script&gt;alert(1)&lt;/script&gt;</td>' in html
+        assert '<td><a href="x">x</a></td>' in html
+        assert '<th>Name &amp; Title</th>' in html
+
+    def test_attributes_are_escaped(self):
+        div = HtmlDiv(id_html='a"b')
+        div.hidden('field', value='<"value">')
+        html = div.render(RenderMode.COMPACT)
+        assert 'id="a&quot;b"' in html
+        assert 'value="&lt;&quot;value&quot;&gt;"' in html
+
+    def test_select_options_are_escaped(self):
+        div = HtmlDiv()
+        drop = div.dropdown('abc', {'a&b': '<A & B>'}, var_input='a&b')
+        assert '<option value="a&amp;b" selected="selected">&lt;A &amp; B&gt;</option>' in str(drop)
+
+    def test_textarea_is_escaped(self):
+        assert '>&lt;/textarea&gt;</textarea>' in str(HtmlTextArea('text', var_input='</textarea>'))
+
+    def test_result_choice_codes_and_onclick(self):
+        form = HtmlForm(id_html='form_id')
+        choice = form.result_choice([{'id': "it's", 'state': 'a&b'}], listing_index='id', row_selected=None)
+        choice.set_codes('state', {'a&b': 'A & B'})
+        choice.compose()
+        html = form.render(RenderMode.COMPACT)
+        assert "{'id':'it\\'s'," in html
+        assert '<td>A &amp; B</td>' in html
+
+    def test_result_editor_does_not_escape_twice(self):
+        form = HtmlForm(id_html='form_id')
+        editor = form.result_editor([{'id': 1, 'name': 'a & b'}], listing_index='id', row_selected='1')
+        editor.compose()
+        assert 'value="a &amp; b"' in form.render(RenderMode.COMPACT)
@@ -0,0 +1,119 @@
+import pytest
+
+from pyspass import (BudgetExceeded, HtmlPage, PageBudget, PySpassApp, PySpassRequest, PySpassSession, RenderMode,
+                     ResultListing)
+
+
+def rows(count: int) -> list[dict]:
+    return [{'id': i, 'name': f'name {i}'} for i in range(count)]
+
+
+class App(PySpassApp):
+    budget = PageBudget(max_nodes=500)
+
+    def affirm_credentials(self, username: str, password: str):
+        return True
+
+
+class TestPageBudget:
+
+    def test_factory_truncates_listing(self):
+        budget = PageBudget(max_nodes=200)
+        page = HtmlPage(budget=budget)
+        form = page.body.form('form')
+        choice = form.result_choice(rows(1000), 'id', row_selected='3', rowcount_max=1000)
+        choice.compose()
+        assert choice.truncated
+        assert len(choice.table_) < 100
+        assert page.usage.nodes <= 200
+        assert "of 1000 rows shown" in page.render(RenderMode.COMPACT)
+        assert budget.stats['truncated'] == 1
+        assert budget.stats['near_limit'] == 1
+
+    def test_added_listing_is_truncated(self):
+        page = HtmlPage(budget=PageBudget(max_nodes=100))
+        listing = page.body.div().add(ResultListing(rows(1000), rowcount_max=1000))
+        assert listing.truncated
+        assert page.usage.nodes <= 100
+
+    def test_raise(self):
+        budget = PageBudget(max_nodes=100, truncate=False)
+        page = HtmlPage(budget=budget)
+        with pytest.raises(BudgetExceeded):
+            page.body.result_listing(rows(1000), rowcount_max=1000)
+        assert budget.stats['exceeded'] == 1
+
+    def test_exceeding_node_not_added(self):
+        page = HtmlPage(budget=PageBudget(max_nodes=3))
+        for _ in range(3):
+            page.body.div()
+        with pytest.raises(BudgetExceeded):
+            page.body.div()
+        assert len(page.body) == 3
+        assert page.usage.nodes == 3
+
+    def test_exceeding_rows_not_added(self):
+        page = HtmlPage(budget=PageBudget(max_nodes=10, truncate=False))
+        table = page.body.table()
+        with pytest.raises(BudgetExceeded):
+            table.add_rows([['a', 'b']] * 5)
+        assert len(table) == 0
+        assert page.usage.nodes == 1
+
+    def test_nodes_added_to_children_are_counted(self):
+        page = HtmlPage(budget=PageBudget(max_nodes=1000))
+        listing = page.body.result_listing(rows(10))
+        nodes = page.usage.nodes
+        listing.table_.tr().td("extra")
+        assert page.usage.nodes == nodes + 2
+
+    def test_bytes_truncate_table_while_rendering(self):
+        budget = PageBudget(max_bytes=5000)
+        page = HtmlPage(budget=budget)
+        page.body.result_listing(rows(1000), rowcount_max=1000)
+        html = page.render(RenderMode.COMPACT)
+        assert len(html) < 10000
+        assert 'class="spass-truncated"' in html
+        assert html.endswith('</table></body></html>')
+        assert budget.stats['pages'] == 1
+
+    def test_bytes_raise_while_rendering(self):
+        page = HtmlPage(budget=PageBudget(max_bytes=5000, truncate=False))
+        page.body.result_listing(rows(1000), rowcount_max=1000)
+        with pytest.raises(BudgetExceeded):
+            page.html
+
+    def test_bytes_checked_every_row(self):
+        budget = PageBudget(max_bytes=2000)
+        budget.check_interval = 1
+        page = HtmlPage(budget=budget)
+        page.body.result_listing(rows(100), rowcount_max=100)
+        html = page.render(RenderMode.COMPACT)
+        assert 'class="spass-truncated"' in html
+        assert len(html) < 2200
+
+    def test_bytes_of_other_content_raise(self):
+        budget = PageBudget(max_bytes=1000, truncate=False)
+        page = HtmlPage(budget=budget)
+        page.body.dropdown('select', [str(i) for i in range(5000)])
+        with pytest.raises(BudgetExceeded):
+            page.render()
+        with pytest.raises(BudgetExceeded):
+            ''.join(page.stream())
+        assert budget.stats['exceeded'] == 2
+        assert budget.stats['pages'] == 0
+
+    def test_within_budget(self):
+        budget = PageBudget(max_nodes=10000, max_bytes=100000, max_seconds=10)
+        page = HtmlPage(budget=budget)
+        page.body.result_listing(rows(10))
+        assert "rows shown" not in page.html
+        assert page.usage.bytes == len(page.html)
+        assert budget.stats['near_limit'] == 0
+        assert set(page.usage.ratios()) == {'nodes', 'bytes', 'seconds'}
+
+    def test_app_budget(self):
+        app = App("app", PySpassRequest({}, framework="wsgi"), PySpassSession({}, framework="wsgi"))
+        app.page.body.result_listing(rows(1000), rowcount_max=1000)
+        assert app.page.usage.budget is App.budget
+        assert app.page.usage.truncated == 1
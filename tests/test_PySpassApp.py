@@ -0,0 +1,84 @@
+from pyspass import AssetManager, PySpassApp, PySpassRequest, PySpassSession, PySpassRenderer, HtmlHead, RenderMode
+
+
+class App(PySpassApp):
+    lang = 'en'
+    stylesheets = ('static/app.css',)
+
+    def affirm_credentials(self, username: str, password: str):
+        return True
+
+
+def make_app() -> App:
+    return App("app", PySpassRequest({}, framework="wsgi"), PySpassSession({}, framework="wsgi"))
+
+
+class TestPySpassApp:
+
+    def test_setup_page(self):
+        html = make_app().page.html
+        assert html.startswith('<?xml version="1.0" encoding="utf-8" ?>\n<!DOCTYPE html>\n')
+        assert 'xml:lang="en" lang="en"' in html
+        assert html.count('src="static/spass_forms.js"') == 1
+        assert 'href="static/app.css"' in html
+
+    def test_static_head_is_shared(self):
+        first, second = make_app(), make_app()
+        assert first.page.head[0] is second.page.head[0]
+        assert first.page.prelude() is second.page.prelude()
+
+    def test_dynamic_head_additions(self):
+        app = make_app()
+        app.page.head.script(src="static/page.js")
+        assert 'src="static/page.js"' in app.page.html
+        assert 'src="static/page.js"' not in make_app().page.html
+
+    def test_prerender(self):
+        head = HtmlHead()
+        head.script(src="a.js")
+        assert HtmlHead.prerender(("a.js",)) == str(head).splitlines()[1].strip()
+
+    def test_renderer(self):
+        assert 'src="static/spass_forms.js"' in PySpassRenderer().page.html
+
+
+class VersionedApp(App):
+    data_version = 1
+
+    def fingerprint_inputs(self):
+        return self.request.get("page"), self.data_version
+
+
+class TestPySpassAppEtag:
+
+    def test_etag_from_page(self):
+        assert make_app().etag() == make_app().etag()
+
+    def test_etag_from_inputs(self):
+        def make(query):
+            return VersionedApp("app", PySpassRequest({'QUERY_STRING': query}, framework="wsgi"),
+                                PySpassSession({}, framework="wsgi"))
+
+        etag = make("page=1").etag()
+        assert make("page=1").not_modified(etag)
+        assert not make("page=2").not_modified(etag)
+        VersionedApp.data_version = 2
+        assert not make("page=1").not_modified(etag)
+
+    def test_etag_from_inputs_with_assets_and_mode(self, tmp_path):
+        class AssetsApp(VersionedApp):
+            assets = AssetManager(tmp_path)
+
+        def make():
+            return AssetsApp("app", PySpassRequest({}, framework="wsgi"), PySpassSession({}, framework="wsgi"))
+
+        source = tmp_path / "app.js"
+        source.write_text("var a = 1;")
+        AssetsApp.assets.register(source)
+        etag = make().etag()
+        source.write_text("var a = 2;")
+        AssetsApp.assets.register(source)
+        assert make().etag() != etag
+        etag = make().etag()
+        AssetsApp.render_mode = RenderMode.COMPACT
+        assert make().etag() != etag
@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+from pyspass import CredentialVerifier, PySpassAsyncApp, PySpassRequest, PySpassSession, WsgiRequest
+
+
+class AsyncApp(PySpassAsyncApp):
+
+    async def affirm_credentials(self, username: str, password: str):
+        await asyncio.sleep(0)
+        return username == "user" and password == "secret"
+
+
+def make_app(query: str = '', session: dict | None = None) -> AsyncApp:
+    request = PySpassRequest(WsgiRequest({'QUERY_STRING': query}), framework="wsgi")
+    return AsyncApp("app", request, PySpassSession(session if session is not None else {}, framework="asgi"))
+
+
+async def slow_rows(value: int, delay: float = 0.1):
+    await asyncio.sleep(delay)
+    return [{'column_1': value}]
+
+
+class TestPySpassAsyncApp:
+
+    def test_data_sources_are_loaded_concurrently(self):
+        app = make_app()
+        for i in range(5):
+            app.data_source(app.page.body, slow_rows(i))
+        start = time.perf_counter()
+        html = asyncio.run(app.render())
+        assert time.perf_counter() - start < 0.3
+        for i in range(5):
+            assert f"<td>{i}</td>" in html.replace('\n', '')
+
+    def test_order_of_components_is_kept(self):
+        app = make_app()
+        app.data_source(app.page.body, slow_rows(1, delay=0.05))
+        app.page.body.p("between")
+        app.data_source(app.page.body, slow_rows(2, delay=0.0))
+        html = asyncio.run(app.render()).replace('\n', '')
+        assert html.index("<td>1</td>") < html.index("between") < html.index("<td>2</td>")
+
+    def test_sync_source_and_custom_build(self):
+        app = make_app()
+        app.data_source(app.page.body, lambda: "plain value", build=lambda container, data: container.p(data))
+        assert "plain value" in asyncio.run(app.render())
+
+    def test_async_build(self):
+        async def build(container, data):
+            await asyncio.sleep(0)
+            container.p(f"built {data[0]['column_1']}")
+
+        app = make_app()
+        app.data_source(app.page.body, slow_rows(3, delay=0.0), build=build)
+        assert "built 3" in asyncio.run(app.render())
+
+    def test_resolve_login(self):
+        session: dict = {}
+        app = make_app("submit_login=1&app_username_entry=user&app_password_entry=secret", session)
+        assert asyncio.run(app.resolve_login())
+        assert session["success_login"]
+
+    def test_resolve_login_with_verifier_on_the_loop(self):
+        class VerifiedApp(AsyncApp):
+            credential_verifier = CredentialVerifier()
+
+        session: dict = {}
+        request = PySpassRequest(WsgiRequest({'QUERY_STRING': 'submit_login=1&app_username_entry=user'
+                                                              '&app_password_entry=secret'}), framework="wsgi")
+        app = VerifiedApp("app", request, PySpassSession(session, framework="asgi"))
+        assert asyncio.run(app.resolve_login())
+        assert VerifiedApp.credential_verifier.stats['verified'] == 1
+
+    def test_resolve_login_fails(self):
+        app = make_app("submit_login=1&app_username_entry=user&app_password_entry=wrong")
+        assert not asyncio.run(app.resolve_login())
+        assert "loginform" in app.page.html
@@ -0,0 +1,54 @@
+import zlib
+
+import pytest
+
+from pyspass import PySpassRenderer
+
+
+def decompress(chunks, compression='gzip'):
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS if compression == 'gzip' else zlib.MAX_WBITS)
+    return b''.join(decompressor.decompress(chunk) for chunk in chunks).decode('utf-8')
+
+
+def build_renderer(**kwargs) -> PySpassRenderer:
+    renderer = PySpassRenderer(**kwargs)
+    for i in range(20):
+        renderer.page.body.result_listing([{'column_1': i, 'column_2': 'x' * 50}] * 20)
+    return renderer
+
+
+class TestPySpassRenderer:
+
+    def test_uncompressed(self):
+        renderer = build_renderer()
+        assert b''.join(renderer.render()).decode('utf-8') == renderer.page.html
+
+    @pytest.mark.parametrize('compression', ['gzip', 'deflate'])
+    def test_compressed(self, compression):
+        renderer = build_renderer(compression=compression, compression_level=9)
+        chunks = list(renderer.render())
+        html = renderer.page.html
+        assert decompress(chunks, compression) == html
+        assert sum(len(chunk) for chunk in chunks) < len(html) / 5
+        assert renderer.content_encoding == compression
+
+    def test_head_is_flushed_first(self):
+        renderer = build_renderer(compression='gzip')
+        first = next(renderer.render())
+        assert '<head>' in decompress([first])
+
+    def test_small_chunks_are_coalesced(self):
+        chunks = ['<p>a</p>'] * 100
+        compressed = list(PySpassRenderer.compress(chunks, flush_size=400))
+        assert len(compressed) < 10
+        assert decompress(compressed) == ''.join(chunks)
+
+    def test_negotiate(self):
+        assert PySpassRenderer.negotiate('gzip, deflate, br') == 'gzip'
+        assert PySpassRenderer.negotiate('deflate, gzip;q=0') == 'deflate'
+        assert PySpassRenderer.negotiate('br') is None
+        assert PySpassRenderer.negotiate(None) is None
+
+    def test_unknown_compression(self):
+        with pytest.raises(NotImplementedError):
+            PySpassRenderer(compression='zstd')
@@ -0,0 +1,96 @@
+import json
+import multiprocessing
+import pickle
+
+import pytest
+
+from pyspass import PySpassSession, LruSessionStore, SqliteSessionStore, StoredSession
+
+
+def write_in_other_process(path, session_id):
+    store = SqliteSessionStore(path)
+    session = PySpassSession({'_spass_sid': session_id}, framework="wsgi", store=store)
+    session["written_by"] = "child"
+    session.save()
+
+
+class TestPySpassSession:
+
+    def test_framework_session(self):
+        cookie: dict = {}
+        session = PySpassSession(cookie, framework="flask")
+        session["abc"] = 1
+        assert cookie == {"abc": 1}
+
+    def test_wrong_framework(self):
+        with pytest.raises(NotImplementedError):
+            PySpassSession({}, framework="ABC")
+
+    def test_cookie_only_holds_id(self):
+        cookie: dict = {}
+        store = LruSessionStore()
+        session = PySpassSession(cookie, framework="flask", store=store)
+        session["row_selected"] = [{'column_1': str(i)} for i in range(100)]
+        session.save()
+        assert list(cookie) == ['_spass_sid']
+
+        session = PySpassSession(cookie, framework="flask", store=store)
+        assert len(session.get("row_selected")) == 100
+
+    def test_lazy_load(self):
+        store = LruSessionStore()
+        session = PySpassSession({}, framework="flask", store=store)
+        assert not session.storage_object.values_loaded
+        session.save()  # nothing changed, nothing stored
+        assert len(store) == 0
+        assert session.get("not_there") == ""
+        assert session.storage_object.values_loaded
+
+    def test_lru_eviction(self):
+        store = LruSessionStore(max_entries=2)
+        for i in range(3):
+            store.save(str(i), b'payload')
+        assert store.load("0") is None
+        assert store.load("2") == b'payload'
+
+    def test_clear(self):
+        cookie: dict = {}
+        store = LruSessionStore()
+        session = StoredSession(cookie, store)
+        session["abc"] = 1
+        session.save()
+        session.clear()
+        assert not cookie
+        assert len(store) == 0
+
+    def test_payload_is_json(self, tmp_path):
+        store = SqliteSessionStore(tmp_path / "sessions.db")
+        cookie: dict = {}
+        session = StoredSession(cookie, store)
+        session["rows"] = [{'a': 1}]
+        session.save()
+        assert json.loads(store.load(cookie['_spass_sid'])) == {'rows': [{'a': 1}]}
+        store.save(cookie['_spass_sid'], pickle.dumps({'rows': []}))  # never unpickled
+        assert dict(StoredSession(cookie, store)) == {}
+
+    def test_sqlite_store_shared_between_processes(self, tmp_path):
+        path = tmp_path / "sessions.db"
+        cookie: dict = {}
+        session = PySpassSession(cookie, framework="wsgi", store=SqliteSessionStore(path))
+        session["written_by"] = "parent"
+        session.save()
+
+        process = multiprocessing.get_context("spawn").Process(target=write_in_other_process,
+                                                               args=(str(path), cookie['_spass_sid']))
+        process.start()
+        process.join(timeout=30)
+        assert process.exitcode == 0
+
+        session = PySpassSession(cookie, framework="wsgi", store=SqliteSessionStore(path))
+        assert session.get("written_by") == "child"
+
+    def test_sqlite_expiry(self, tmp_path):
+        store = SqliteSessionStore(tmp_path / "sessions.db", max_age=-1)
+        store.save("abc", b'payload')
+        assert store.load("abc") is None
+        assert store.purge_expired() == 1
@@ -0,0 +1,59 @@
+import logging
+
+from pyspass import HtmlPage, PySpassApp, PySpassRequest, PySpassSession, RenderProfile, ResultListing
+
+
+class App(PySpassApp):
+    def affirm_credentials(self, username: str, password: str):
+        return True
+
+
+def build_page() -> HtmlPage:
+    page = HtmlPage()
+    form = page.body.form('orders')
+    listing = form.result_listing([{'column_1': i, 'column_2': 'x'} for i in range(10)])
+    listing.id_html = 'listing'
+    form.dropdown('abc', ['A', 'B', 'C'])
+    page.body.deferred(lambda: ResultListing([{'column_1': 1}]), id_html='slow')
+    return page
+
+
+class TestRenderProfile:
+
+    def test_stats_per_component(self):
+        reports = []
+        with RenderProfile(sink=reports.append):
+            html = build_page().html
+        stats = {total.key: total for total in reports[0]}
+        assert set(stats) == {'HtmlForm#orders', 'ResultListing#listing', 'HtmlTable', 'HtmlSelect',
+                              'HtmlDeferred#slow', 'ResultListing'}
+        assert stats['ResultListing#listing'].build_seconds > 0
+        assert stats['ResultListing#listing'].render_seconds > 0
+        assert stats['HtmlTable'].count == 2
+        assert stats['HtmlTable'].nodes == (1 + 11 + 11 * 2) + (1 + 2 + 2)  # table, rows and cells of both listings
+        assert stats['HtmlSelect'].nodes == 4
+        assert stats['HtmlForm#orders'].bytes < len(html)
+
+    def test_deferred_producer_in_thread(self):
+        reports = []
+        with RenderProfile(sink=reports.append):
+            page = build_page()
+            page.resolve_deferred()
+        stats = {total.key: total for total in reports[0]}
+        assert stats['HtmlDeferred#slow'].build_seconds > 0
+        assert stats['ResultListing'].build_seconds > 0
+
+    def test_disabled(self):
+        reports = []
+        with RenderProfile(sink=reports.append):
+            pass
+        build_page().html
+        assert reports == [[]]
+
+    def test_app_logger(self, caplog):
+        app = App("app", PySpassRequest({}, framework="wsgi"), PySpassSession({}, framework="wsgi"))
+        with caplog.at_level(logging.INFO, logger=app.logger.name):
+            with app.profile():
+                app.display_login_form()
+                app.page.html
+        assert any("Render profile HtmlForm#loginform" in message for message in caplog.messages)
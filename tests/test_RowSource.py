@@ -0,0 +1,29 @@
+from pyspass import QuerySource, SequenceSource
+
+
+class TestSequenceSource:
+
+    def test_rows(self):
+        source = SequenceSource([{'id': i} for i in range(10)])
+        assert len(source) == 10
+        assert source.rows(8, 5) == [{'id': 8}, {'id': 9}]
+
+    def test_rows_of_iterable_sequence(self):
+        source = SequenceSource(range(10))
+        assert list(source.rows(2, 3)) == [2, 3, 4]
+
+
+class TestQuerySource:
+
+    def test_rows_and_count(self):
+        calls = []
+
+        def count():
+            calls.append('count')
+            return 1000
+
+        source = QuerySource(lambda offset, limit: [{'id': i} for i in range(offset, offset + limit)], count)
+        assert len(source) == 1000
+        assert len(source) == 1000
+        assert calls == ['count']
+        assert source.rows(500, 2) == [{'id': 500}, {'id': 501}]
@@ -0,0 +1,98 @@
+import asyncio
+import io
+
+import pytest
+
+from pyspass import PySpassRequest, PySpassSession, WsgiRequest, AsgiRequest, FormValues
+
+
+def make_environ(query: str = '', body: bytes = b'', content_type: str = 'application/x-www-form-urlencoded'):
+    return {'REQUEST_METHOD': 'POST',
+            'QUERY_STRING': query,
+            'CONTENT_TYPE': content_type,
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': io.BytesIO(body)}
+
+
+def make_receive(*chunks: bytes):
+    messages = [{'type': 'http.request', 'body': chunk, 'more_body': i < len(chunks) - 1}
+                for i, chunk in enumerate(chunks)]
+
+    async def receive():
+        return messages.pop(0)
+
+    return receive
+
+
+class TestFormValues:
+
+    def test_first_value_and_list(self):
+        values = FormValues([('a', '1'), ('a', '2'), ('b', '3')])
+        assert values['a'] == '1'
+        assert values.get('b') == '3'
+        assert values.get('c', 'x') == 'x'
+        assert values.getlist('a') == ['1', '2']
+        assert values.getlist('c') == []
+
+    def test_combine(self):
+        combined = FormValues([('a', '1')]).combine(FormValues([('a', '2'), ('b', '3')]))
+        assert combined['a'] == '1'
+        assert combined.getlist('a') == ['1', '2']
+        assert combined['b'] == '3'
+
+
+class TestWsgiRequest:
+
+    def test_query_and_form(self):
+        requ = PySpassRequest(make_environ('abc=123', b'def=4.5&multi[]=a&multi[]=b'), framework="wsgi")
+        assert requ.get('abc') == '123'
+        assert requ.get_int('abc') == 123
+        assert requ.get_float('def') == 4.5
+        assert requ.get('not_there') == ''
+        assert requ.get_list('multi') == ['a', 'b']
+
+    def test_wrapped_object(self):
+        wsgi_request = WsgiRequest(make_environ('abc=abc'))
+        requ = PySpassRequest(wsgi_request, framework="wsgi")
+        assert requ.storage_object is wsgi_request
+        assert requ.get('abc') == 'abc'
+
+    def test_multipart(self):
+        body = (b'--xyz\r\n'
+                b'Content-Disposition: form-data; name="field"\r\n\r\n'
+                b'value\r\n'
+                b'--xyz\r\n'
+                b'Content-Disposition: form-data; name="upload"; filename="a.txt"\r\n'
+                b'Content-Type: text/plain\r\n\r\n'
+                b'content\r\n'
+                b'--xyz--\r\n')
+        requ = PySpassRequest(make_environ(body=body, content_type='multipart/form-data; boundary=xyz'),
+                              framework="wsgi")
+        assert requ.get('field') == 'value'
+        assert requ.get('upload') == ''
+
+    def test_body_limit(self):
+        wsgi_request = WsgiRequest(make_environ(body=b'a=1'))
+        wsgi_request.max_content_length = 2
+        with pytest.raises(ValueError):
+            wsgi_request.form
+
+    def test_session_with_plain_mapping(self):
+        session = PySpassSession({}, framework="wsgi")
+        session["success_login"] = True
+        assert session.get("success_login")
+
+
+class TestAsgiRequest:
+
+    def test_receive_body_in_chunks(self):
+        scope = {'type': 'http', 'method': 'POST', 'query_string': b'abc=123',
+                 'headers': [(b'content-type', b'application/x-www-form-urlencoded')]}
+        asgi_request = asyncio.run(AsgiRequest.receive_from(scope, make_receive(b'def=', b'456')))
+        requ = PySpassRequest(asgi_request, framework="asgi")
+        assert requ.get_int('abc') == 123
+        assert requ.get_int('def') == 456
+
+    def test_not_received(self):
+        with pytest.raises(TypeError):
+            PySpassRequest({'type': 'http'}, framework="asgi")
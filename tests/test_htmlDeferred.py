@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import pytest
+
+from pyspass import HtmlDiv, HtmlPage, HtmlDeferred, ResultListing, RenderMode
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return ResultListing([{'column_1': self.calls}])
+
+
+def slow_producer(value):
+    def produce():
+        time.sleep(0.1)
+        return f"value {value}"
+    return produce
+
+
+class TestHtmlDeferred:
+
+    def test_producer_only_runs_when_rendered(self):
+        counter = Counter()
+        div = HtmlDiv()
+        deferred = div.deferred(counter)
+        assert counter.calls == 0
+        assert "<td>1</td>" in str(div).replace('\n', '')
+        assert deferred.resolved
+
+    def test_result_is_cached(self):
+        counter = Counter()
+        deferred = HtmlDeferred(counter)
+        str(deferred)
+        str(deferred)
+        deferred.force()
+        assert counter.calls == 1
+
+    def test_unrendered_node_never_runs(self):
+        counter = Counter()
+        page = HtmlPage()
+        HtmlDeferred(counter)  # e.g. a tab not shown in this request
+        page.resolve_deferred()
+        assert counter.calls == 0
+
+    def test_list_result(self):
+        deferred = HtmlDeferred(lambda: ["a", HtmlDiv("b")])
+        assert deferred.render(RenderMode.COMPACT) == "<div>a<div>b</div></div>"
+
+    def test_async_producer(self):
+        async def produce():
+            await asyncio.sleep(0)
+            return "async value"
+        assert "async value" in str(HtmlDeferred(produce))
+
+    def test_async_producer_in_running_loop(self):
+        async def produce():
+            return "async value"
+
+        async def render():
+            with pytest.raises(RuntimeError):
+                HtmlDeferred(produce).force()
+            return str(await HtmlDeferred(produce).force_async())
+
+        assert "async value" in asyncio.run(render())
+
+    def test_parallel_resolution(self):
+        page = HtmlPage()
+        for i in range(4):
+            page.body.deferred(slow_producer(i))
+        start = time.perf_counter()
+        page.resolve_deferred(max_workers=4)
+        assert time.perf_counter() - start < 0.3
+        for i in range(4):
+            assert f"value {i}" in page.html
+
+    def test_nested_deferred_nodes(self):
+        page = HtmlPage()
+        page.body.deferred(lambda: HtmlDeferred(lambda: "inner"))
+        page.resolve_deferred()
+        assert not list(HtmlDeferred.iter_unresolved([page.body]))
+        assert "inner" in page.html
@@ -17,14 +17,54 @@ class TestHtmlForm:
     def test_error_on_nested_forms_for_nonform(self):
         form_outer = HtmlForm('outer_form')
         div = form_outer.div()
-        form_inner = div.form('inner_form')
-        div_sub = form_inner.div()
         with pytest.raises(Exception):
-            div_sub.get_form()
+            div.form('inner_form')  # rejected at insertion
 
     def test_error_on_nested_forms_for_form(self):
         form_outer = HtmlForm('outer_form')
-        div = form_outer.div()
+        div = HtmlDiv()
         form_inner = div.form('inner_form')
+        assert form_inner.get_form() is None
+        with pytest.raises(Exception):
+            form_outer.div().add(div)  # subtree containing a form
+
+    def test_get_form_of_subtree_built_separately(self):
+        div = HtmlDiv()
+        div_sub = div.div().div()
+        assert div_sub.get_form() is None
+        form = HtmlForm('form')
+        form.add(div)
+        assert div_sub.get_form() is form
+
+    def test_get_form_after_move(self):
+        form_1 = HtmlForm('form_1')
+        form_2 = HtmlForm('form_2')
+        div = form_1.div()
+        div_sub = div.div().div()
+        assert div_sub.get_form() is form_1
+        form_1.remove(div)
+        form_2.add(div)
+        assert div_sub.get_form() is form_2
+        form_2.remove(div)
+        HtmlDiv().add(div)
+        assert div_sub.get_form() is None
+
+    def test_rejected_form_not_added(self):
+        form_outer = HtmlForm('outer_form')
+        div = form_outer.div()
         with pytest.raises(Exception):
-            form_inner.get_form()
+            div.form('inner_form')
+        assert len(div) == 0
+        assert 'inner_form' not in form_outer.render()
+        div_other = HtmlDiv()
+        div_other.form('other_form')  # the rejected form left no mark on the ancestors
+        assert not div._contains_form
+
+    def test_removed_form_allows_adding_to_form(self):
+        div = HtmlDiv()
+        inner = div.div()
+        form = inner.form('removed_form')
+        inner.remove(form)
+        HtmlForm('outer_form').add(div)
+        assert div.get_form().id_html == 'outer_form'
+        assert not div._contains_form
@@ -1,4 +1,4 @@
-from pyspass import HtmlBody, HtmlForm, HtmlH1, HtmlH2, HtmlH3, HtmlDiv, HtmlCell
+from pyspass import HtmlBody, HtmlForm, HtmlH1, HtmlH2, HtmlH3, HtmlDiv, HtmlCell, RenderMode
 
 
 class TestHtmlObjects:
@@ -65,4 +65,23 @@ class TestHtmlObjects:
         div = HtmlDiv()
         div2 = HtmlDiv()
         div.add(div2)
-        # todo elaborate
+        div3 = div2.div()
+        assert div2.indents == 1
+        assert div3.indents == 2
+
+    def test_indents_of_subtree_added(self):
+        subtree = HtmlDiv()
+        inner = subtree.div().div()
+        assert inner.indents == 2
+        HtmlDiv().div().add(subtree)
+        assert inner.indents == 4
+
+    def test_render_pretty(self):
+        div = HtmlDiv()
+        div.div().p("text")
+        assert str(div) == "<div>\n  <div>\n    <p>text</p>\n  </div>\n</div>\n"
+
+    def test_render_compact(self):
+        div = HtmlDiv()
+        div.div().p("text")
+        assert div.render(RenderMode.COMPACT) == "<div><div><p>text</p></div></div>"
@@ -0,0 +1,192 @@
+import time
+
+import pytest
+
+from pyspass import HtmlDiv, HtmlPage, RenderMode
+
+
+def slow_producer(value, delay):
+    def produce():
+        time.sleep(delay)
+        return f"value {value}"
+    return produce
+
+
+class TestHtmlPage:
+
+    def test_html(self):
+        page = HtmlPage()
+        page.body.p("content")
+        html = page.html
+        assert "<!DOCTYPE html>" in html
+        assert "<body>" in html
+        assert html.endswith("</html>\n")
+
+    def test_compact_without_line_breaks(self):
+        page = HtmlPage()
+        page.body.p("content")
+        assert '\n' not in page.render(RenderMode.COMPACT)
+        assert '\n' not in ''.join(page.stream(mode=RenderMode.COMPACT))
+        assert page.render().startswith('<?xml version="1.0" encoding="utf-8" ?>\n<!DOCTYPE html>\n')
+
+    def test_stream_without_slow_components(self):
+        page = HtmlPage()
+        page.body.p("first")
+        page.body.p("second")
+        chunks = list(page.stream())
+        assert len(chunks) == 4  # head, two components, end
+        assert "".join(chunks).replace('\n', '') == page.html.replace('\n', '')
+
+    def test_stream_sends_head_before_slow_components(self):
+        page = HtmlPage()
+        page.body.deferred(slow_producer(1, 0.2), placeholder="loading")
+        stream = page.stream()
+        start = time.perf_counter()
+        first = next(stream)
+        assert time.perf_counter() - start < 0.1
+        assert "<head>" in first
+        placeholder = next(stream)
+        assert 'data-spass-slot="0"' in placeholder
+        assert "loading" in placeholder
+        rest = "".join(stream)
+        assert '<template data-spass-chunk="0">value 1</template>' in rest
+        assert 'spassFillSlot("0")' in rest
+        assert rest.endswith("</html>\n")
+
+    def test_stream_in_order_of_completion(self):
+        page = HtmlPage()
+        page.body.deferred(slow_producer("slow", 0.2))
+        page.body.p("fast content")
+        page.body.deferred(slow_producer("quick", 0.0))
+        html = "".join(page.stream())
+        assert html.index("fast content") < html.index("value quick") < html.index("value slow")
+
+    def test_stream_placeholders_are_removed_after_resolution(self):
+        page = HtmlPage()
+        deferred = page.body.deferred(slow_producer(1, 0.0))
+        "".join(page.stream())
+        assert 'data-spass-slot' not in str(deferred)
+        assert "value 1" in str(deferred)
+
+    def test_stream_aborted_leaves_no_placeholders(self):
+        page = HtmlPage()
+        page.body.deferred(slow_producer(1, 0.0))
+        stream = page.stream()
+        next(stream)
+        stream.close()
+        html = page.render()
+        assert 'data-spass-slot' not in html
+        assert "value 1" in html
+
+
+class TestHtmlPageFingerprint:
+
+    @staticmethod
+    def build_page(value=1):
+        page = HtmlPage()
+        form = page.body.form("form_id")
+        form.result_listing([{'column_1': value, 'column_2': 'x'}])
+        form.dropdown('abc', ['A', 'B'], var_input='A')
+        return page
+
+    def test_fingerprint_is_stable(self):
+        assert self.build_page().fingerprint() == self.build_page().fingerprint()
+
+    def test_fingerprint_changes_with_content(self):
+        assert self.build_page(1).fingerprint() != self.build_page(2).fingerprint()
+        page = self.build_page()
+        fingerprint = page.fingerprint()
+        page.body[0][1].var_input = ['B']
+        assert page.fingerprint() != fingerprint
+
+    def test_fingerprint_does_not_render(self, monkeypatch):
+        page = self.build_page()
+        monkeypatch.setattr(HtmlPage, 'html', property(lambda self: 1 / 0))
+        assert page.fingerprint()
+
+    def test_deferred_with_fingerprint_key_is_not_forced(self):
+        page = HtmlPage()
+        deferred = page.body.deferred(lambda: "content", fingerprint_key=("orders", 17))
+        page.fingerprint()
+        assert not deferred.resolved
+
+    def test_etag_matches(self):
+        etag = self.build_page().etag
+        assert etag.startswith('"') and etag.endswith('"')
+        assert HtmlPage.etag_matches(etag, etag)
+        assert HtmlPage.etag_matches(etag, f'"other", W/{etag}')
+        assert HtmlPage.etag_matches(etag, '*')
+        assert not HtmlPage.etag_matches(etag, '"other"')
+        assert not HtmlPage.etag_matches(etag, None)
+
+
+class TestHtmlPageIndex:
+
+    def test_find_builds_index_lazily(self):
+        page = HtmlPage()
+        div = page.body.div(id_html='main', class_html='box wide')
+        sub = HtmlDiv(class_html='box')
+        para = sub.p('text')
+        div.add(sub)
+        assert page.index is None
+        assert page.find_by_id('main') is div
+        assert page.find_by_id('missing') is None
+        assert page.find_all_by_class('box') == [div, sub]
+        assert page.find_all_by_class('wide') == [div]
+        assert page.find_all_by_tag('p') == [para]
+        later = page.body.div(id_html='later')  # maintained after the first search
+        assert page.find_by_id('later') is later
+
+    def test_setters_update_index(self):
+        page = HtmlPage(indexed=True)
+        div = page.body.div(id_html='old', class_html='a')
+        div.id_html = 'new'
+        div.class_html = 'b'
+        assert page.find_by_id('old') is None
+        assert page.find_by_id('new') is div
+        assert page.find_all_by_class('a') == []
+        assert page.find_all_by_class('b') == [div]
+
+    def test_duplicate_id(self):
+        page = HtmlPage(indexed=True)
+        page.body.div(id_html='main')
+        sub = HtmlDiv()
+        sub.div(id_html='main')
+        with pytest.raises(Exception):
+            page.body.add(sub)
+        other = page.body.div(id_html='other')
+        with pytest.raises(Exception):
+            other.id_html = 'main'
+
+    def test_duplicate_id_not_added(self):
+        page = HtmlPage(indexed=True)
+        page.body.div(id_html='m')
+        sub = HtmlDiv(id_html='s')
+        sub.div(id_html='m')
+        with pytest.raises(Exception):
+            page.body.add(sub)
+        assert len(page.body) == 1
+        assert page.render().count('id="m"') == 1
+        assert page.find_by_id('s') is None
+        assert page.body.div(id_html='s').id_html == 's'  # the rejected subtree left no ids in the index
+
+    def test_lookup_after_duplicate_id(self):
+        page = HtmlPage()
+        page.body.div(id_html='a')
+        duplicate = page.body.div(id_html='a')
+        page.body.div(id_html='b')
+        for _ in range(2):  # no half built index is kept
+            with pytest.raises(Exception):
+                page.find_by_id('b')
+        page.body.remove(duplicate)
+        assert page.find_by_id('b') is page.body[1]
+
+    def test_found_in_order_added(self):
+        for indexed in (False, True):  # index built lazily or maintained while adding
+            page = HtmlPage(indexed=indexed)
+            sub = HtmlDiv()
+            first = sub.div(class_html='x')
+            second = sub.div(class_html='x')
+            page.body.add(sub)
+            for found in (page.find_all_by_class('x'), page.find_all_by_tag('div')[1:]):
+                assert [id(node) for node in found] == [id(first), id(second)]
@@ -24,3 +24,10 @@ class TestHtmlLabel:
         assert isinstance(cell, HtmlCell)
         assert str(cell).startswith("<th>")
         assert str(cell).strip().endswith("</th>")
+
+    def test_add_cells_like_td(self):
+        row = HtmlRow()
+        cell = row.add_cells(['a'])[0]
+        td = row.td('a')
+        assert vars(td).items() <= vars(cell).items()
+        assert cell == td
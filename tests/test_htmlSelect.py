@@ -57,3 +57,9 @@ class TestHtmlSelect:
         div = HtmlDiv()
         drop = div.dropdown('abc', ['Abc', 'Bcd', 'Cde', 'Def'], var_input='Bcd', multiple=False)
         assert '<option value="Bcd" selected="selected">Bcd</option>' in str(drop)
+
+    def test_multiple_dropdown_rendered_twice(self):
+        div = HtmlDiv()
+        drop = div.dropdown('abc', ['A', 'B'], multiple=True)
+        assert str(drop) == str(drop)
+        assert 'name="abc[]"' in str(drop)
@@ -1,4 +1,4 @@
-from pyspass import HtmlTable, HtmlRow, Iterator
+from pyspass import HtmlForm, HtmlSpan, HtmlTable, HtmlRow, Iterator, RenderMode
 
 
 class TestHtmlTable:
@@ -15,3 +15,51 @@ class TestHtmlTable:
         tab.tr()
         assert isinstance(tab.header, HtmlRow)
         assert isinstance(tab.rows, Iterator)
+
+    def test_add_rows_and_header(self):
+        tab = HtmlTable()
+        rows = tab.add_rows([['a', 'b'], ['c', HtmlSpan('d')]])
+        header = tab.add_header(['A', 'B'])
+        assert tab.header is header
+        assert list(tab.rows)[1:] == rows
+        assert tab.render(RenderMode.COMPACT) == ('<table><tr><th>A</th><th>B</th></tr><tr><td>a</td><td>b</td></tr>'
+                                                  '<tr><td>c</td><td><span>d</span></td></tr></table>')
+        assert rows[1][1][0].parent is rows[1][1]
+        assert rows[0][0].indents == 2
+
+    def test_add_rows_within_form(self):
+        form = HtmlForm('form')
+        tab = form.table()
+        rows = tab.add_rows([['a']])
+        assert rows[0][0].get_form() is form
+
+    def test_column_alignments_as_style_rules(self):
+        tab = HtmlTable()
+        tab.add_rows([['a', 'b']])
+        tab.set_column_alignments('rc')
+        tab.add_rows([['c', 'd']])
+        html = tab.render(RenderMode.COMPACT)
+        assert 'style="' not in html
+        style_class = tab.class_html
+        assert html.startswith(f'<style>.{style_class}>*>tr>:nth-child(1){{text-align:right}}'
+                               f'.{style_class}>*>tr>:nth-child(2){{text-align:center}}</style>'
+                               f'<table class="{style_class}">')
+        other = HtmlTable()
+        other.set_column_alignments('rc')
+        assert other.class_html == style_class
+        tab.set_column_alignments('l')
+        assert tab.class_html != style_class
+        assert len(tab.class_html.split()) == 1
+        assert tab.style_rules() == f'.{tab.class_html}>*>tr>:nth-child(1){{text-align:left}}'
+
+    def test_column_styles(self):
+        tab = HtmlTable()
+        tab.set_column_styles({0: {'color': 'red', 'text-align': 'right'}, 2: {'width': '2em'}})
+        tab.set_column_style(0, 'color', 'blue')
+        assert tab.column_styles == {0: {'color': 'blue', 'text-align': 'right'}, 2: {'width': '2em'}}
+        tab.set_column_alignments('c')
+        assert tab.column_styles == {0: {'color': 'blue', 'text-align': 'center'}, 2: {'width': '2em'}}
+        other = HtmlTable()
+        other.set_column_style(2, 'width', '2em')
+        other.set_column_styles({0: {'color': 'blue', 'text-align': 'center'}})
+        assert other.class_html == tab.class_html
@@ -1,6 +1,8 @@
+import json
+
 import pytest
 
-from pyspass import HtmlForm, HtmlDiv
+from pyspass import HtmlForm, HtmlDiv, PySpassRequest
 from pyspass import ResultChoice
 
 
@@ -157,3 +159,48 @@ class TestResultChoice:
         html_form = HtmlForm(id_html='form_id')
         rc: ResultChoice = html_form.result_choice(content=result, listing_index='not_there')
         assert "column_b" in str(rc)
+
+    def test_selected_row_styled_by_class(self, content_as_dicts):
+        html_form = HtmlForm(id_html='form_id')
+        rl = html_form.result_choice(content=content_as_dicts, listing_index='column_1', row_selected='4')
+        rl.compose()
+        html = str(rl)
+        assert html.count('class="spass-selected"') == 1
+        assert f'.{rl.table_.class_html}>*>tr.spass-selected{{color:white;background:grey}}' in html
+        assert 'style="' not in html
+
+    def test_client_side_selection(self, content_as_dicts):
+        html_form = HtmlForm(id_html='form_id')
+        rl = html_form.result_choice(content=content_as_dicts, listing_index='column_1', row_selected='4',
+                                     client_side=True)
+        rl.set_codes('column_2', {'5': 'five'})
+        rl.compose()
+        html = str(rl)
+        assert 'name="_rct_selected_column_1" value="4"' in html
+        assert '["2","five","8","11","None","17"]' in html
+        assert ('"choice":{"form":"form_id","index":["column_1"],"trigger":"trigger_result_choice","multi":false,'
+                '"selectedClass":"spass-selected","keys":[["1","4","7","10","13","16"]],"selected":[1]}' in html)
+        assert 'tr.spass-selected{color:white;background:grey}' in html
+
+    def test_viewport_fragment_for_request(self, content_as_dicts):
+        def build():
+            choice = ResultChoice(content_as_dicts, listing_index='column_1', row_selected='13', viewport=2,
+                                  fetch_url='/rows')
+            choice.set_codes('column_2', {'11': 'eleven'})
+            return choice
+
+        html_form = HtmlForm(id_html='form_id')
+        rl = html_form.add(build())
+        rl.compose()
+        assert '"rows":2,' in str(rl)
+        assert '"total":6,' in str(rl)
+        request = PySpassRequest({'QUERY_STRING': '_spass_offset=3&_spass_limit=2'}, framework='wsgi')
+        assert json.loads(build().fragment_for(request)) == \
+            {'offset': 3, 'rows': 2, 'columns': [['10', '13'], ['eleven', 'None'], ['12', '15']],
+             'choice': {'keys': [['10', '13']], 'selected': [1]}}
+
+    def test_export_with_codes(self, content_as_dicts):
+        rl = ResultChoice(content_as_dicts, listing_index='column_1', row_selected=None, rowcount_max=2,
+                          mapping={'column_1': 'One', 'column_2': 'Two'})
+        rl.set_codes('column_2', {'5': 'five'})
+        assert list(rl.export()) == ['One,Two\r\n1,2\r\n4,five\r\n7,8\r\n10,11\r\n13,\r\n16,17\r\n']
@@ -1,6 +1,11 @@
+import datetime
+import itertools
+import json
+import sqlite3
+
 import pytest
 
-from pyspass import ResultListing
+from pyspass import ColumnFormat, HtmlPage, Markup, QuerySource, RenderMode, ResultListing
 
 
 @pytest.fixture(scope="session")
@@ -50,3 +55,161 @@ class TestResultListing:
         assert "right" in str(r1)
         assert "center" in str(r1)
         assert "left" in str(r1)
+
+    def test_client_side(self):
+        content = [{'column_1': 1, 'column_2': '<b>', 'column_3': Markup('<i>x</i>')},
+                   {'column_1': 2, 'column_2': None, 'column_3': ''}]
+        rl = ResultListing(content, mapping={'column_1': 'One', 'column_2': 'Two</script>', 'column_3': 'Three'},
+                           rowcount_max=1, alignments='rl', client_side=True)
+        html = rl.render(RenderMode.COMPACT)
+        assert '<table' not in html
+        assert html.startswith(f'<style>.{rl.table_.class_html}>*>tr>:nth-child(1){{text-align:right}}')
+        island = html[html.index('<script type="application/json" class="spass-listing">'):]
+        assert '</script>' not in island[:-len('</script>')]
+        data = json.loads(island[island.index('>') + 1:-len('</script>')])
+        assert data['header'] == ['One', 'Two</script>', 'Three']
+        assert data['columns'] == [['1'], ['<b>'], [{'html': '<i>x</i>'}]]
+        assert data['rows'] == 1
+        assert data['notice'] == 'Output truncated, 1 of 2 rows shown.'
+        assert data['class'] == rl.table_.class_html
+
+    def test_client_side_list_mapping(self, content_as_dicts):
+        rl = ResultListing(content_as_dicts, mapping=['column_2'], client_side=True)
+        assert '"header":["column_2"],"rows":1,"columns":[["2"]]' in rl.render(RenderMode.COMPACT)
+
+    def test_viewport(self):
+        fetched = []
+
+        def fetch(offset, limit):
+            fetched.append((offset, limit))
+            return [{'id': i, 'name': f'<{i}>'} for i in range(offset, min(offset + limit, 1_000_000))]
+
+        rl = ResultListing(QuerySource(fetch, lambda: 1_000_000), alignments='rl', viewport=20,
+                           fetch_url='/rows')
+        html = rl.render(RenderMode.COMPACT)
+        data = json.loads(html[html.index('class="spass-listing">') + 22:-len('</script>')])
+        assert data['rows'] == 20
+        assert data['total'] == 1_000_000
+        assert data['fetch'] == '/rows'
+        assert data['chunk'] == 20
+        assert fetched == [(0, 20)]
+        fragment = json.loads(rl.fragment(999_990, 50))
+        assert fragment == {'offset': 999_990, 'rows': 10,
+                            'columns': [[str(i) for i in range(999_990, 1_000_000)],
+                                        [f'<{i}>' for i in range(999_990, 1_000_000)]]}
+        assert fetched[-1] == (999_990, 50)
+        rl.fragment(0, 1_000_000)
+        assert fetched[-1] == (0, rl.fetch_max)
+
+    def test_fragment_limits(self):
+        connection = sqlite3.connect(':memory:')
+        connection.execute('create table t (id integer)')
+        connection.executemany('insert into t values (?)', [(i,) for i in range(5000)])
+        source = QuerySource(lambda offset, limit: [{'id': row[0]} for row in connection.execute(
+            'select id from t order by id limit ? offset ?', (limit, offset))],
+                             lambda: connection.execute('select count(*) from t').fetchone()[0])
+        rl = ResultListing(source, viewport=20, fetch_url='/rows')
+        assert json.loads(rl.fragment(0, -1))['rows'] == 1  # sqlite returns all rows for a negative limit
+        assert json.loads(rl.fragment(0, 0))['rows'] == 1
+        assert json.loads(rl.fragment(0, 5000))['rows'] == rl.fetch_max
+        with pytest.raises(ValueError):
+            rl.fragment(-1, 10)
+
+    def test_viewport_without_fetch_url(self, content_as_dicts):
+        with pytest.raises(Exception):
+            ResultListing(content_as_dicts, viewport=10)
+
+    def test_export_csv(self):
+        content = [{'id': 1, 'name': 'a, "b"', 'state': None}, {'id': 2, 'name': '<c>', 'state': 3}]
+        rl = ResultListing(content, mapping={'id': 'Id', 'name': 'Name'}, rowcount_max=1)
+        assert ''.join(rl.export()) == 'Id,Name\r\n1,"a, ""b"""\r\n2,<c>\r\n'
+
+    def test_export_rows_without_some_columns(self):
+        rl = ResultListing([{'id': 1, 'name': 'a'}, {'id': 2}, {'name': 'c', 'id': 3}])
+        assert ''.join(rl.export()) == 'id,name\r\n1,a\r\n2,\r\n3,c\r\n'
+        rl = ResultListing([{'id': 1}])
+        assert ''.join(rl.export(rows=[{'id': 4, 'name': 'd'}])) == 'id\r\n4\r\n'
+
+    def test_export_ndjson_in_chunks(self):
+        rl = ResultListing([{'id': 0, 'value': 1.5}])
+        rows = ({'id': i, 'value': i * 1.5} for i in itertools.count())  # never ending
+        chunks = rl.export('ndjson', rows=rows, chunk_rows=2)
+        assert next(chunks) == '{"id": 0, "value": 0.0}\n{"id": 1, "value": 1.5}\n'
+        assert next(chunks).startswith('{"id": 2,')
+
+    def test_export_cursor(self):
+        connection = sqlite3.connect(':memory:')
+        connection.execute('create table t (id integer, name text)')
+        connection.executemany('insert into t values (?, ?)', [(i, f'n{i}') for i in range(5)])
+        rl = ResultListing([{'name': 'x', 'id': 0}], mapping={'name': 'Name'})
+        cursor = connection.execute('select id, name from t')
+        assert ''.join(rl.export(rows=cursor, chunk_rows=2)) == 'Name\r\nn0\r\nn1\r\nn2\r\nn3\r\nn4\r\n'
+
+    def test_export_csv_formulas(self):
+        content = [{'a': '=cmd|calc', 'b': '+1', 'c': '-1', 'd': '@SUM(A1)', 'e': '\tx', 'f': -1, 'g': 'a=b'}]
+        rl = ResultListing(content)
+        assert ''.join(rl.export()).splitlines()[1] == "'=cmd|calc,'+1,'-1,'@SUM(A1),'\tx,-1,a=b"
+        assert '"a": "=cmd|calc"' in ''.join(rl.export('ndjson'))
+
+    def test_export_dict(self):
+        rl = ResultListing({'a': 1, 'b': None})
+        assert ''.join(rl.export()) == 'KEY,VALUE\r\na,1\r\nb,\r\n'
+        assert ''.join(rl.export('ndjson')) == '{"KEY": "a", "VALUE": 1}\n{"KEY": "b", "VALUE": null}\n'
+
+    def test_aggregates(self):
+        content = [{'group': 'b', 'amount': 2}, {'group': 'a', 'amount': 1}, {'group': 'b', 'amount': 4.5}]
+        rl = ResultListing(content, alignments='lr')
+        rl.add_aggregates({'amount': 'sum'}, group_by='group')
+        html = rl.render(RenderMode.COMPACT)
+        assert '<tr class="spass-subtotal"><td>a</td><td>1</td></tr>' in html
+        assert '<tr class="spass-subtotal"><td>b</td><td>6.50</td></tr>' in html
+        assert html.endswith('<tr class="spass-total"><td>Total</td><td>7.50</td></tr></table>')
+        assert 'tr.spass-total{font-weight:bold}' in html
+
+    def test_aggregates_by_several_columns(self):
+        content = [{'group': 'a', 'kind': 'x', 'amount': 1}, {'group': 'a', 'kind': 'y', 'amount': 2}]
+        rl = ResultListing(content)
+        rl.add_aggregates({'amount': 'sum'}, group_by=['group', 'kind'])
+        html = rl.render(RenderMode.COMPACT)
+        assert '<tr class="spass-subtotal"><td>a / x</td><td></td><td>1</td></tr>' in html
+
+    def test_aggregates_kept_when_truncated(self):
+        rl = ResultListing([{'amount': i} for i in range(10)])
+        rl.add_aggregates({'amount': 'sum'})
+        rl.truncate(3)
+        assert [row.class_html for row in rl.table_.rows][-2:] == ['spass-truncated', 'spass-total']
+        assert len(rl.table_) == 1 + 3 + 2
+
+    def test_aggregates_client_side(self):
+        rl = ResultListing([{'name': 'x', 'amount': 2}, {'name': 'y', 'amount': None}], client_side=True)
+        rl.add_aggregates({'amount': 'count'})
+        assert '"footer":[{"class":"spass-total","cells":["Total","1"]}]' in rl.render(RenderMode.COMPACT)
+
+    def test_formats(self):
+        content = [{'day': datetime.date(2024, 1, 31), 'amount': 1234.5, 'note': None}] * 3
+        rl = ResultListing(content, rowcount_max=2, formats={'day': '%d.%m.%Y', 'amount': ',.1f',
+                                                             'note': ColumnFormat(none='-')})
+        assert '<tr><td>31.01.2024</td><td>1,234.5</td><td>-</td></tr>' in rl.render(RenderMode.COMPACT)
+        rl.add_aggregates({'amount': 'sum', 'day': 'count'})
+        assert rl.table_[-1].cells[:2] == [['3'], ['3,703.5']]
+
+    def test_formats_client_side(self):
+        rl = ResultListing([{'amount': 1234.5}, {'amount': None}], client_side=True, formats={'amount': ',.2f'})
+        assert '"columns":[["1,234.50",""]]' in rl.render(RenderMode.COMPACT)
+
+    def test_etag_client_side(self):
+        def page(value, **kwargs):
+            html_page = HtmlPage()
+            html_page.body.result_listing([{'value': value}], client_side=True, **kwargs)
+            return html_page
+
+        assert page(1).etag == page(1).etag
+        assert page(1).etag != page(2).etag
+        assert page(1).etag != page(1, viewport=10, fetch_url='/rows').etag
+        with_footer = page(1)
+        with_footer.body[0].add_aggregates({'value': 'sum'})
+        assert with_footer.etag != page(1).etag
+
+    def test_export_unknown_format(self, content_as_dicts):
+        with pytest.raises(ValueError):
+            ResultListing(content_as_dicts).export('xlsx')
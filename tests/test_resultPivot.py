@@ -0,0 +1,36 @@
+from pyspass import HtmlPage, PageBudget, RenderMode, ResultPivot
+
+ROWS = [{'region': 'n', 'year': 2020, 'quarter': 'q1', 'sales': 1},
+        {'region': 'n', 'year': 2020, 'quarter': 'q2', 'sales': 2},
+        {'region': 's', 'year': 2021, 'quarter': 'q1', 'sales': 2.5},
+        {'region': 's', 'year': 2020, 'quarter': 'q1', 'sales': 4}]
+
+
+class TestResultPivot:
+
+    def test_render(self):
+        rp = ResultPivot(ROWS, 'region', 'year', 'sales', mapping={'region': 'Region'}, alignments='lrr')
+        html = rp.render(RenderMode.COMPACT)
+        assert '<tr><th>Region</th><th>2020</th><th>2021</th></tr>' in html
+        assert '<tr><td>n</td><td>3</td><td></td></tr><tr><td>s</td><td>4</td><td>2.50</td></tr></table>' in html
+        assert html.startswith('<style>')
+
+    def test_header_row_per_column_key(self):
+        rp = ResultPivot(ROWS, 'region', ['year', 'quarter'], 'sales', 'count')
+        html = rp.render(RenderMode.COMPACT)
+        assert '<tr><th></th><th colspan="2">2020</th><th>2021</th></tr>' in html
+        assert '<tr><th>region</th><th>q1</th><th>q2</th><th>q1</th></tr>' in html
+        assert '<tr><td>s</td><td>1</td><td></td><td>1</td></tr>' in html
+
+    def test_single_column_lists(self):
+        html = ResultPivot(ROWS, ['region'], ['year'], 'sales').render(RenderMode.COMPACT)
+        assert '<tr><th>region</th><th>2020</th><th>2021</th></tr>' in html
+        assert '<tr><td>n</td><td>3</td><td></td></tr>' in html
+
+    def test_truncated_by_budget(self):
+        page = HtmlPage(budget=PageBudget(max_nodes=20))
+        rp = page.body.result_pivot(ROWS, ['region', 'quarter'], 'year', 'sales')
+        assert rp.truncated
+        assert len(rp.table_) == 1 + 2 + 1  # header, rows, notice
+        assert page.usage.truncated == 1
+        assert page.usage.nodes <= 20